@@ -105,6 +105,7 @@ module "aft_customizations" {
   aft_sns_topic_arn                                 = module.aft_account_request_framework.sns_topic_arn
   aft_failure_sns_topic_arn                         = module.aft_account_request_framework.failure_sns_topic_arn
   request_metadata_table_name                       = module.aft_account_request_framework.request_metadata_table_name
+  account_tag_index_table_name                      = module.aft_account_request_framework.account_tag_index_table_name
   aft_vpc_id                                        = module.aft_account_request_framework.aft_vpc_id
   aft_vpc_private_subnets                           = module.aft_account_request_framework.aft_vpc_private_subnets
   aft_vpc_default_sg                                = module.aft_account_request_framework.aft_vpc_default_sg
@@ -182,10 +183,15 @@ module "aft_ssm_parameters" {
   }
   source                                                      = "./modules/aft-ssm-parameters"
   aft_request_queue_name                                      = module.aft_account_request_framework.request_queue_name
+  aft_request_high_priority_queue_name                        = module.aft_account_request_framework.request_high_priority_queue_name
   aft_request_table_name                                      = module.aft_account_request_framework.request_table_name
   aft_request_audit_table_name                                = module.aft_account_request_framework.request_audit_table_name
   aft_request_metadata_table_name                             = module.aft_account_request_framework.request_metadata_table_name
+  aft_account_tag_index_table_name                            = module.aft_account_request_framework.account_tag_index_table_name
   aft_controltower_events_table_name                          = module.aft_account_request_framework.controltower_events_table_name
+  aft_provisioning_operations_table_name                      = module.aft_account_request_framework.provisioning_operations_table_name
+  aft_customization_pipeline_executions_table_name            = module.aft_customizations.pipeline_executions_table_name
+  aft_customizations_targets_bucket_name                      = module.aft_customizations.aft_customizations_targets_bucket_name
   account_factory_product_name                                = module.aft_account_request_framework.account_factory_product_name
   aft_invoke_aft_account_provisioning_framework_function_name = module.aft_account_request_framework.invoke_aft_account_provisioning_framework_lambda_function_name
   aft_account_provisioning_framework_sfn_name                 = module.aft_account_request_framework.aft_account_provisioning_framework_sfn_name
@@ -240,6 +246,7 @@ module "aft_ssm_parameters" {
   account_provisioning_customizations_repo_name               = var.account_provisioning_customizations_repo_name
   account_provisioning_customizations_repo_branch             = var.account_provisioning_customizations_repo_branch
   maximum_concurrent_customizations                           = var.maximum_concurrent_customizations
+  maximum_concurrent_account_factory_operations               = var.maximum_concurrent_account_factory_operations
   github_enterprise_url                                       = var.github_enterprise_url
   aft_metrics_reporting                                       = var.aft_metrics_reporting
 }
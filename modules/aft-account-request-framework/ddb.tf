@@ -50,6 +50,33 @@ resource "aws_dynamodb_table" "aft_request_metadata" {
   }
 }
 
+# Table that indexes AFT accounts by tag key and value
+resource "aws_dynamodb_table" "aft_account_tag_index" {
+  name         = "aft-account-tag-index"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "tag_key"
+  range_key    = "tag_value"
+
+  attribute {
+    name = "tag_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "tag_value"
+    type = "S"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled     = true
+    kms_key_arn = aws_kms_key.aft.arn
+  }
+}
+
 # Table that stores the configuration details for the account vending machine
 resource "aws_dynamodb_table" "aft_request" {
   name             = "aft-request"
@@ -124,6 +151,11 @@ resource "aws_dynamodb_table" "aft_controltower_events" {
     type = "S"
   }
 
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -133,3 +165,26 @@ resource "aws_dynamodb_table" "aft_controltower_events" {
     kms_key_arn = aws_kms_key.aft.arn
   }
 }
+
+# Table that tracks in-flight Account Factory provisioning operations
+resource "aws_dynamodb_table" "aft_provisioning_operations" {
+  name           = "aft-provisioning-operations"
+  read_capacity  = 5
+  write_capacity = 5
+  hash_key       = "id"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "lease_expires_at"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled     = true
+    kms_key_arn = aws_kms_key.aft.arn
+  }
+}
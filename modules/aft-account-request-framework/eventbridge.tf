@@ -49,7 +49,7 @@ EOF
 
 resource "aws_cloudwatch_event_target" "aft_controltower_event_logger" {
   rule           = aws_cloudwatch_event_rule.aft_controltower_event_trigger.name
-  arn            = aws_lambda_function.aft_controltower_event_logger.arn
+  arn            = aws_sqs_queue.aft_controltower_events.arn
   event_bus_name = aws_cloudwatch_event_bus.aft_from_ct_management.name
 }
 
@@ -75,6 +75,7 @@ resource "aws_iam_role_policy" "aft_account_request_action_trigger" {
     data_aws_caller_identity_aft-management_account_id                = data.aws_caller_identity.aft-management.account_id
     aws_lambda_function_invoke_aft_account_provisioning_framework_arn = aws_lambda_function.aft_invoke_aft_account_provisioning_framework.arn
     aws_sqs_queue_aft_account_request_arn                             = aws_sqs_queue.aft_account_request.arn
+    aws_sqs_queue_aft_account_request_high_priority_arn               = aws_sqs_queue.aft_account_request_high_priority.arn
     aws_kms_key_aft_arn                                               = aws_kms_key.aft.arn
     aws_dynamodb_table_aft-request_name                               = aws_dynamodb_table.aft_request.name
     aws_dynamodb_table_aft-request-audit_name                         = aws_dynamodb_table.aft_request_audit.name
@@ -98,13 +99,15 @@ resource "aws_iam_role_policy" "aft_controltower_event_logger" {
   role = aws_iam_role.aft_controltower_event_logger.id
 
   policy = templatefile("${path.module}/iam/role-policies/lambda-controltower-event-logger.tpl", {
-    data_aws_partition_current_partition               = data.aws_partition.current.partition
-    data_aws_region_aft-management_name                = data.aws_region.aft-management.name
-    data_aws_caller_identity_aft-management_account_id = data.aws_caller_identity.aft-management.account_id
-    aws_dynamodb_table_controltower-events_name        = aws_dynamodb_table.aft_controltower_events.name
-    aws_sns_topic_aft_notifications_arn                = aws_sns_topic.aft_notifications.arn
-    aws_sns_topic_aft_failure_notifications_arn        = aws_sns_topic.aft_failure_notifications.arn
-    aws_kms_key_aft_arn                                = aws_kms_key.aft.arn
+    data_aws_partition_current_partition                = data.aws_partition.current.partition
+    data_aws_region_aft-management_name                 = data.aws_region.aft-management.name
+    data_aws_caller_identity_aft-management_account_id  = data.aws_caller_identity.aft-management.account_id
+    aws_dynamodb_table_controltower-events_name         = aws_dynamodb_table.aft_controltower_events.name
+    aws_dynamodb_table_aft-provisioning-operations_name = aws_dynamodb_table.aft_provisioning_operations.name
+    aws_sqs_queue_aft_controltower_events_arn           = aws_sqs_queue.aft_controltower_events.arn
+    aws_sns_topic_aft_notifications_arn                 = aws_sns_topic.aft_notifications.arn
+    aws_sns_topic_aft_failure_notifications_arn         = aws_sns_topic.aft_failure_notifications.arn
+    aws_kms_key_aft_arn                                 = aws_kms_key.aft.arn
   })
 }
 
@@ -125,13 +128,15 @@ resource "aws_iam_role_policy" "aft_account_request_processor" {
   role = aws_iam_role.aft_account_request_processor.id
 
   policy = templatefile("${path.module}/iam/role-policies/lambda-account-request-processor.tpl", {
-    data_aws_partition_current_partition               = data.aws_partition.current.partition
-    data_aws_region_aft-management_name                = data.aws_region.aft-management.name
-    data_aws_caller_identity_aft-management_account_id = data.aws_caller_identity.aft-management.account_id
-    aws_kms_key_aft_arn                                = aws_kms_key.aft.arn
-    aws_sns_topic_aft_notifications_arn                = aws_sns_topic.aft_notifications.arn
-    aws_sns_topic_aft_failure_notifications_arn        = aws_sns_topic.aft_failure_notifications.arn
-    aws_sqs_queue_aft_account_request_arn              = aws_sqs_queue.aft_account_request.arn
+    data_aws_partition_current_partition                = data.aws_partition.current.partition
+    data_aws_region_aft-management_name                 = data.aws_region.aft-management.name
+    data_aws_caller_identity_aft-management_account_id  = data.aws_caller_identity.aft-management.account_id
+    aws_kms_key_aft_arn                                 = aws_kms_key.aft.arn
+    aws_sns_topic_aft_notifications_arn                 = aws_sns_topic.aft_notifications.arn
+    aws_sns_topic_aft_failure_notifications_arn         = aws_sns_topic.aft_failure_notifications.arn
+    aws_sqs_queue_aft_account_request_arn               = aws_sqs_queue.aft_account_request.arn
+    aws_sqs_queue_aft_account_request_high_priority_arn = aws_sqs_queue.aft_account_request_high_priority.arn
+    aws_dynamodb_table_aft-provisioning-operations_name = aws_dynamodb_table.aft_provisioning_operations.name
   })
 }
 
@@ -18,12 +18,14 @@
 				"dynamodb:GetRecords",
 				"dynamodb:ListShards",
 				"dynamodb:ListStreams",
-				"sqs:SendMessage"
+				"sqs:SendMessage",
+				"sqs:GetQueueUrl"
 			],
 			"Resource": [
 				"arn:${data_aws_partition_current_partition}:dynamodb:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:table/${aws_dynamodb_table_aft-request_name}/stream/*",
 				"${aws_lambda_function_invoke_aft_account_provisioning_framework_arn}",
-                "${aws_sqs_queue_aft_account_request_arn}"
+                "${aws_sqs_queue_aft_account_request_arn}",
+                "${aws_sqs_queue_aft_account_request_high_priority_arn}"
 			]
 		},
 		{
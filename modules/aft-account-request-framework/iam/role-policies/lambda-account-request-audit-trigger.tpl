@@ -18,7 +18,8 @@
         "Effect": "Allow",
         "Action": [
             "dynamodb:Query",
-            "dynamodb:PutItem"
+            "dynamodb:PutItem",
+            "dynamodb:BatchWriteItem"
         ],
         "Resource": "arn:${data_aws_partition_current_partition}:dynamodb:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:table/${aws_dynamodb_table_aft-request-audit_name}"
     },
@@ -5,17 +5,31 @@
         "Effect" : "Allow",
         "Action" : [
           "sqs:DeleteMessage",
+          "sqs:ChangeMessageVisibility",
           "sts:AssumeRole",
           "sns:Publish",
-          "sqs:ReceiveMessage"
+          "sqs:ReceiveMessage",
+          "sqs:GetQueueUrl"
         ],
         "Resource" : [
           "${aws_sns_topic_aft_notifications_arn}",
           "${aws_sns_topic_aft_failure_notifications_arn}",
           "arn:${data_aws_partition_current_partition}:iam::${data_aws_caller_identity_aft-management_account_id}:role/AWSAFTAdmin",
-          "${aws_sqs_queue_aft_account_request_arn}"
+          "${aws_sqs_queue_aft_account_request_arn}",
+          "${aws_sqs_queue_aft_account_request_high_priority_arn}"
         ]
       },
+      {
+        "Effect" : "Allow",
+        "Action" : [
+          "dynamodb:BatchGetItem",
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem"
+        ],
+        "Resource" : "arn:${data_aws_partition_current_partition}:dynamodb:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:table/${aws_dynamodb_table_aft-provisioning-operations_name}"
+      },
       {
         "Effect" : "Allow",
         "Action" : "sts:GetCallerIdentity",
@@ -28,6 +42,13 @@
           "arn:${data_aws_partition_current_partition}:ssm:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:parameter/aft/*"
         ]
       },
+      {
+        "Effect" : "Allow",
+        "Action" : "ssm:PutParameter",
+        "Resource" : [
+          "arn:${data_aws_partition_current_partition}:ssm:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:parameter/aft/resources/sc/account-factory-portfolio-association"
+        ]
+      },
       {
       "Effect" : "Allow",
       "Action" : [
@@ -4,12 +4,42 @@
       {
         "Effect" : "Allow",
         "Action" : [
-          "dynamodb:PutItem"
+          "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem"
         ],
         "Resource" : [
           "arn:${data_aws_partition_current_partition}:dynamodb:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:table/${aws_dynamodb_table_controltower-events_name}"
         ]
       },
+      {
+        "Effect" : "Allow",
+        "Action" : [
+          "dynamodb:BatchGetItem",
+          "dynamodb:DeleteItem"
+        ],
+        "Resource" : [
+          "arn:${data_aws_partition_current_partition}:dynamodb:${data_aws_region_aft-management_name}:${data_aws_caller_identity_aft-management_account_id}:table/${aws_dynamodb_table_aft-provisioning-operations_name}"
+        ]
+      },
+      {
+        "Effect" : "Allow",
+        "Action" : [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ],
+        "Resource" : "${aws_sqs_queue_aft_controltower_events_arn}"
+      },
+      {
+        "Effect" : "Allow",
+        "Action" : "sts:AssumeRole",
+        "Resource" : "arn:${data_aws_partition_current_partition}:iam::${data_aws_caller_identity_aft-management_account_id}:role/AWSAFTAdmin"
+      },
+      {
+        "Effect" : "Allow",
+        "Action" : "sts:GetCallerIdentity",
+        "Resource" : "*"
+      },
       {
         "Effect" : "Allow",
         "Action" : "ssm:GetParameter",
@@ -4,6 +4,10 @@
 resource "aws_kms_key" "aft" {
   description         = "AFT KMS key"
   enable_key_rotation = "true"
+  policy = templatefile("${path.module}/kms/key-policies/aft-key.tpl", {
+    data_aws_partition_current_partition               = data.aws_partition.current.partition
+    data_aws_caller_identity_aft-management_account_id = data.aws_caller_identity.aft-management.account_id
+  })
 }
 resource "aws_kms_alias" "aft" {
   name          = "alias/aft"
@@ -30,12 +30,14 @@ resource "time_sleep" "wait_60_seconds" {
 }
 
 resource "aws_lambda_event_source_mapping" "aft_account_request_audit_trigger" {
-  depends_on             = [time_sleep.wait_60_seconds]
-  event_source_arn       = aws_dynamodb_table.aft_request.stream_arn
-  function_name          = aws_lambda_function.aft_account_request_audit_trigger.arn
-  starting_position      = "LATEST"
-  batch_size             = 1
-  maximum_retry_attempts = 1
+  depends_on                         = [time_sleep.wait_60_seconds]
+  event_source_arn                   = aws_dynamodb_table.aft_request.stream_arn
+  function_name                      = aws_lambda_function.aft_account_request_audit_trigger.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 5
+  maximum_retry_attempts             = 1
+  function_response_types            = ["ReportBatchItemFailures"]
 }
 
 resource "aws_cloudwatch_log_group" "aft_account_request_audit_trigger" {
@@ -68,11 +70,13 @@ resource "aws_lambda_function" "aft_account_request_action_trigger" {
 }
 
 resource "aws_lambda_event_source_mapping" "aft_account_request_action_trigger" {
-  event_source_arn       = aws_dynamodb_table.aft_request.stream_arn
-  function_name          = aws_lambda_function.aft_account_request_action_trigger.arn
-  starting_position      = "LATEST"
-  batch_size             = 1
-  maximum_retry_attempts = 1
+  event_source_arn                   = aws_dynamodb_table.aft_request.stream_arn
+  function_name                      = aws_lambda_function.aft_account_request_action_trigger.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 10
+  maximum_batching_window_in_seconds = 5
+  maximum_retry_attempts             = 1
+  function_response_types            = ["ReportBatchItemFailures"]
 }
 
 resource "aws_cloudwatch_log_group" "aft_account_request_action_trigger" {
@@ -87,7 +91,7 @@ resource "aws_lambda_function" "aft_controltower_event_logger" {
 
   filename      = var.request_framework_archive_path
   function_name = "aft-controltower-event-logger"
-  description   = "Receives Control Tower events through dedicated event bus event and writes event to aft-controltower-events table"
+  description   = "Receives batches of Control Tower events buffered from the dedicated event bus and writes them to aft-controltower-events table"
   role          = aws_iam_role.aft_controltower_event_logger.arn
   handler       = "aft_controltower_event_logger.lambda_handler"
 
@@ -103,12 +107,12 @@ resource "aws_lambda_function" "aft_controltower_event_logger" {
   }
 }
 
-resource "aws_lambda_permission" "aft_controltower_event_logger" {
-  statement_id  = "AllowExecutionFromCloudWatch"
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.aft_controltower_event_logger.function_name
-  principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.aft_controltower_event_trigger.arn
+resource "aws_lambda_event_source_mapping" "aft_controltower_event_logger" {
+  event_source_arn                   = aws_sqs_queue.aft_controltower_events.arn
+  function_name                      = aws_lambda_function.aft_controltower_event_logger.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 10
+  function_response_types            = ["ReportBatchItemFailures"]
 }
 
 resource "aws_cloudwatch_log_group" "aft_controltower_event_logger" {
@@ -44,6 +44,9 @@ output "invoke_aft_account_provisioning_framework_function_arn" {
 output "request_queue_name" {
   value = aws_sqs_queue.aft_account_request.name
 }
+output "request_high_priority_queue_name" {
+  value = aws_sqs_queue.aft_account_request_high_priority.name
+}
 output "request_table_name" {
   value = aws_dynamodb_table.aft_request.name
 }
@@ -53,9 +56,15 @@ output "request_audit_table_name" {
 output "request_metadata_table_name" {
   value = aws_dynamodb_table.aft_request_metadata.name
 }
+output "account_tag_index_table_name" {
+  value = aws_dynamodb_table.aft_account_tag_index.name
+}
 output "controltower_events_table_name" {
   value = aws_dynamodb_table.aft_controltower_events.name
 }
+output "provisioning_operations_table_name" {
+  value = aws_dynamodb_table.aft_provisioning_operations.name
+}
 output "account_factory_product_name" {
   value = var.account_factory_product_name
 }
@@ -9,7 +9,20 @@ resource "aws_sqs_queue" "aft_account_request" {
   kms_data_key_reuse_period_seconds = 300
   redrive_policy = jsonencode({
     deadLetterTargetArn = aws_sqs_queue.aft_account_request_dlq.arn
-    maxReceiveCount     = 1
+    maxReceiveCount     = 10
+  })
+}
+
+# Lane for latency-sensitive requests, served ahead of aft_account_request by weight
+resource "aws_sqs_queue" "aft_account_request_high_priority" {
+  name                              = "aft-account-request-high-priority.fifo"
+  fifo_queue                        = true
+  kms_master_key_id                 = aws_kms_alias.aft.name
+  visibility_timeout_seconds        = 240
+  kms_data_key_reuse_period_seconds = 300
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.aft_account_request_dlq.arn
+    maxReceiveCount     = 10
   })
 }
 
@@ -19,3 +32,39 @@ resource "aws_sqs_queue" "aft_account_request_dlq" {
   kms_master_key_id                 = aws_kms_alias.aft.name
   kms_data_key_reuse_period_seconds = 300
 }
+
+# Buffers Control Tower events so the event logger writes them in batches
+resource "aws_sqs_queue" "aft_controltower_events" {
+  name                              = "aft-controltower-events"
+  kms_master_key_id                 = aws_kms_alias.aft.name
+  kms_data_key_reuse_period_seconds = 300
+  visibility_timeout_seconds        = 1800
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.aft_controltower_events_dlq.arn
+    maxReceiveCount     = 5
+  })
+}
+
+resource "aws_sqs_queue" "aft_controltower_events_dlq" {
+  name                              = "aft-controltower-events-dlq"
+  kms_master_key_id                 = aws_kms_alias.aft.name
+  kms_data_key_reuse_period_seconds = 300
+}
+
+resource "aws_sqs_queue_policy" "aft_controltower_events" {
+  queue_url = aws_sqs_queue.aft_controltower_events.id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect    = "Allow"
+        Principal = { Service = "events.amazonaws.com" }
+        Action    = "sqs:SendMessage"
+        Resource  = aws_sqs_queue.aft_controltower_events.arn
+        Condition = {
+          ArnEquals = { "aws:SourceArn" = aws_cloudwatch_event_rule.aft_controltower_event_trigger.arn }
+        }
+      }
+    ]
+  })
+}
@@ -0,0 +1,20 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Table that tracks running and reserved customization pipelines
+resource "aws_dynamodb_table" "aft_customization_pipeline_executions" {
+  name           = "aft-customization-pipeline-executions"
+  read_capacity  = 5
+  write_capacity = 5
+  hash_key       = "id"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+
+  server_side_encryption {
+    enabled     = true
+    kms_key_arn = var.aft_kms_key_arn
+  }
+}
@@ -0,0 +1,43 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+######### Customization Pipeline State Tracker #########
+resource "aws_cloudwatch_event_rule" "aft_customizations_pipeline_state_change" {
+  name          = "aft-customizations-pipeline-state-change"
+  description   = "Send CodePipeline execution state changes to Lambda"
+  event_pattern = <<EOF
+{
+  "source": ["aws.codepipeline"],
+  "detail-type": ["CodePipeline Pipeline Execution State Change"]
+}
+EOF
+}
+
+resource "aws_cloudwatch_event_target" "aft_customizations_pipeline_state_tracker" {
+  rule = aws_cloudwatch_event_rule.aft_customizations_pipeline_state_change.name
+  arn  = aws_lambda_function.aft_customizations_pipeline_state_tracker.arn
+}
+
+######### Customization Build Queue Times #########
+resource "aws_cloudwatch_event_rule" "aft_customizations_build_queued" {
+  name          = "aft-customizations-build-queued"
+  description   = "Send customization CodeBuild queue times to Lambda"
+  event_pattern = <<EOF
+{
+  "source": ["aws.codebuild"],
+  "detail-type": ["CodeBuild Build Phase Change"],
+  "detail": {
+    "completed-phase": ["QUEUED"],
+    "project-name": [
+      "${aws_codebuild_project.aft_global_customizations_terraform.name}",
+      "${aws_codebuild_project.aft_account_customizations_terraform.name}"
+    ]
+  }
+}
+EOF
+}
+
+resource "aws_cloudwatch_event_target" "aft_customizations_build_queued" {
+  rule = aws_cloudwatch_event_rule.aft_customizations_build_queued.name
+  arn  = aws_lambda_function.aft_customizations_pipeline_state_tracker.arn
+}
@@ -79,15 +79,17 @@ resource "aws_iam_role_policy" "aft_identify_targets_lambda" {
   role = aws_iam_role.aft_customizations_identify_targets_lambda.id
 
   policy = templatefile("${path.module}/iam/role-policies/aft_identify_targets_lambda.tpl", {
-    data_aws_caller_identity_current_account_id = data.aws_caller_identity.current.account_id
-    data_aws_partition_current_partition        = data.aws_partition.current.partition
-    data_aws_region_current_name                = data.aws_region.current.name
-    request_metadata_table_name                 = var.request_metadata_table_name
-    account_request_table_name                  = var.account_request_table_name
-    aws_kms_key_aft_arn                         = var.aft_kms_key_arn
-    aft_sns_topic_arn                           = var.aft_sns_topic_arn
-    aft_failure_sns_topic_arn                   = var.aft_failure_sns_topic_arn
-    invoke_account_provisioning_arn             = var.invoke_account_provisioning_sfn_arn
+    data_aws_caller_identity_current_account_id  = data.aws_caller_identity.current.account_id
+    data_aws_partition_current_partition         = data.aws_partition.current.partition
+    data_aws_region_current_name                 = data.aws_region.current.name
+    request_metadata_table_name                  = var.request_metadata_table_name
+    account_tag_index_table_name                 = var.account_tag_index_table_name
+    aws_s3_bucket_aft_customizations_targets_arn = aws_s3_bucket.aft_customizations_targets_bucket.arn
+    account_request_table_name                   = var.account_request_table_name
+    aws_kms_key_aft_arn                          = var.aft_kms_key_arn
+    aft_sns_topic_arn                            = var.aft_sns_topic_arn
+    aft_failure_sns_topic_arn                    = var.aft_failure_sns_topic_arn
+    invoke_account_provisioning_arn              = var.invoke_account_provisioning_sfn_arn
   })
 
 }
@@ -112,12 +114,13 @@ resource "aws_iam_role_policy" "aft_execute_pipeline_lambda" {
   role = aws_iam_role.aft_customizations_execute_pipeline_lambda.id
 
   policy = templatefile("${path.module}/iam/role-policies/aft_execute_pipeline_lambda.tpl", {
-    data_aws_partition_current_partition        = data.aws_partition.current.partition
-    data_aws_region_current_name                = data.aws_region.current.name
-    data_aws_caller_identity_current_account_id = data.aws_caller_identity.current.account_id
-    aws_kms_key_aft_arn                         = var.aft_kms_key_arn
-    aft_sns_topic_arn                           = var.aft_sns_topic_arn
-    aft_failure_sns_topic_arn                   = var.aft_failure_sns_topic_arn
+    data_aws_partition_current_partition                         = data.aws_partition.current.partition
+    data_aws_region_current_name                                 = data.aws_region.current.name
+    data_aws_caller_identity_current_account_id                  = data.aws_caller_identity.current.account_id
+    aws_kms_key_aft_arn                                          = var.aft_kms_key_arn
+    aft_sns_topic_arn                                            = var.aft_sns_topic_arn
+    aft_failure_sns_topic_arn                                    = var.aft_failure_sns_topic_arn
+    aws_dynamodb_table_aft_customization_pipeline_executions_arn = aws_dynamodb_table.aft_customization_pipeline_executions.arn
   })
 
 }
@@ -142,12 +145,13 @@ resource "aws_iam_role_policy" "aft_get_pipeline_executions_lambda" {
   role = aws_iam_role.aft_customizations_get_pipeline_executions_lambda.id
 
   policy = templatefile("${path.module}/iam/role-policies/aft_get_pipeline_status_lambda.tpl", {
-    data_aws_partition_current_partition        = data.aws_partition.current.partition
-    data_aws_region_current_name                = data.aws_region.current.name
-    data_aws_caller_identity_current_account_id = data.aws_caller_identity.current.account_id
-    aws_kms_key_aft_arn                         = var.aft_kms_key_arn
-    aft_sns_topic_arn                           = var.aft_sns_topic_arn
-    aft_failure_sns_topic_arn                   = var.aft_failure_sns_topic_arn
+    data_aws_partition_current_partition                         = data.aws_partition.current.partition
+    data_aws_region_current_name                                 = data.aws_region.current.name
+    data_aws_caller_identity_current_account_id                  = data.aws_caller_identity.current.account_id
+    aws_kms_key_aft_arn                                          = var.aft_kms_key_arn
+    aft_sns_topic_arn                                            = var.aft_sns_topic_arn
+    aft_failure_sns_topic_arn                                    = var.aft_failure_sns_topic_arn
+    aws_dynamodb_table_aft_customization_pipeline_executions_arn = aws_dynamodb_table.aft_customization_pipeline_executions.arn
   })
 
 }
@@ -158,6 +162,68 @@ resource "aws_iam_role_policy_attachment" "aft_get_pipeline_executions_lambda" {
   policy_arn = local.lambda_managed_policies[count.index]
 }
 
+###################################################################
+# Lambda - Pipeline State Tracker
+###################################################################
+
+resource "aws_iam_role" "aft_customizations_pipeline_state_tracker_lambda" {
+  name               = "aft-pipeline-state-tracker-execution-role"
+  assume_role_policy = templatefile("${path.module}/iam/trust-policies/lambda.tpl", { none = "none" })
+}
+
+resource "aws_iam_role_policy" "aft_pipeline_state_tracker_lambda" {
+  name = "aft-pipeline-state-tracker-policy"
+  role = aws_iam_role.aft_customizations_pipeline_state_tracker_lambda.id
+
+  policy = templatefile("${path.module}/iam/role-policies/aft_pipeline_state_tracker_lambda.tpl", {
+    data_aws_partition_current_partition                         = data.aws_partition.current.partition
+    data_aws_region_current_name                                 = data.aws_region.current.name
+    data_aws_caller_identity_current_account_id                  = data.aws_caller_identity.current.account_id
+    aws_kms_key_aft_arn                                          = var.aft_kms_key_arn
+    aft_sns_topic_arn                                            = var.aft_sns_topic_arn
+    aft_failure_sns_topic_arn                                    = var.aft_failure_sns_topic_arn
+    aws_dynamodb_table_aft_customization_pipeline_executions_arn = aws_dynamodb_table.aft_customization_pipeline_executions.arn
+  })
+
+}
+
+resource "aws_iam_role_policy_attachment" "aft_pipeline_state_tracker_lambda" {
+  count      = length(local.lambda_managed_policies)
+  role       = aws_iam_role.aft_customizations_pipeline_state_tracker_lambda.name
+  policy_arn = local.lambda_managed_policies[count.index]
+}
+
+###################################################################
+# Lambda - Get Target Page
+###################################################################
+
+resource "aws_iam_role" "aft_customizations_get_target_page_lambda" {
+  name               = "aft-get-target-page-execution-role"
+  assume_role_policy = templatefile("${path.module}/iam/trust-policies/lambda.tpl", { none = "none" })
+}
+
+resource "aws_iam_role_policy" "aft_get_target_page_lambda" {
+  name = "aft-get-target-page-policy"
+  role = aws_iam_role.aft_customizations_get_target_page_lambda.id
+
+  policy = templatefile("${path.module}/iam/role-policies/aft_get_target_page_lambda.tpl", {
+    data_aws_partition_current_partition         = data.aws_partition.current.partition
+    data_aws_region_current_name                 = data.aws_region.current.name
+    data_aws_caller_identity_current_account_id  = data.aws_caller_identity.current.account_id
+    aws_kms_key_aft_arn                          = var.aft_kms_key_arn
+    aft_sns_topic_arn                            = var.aft_sns_topic_arn
+    aft_failure_sns_topic_arn                    = var.aft_failure_sns_topic_arn
+    aws_s3_bucket_aft_customizations_targets_arn = aws_s3_bucket.aft_customizations_targets_bucket.arn
+  })
+
+}
+
+resource "aws_iam_role_policy_attachment" "aft_get_target_page_lambda" {
+  count      = length(local.lambda_managed_policies)
+  role       = aws_iam_role.aft_customizations_get_target_page_lambda.name
+  policy_arn = local.lambda_managed_policies[count.index]
+}
+
 resource "aws_iam_role_policy" "terraform_oss_backend_codebuild_customizations_policy" {
   count = var.terraform_distribution == "oss" ? 1 : 0
   name  = "ct-aft-codebuild-customizations-terraform-oss-backend-policy"
@@ -15,6 +15,15 @@
                 "arn:${data_aws_partition_current_partition}:ssm:${data_aws_region_current_name}:${data_aws_caller_identity_current_account_id}:parameter/aft/*"
             ]
         },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "dynamodb:GetItem",
+                "dynamodb:PutItem",
+                "dynamodb:UpdateItem"
+            ],
+            "Resource": "${aws_dynamodb_table_aft_customization_pipeline_executions_arn}"
+        },
       {
         "Effect" : "Allow",
         "Action" : [
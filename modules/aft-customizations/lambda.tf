@@ -83,3 +83,69 @@ resource "aws_cloudwatch_log_group" "aft_customizations_invoke_account_provision
   name              = "/aws/lambda/aft-customizations-invoke-account-provisioning"
   retention_in_days = var.cloudwatch_log_group_retention
 }
+
+######## customizations_get_target_page ########
+resource "aws_lambda_function" "aft_customizations_get_target_page" {
+  filename      = var.customizations_archive_path
+  function_name = "aft-customizations-get-target-page"
+  description   = "Reads a page of offloaded customization targets. Called from aft-trigger-customizations SFN"
+  role          = aws_iam_role.aft_customizations_get_target_page_lambda.arn
+  handler       = "aft_customizations_get_target_page.lambda_handler"
+
+  source_code_hash = var.customizations_archive_hash
+  memory_size      = 1024
+  runtime          = "python3.8"
+  timeout          = "300"
+  layers           = [var.aft_common_layer_arn]
+
+  vpc_config {
+    subnet_ids         = var.aft_vpc_private_subnets
+    security_group_ids = var.aft_vpc_default_sg
+  }
+}
+
+resource "aws_cloudwatch_log_group" "aft_customizations_get_target_page" {
+  name              = "/aws/lambda/${aws_lambda_function.aft_customizations_get_target_page.function_name}"
+  retention_in_days = var.cloudwatch_log_group_retention
+}
+
+######## customizations_pipeline_state_tracker ########
+resource "aws_lambda_function" "aft_customizations_pipeline_state_tracker" {
+  filename      = var.customizations_archive_path
+  function_name = "aft-customizations-pipeline-state-tracker"
+  description   = "Tracks running customization pipelines from CodePipeline execution state change events"
+  role          = aws_iam_role.aft_customizations_pipeline_state_tracker_lambda.arn
+  handler       = "aft_customizations_pipeline_state_tracker.lambda_handler"
+
+  source_code_hash = var.customizations_archive_hash
+  memory_size      = 1024
+  runtime          = "python3.8"
+  timeout          = "300"
+  layers           = [var.aft_common_layer_arn]
+
+  vpc_config {
+    subnet_ids         = var.aft_vpc_private_subnets
+    security_group_ids = var.aft_vpc_default_sg
+  }
+}
+
+resource "aws_lambda_permission" "aft_customizations_pipeline_state_tracker" {
+  statement_id  = "AllowExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.aft_customizations_pipeline_state_tracker.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.aft_customizations_pipeline_state_change.arn
+}
+
+resource "aws_lambda_permission" "aft_customizations_pipeline_state_tracker_build_queued" {
+  statement_id  = "AllowExecutionFromCloudWatchBuildQueued"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.aft_customizations_pipeline_state_tracker.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.aft_customizations_build_queued.arn
+}
+
+resource "aws_cloudwatch_log_group" "aft_customizations_pipeline_state_tracker" {
+  name              = "/aws/lambda/${aws_lambda_function.aft_customizations_pipeline_state_tracker.function_name}"
+  retention_in_days = var.cloudwatch_log_group_retention
+}
@@ -13,6 +13,18 @@ output "aft_customizations_get_pipeline_executions_function_arn" {
   value = aws_lambda_function.aft_customizations_get_pipeline_executions.arn
 }
 
+output "aft_customizations_pipeline_state_tracker_function_arn" {
+  value = aws_lambda_function.aft_customizations_pipeline_state_tracker.arn
+}
+
+output "aft_customizations_get_target_page_function_arn" {
+  value = aws_lambda_function.aft_customizations_get_target_page.arn
+}
+
+output "pipeline_executions_table_name" {
+  value = aws_dynamodb_table.aft_customization_pipeline_executions.name
+}
+
 output "aft_codepipeline_customizations_bucket_name" {
   value = aws_s3_bucket.aft_codepipeline_customizations_bucket.id
 }
@@ -20,3 +32,7 @@ output "aft_codepipeline_customizations_bucket_name" {
 output "aft_codepipeline_customizations_bucket_arn" {
   value = aws_s3_bucket.aft_codepipeline_customizations_bucket.arn
 }
+
+output "aft_customizations_targets_bucket_name" {
+  value = aws_s3_bucket.aft_customizations_targets_bucket.id
+}
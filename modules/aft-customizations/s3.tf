@@ -27,3 +27,47 @@ resource "aws_s3_bucket_acl" "aft-codepipeline-customizations-bucket-acl" {
   bucket = aws_s3_bucket.aft_codepipeline_customizations_bucket.id
   acl    = "private"
 }
+
+resource "aws_s3_bucket" "aft_customizations_targets_bucket" {
+  bucket = "aft-customizations-targets-${data.aws_caller_identity.current.account_id}"
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "aft-customizations-targets-bucket-encryption" {
+  bucket = aws_s3_bucket.aft_customizations_targets_bucket.id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      kms_master_key_id = var.aft_kms_key_id
+      sse_algorithm     = "aws:kms"
+    }
+  }
+}
+
+resource "aws_s3_bucket_lifecycle_configuration" "aft-customizations-targets-bucket-lifecycle-configuration" {
+  bucket = aws_s3_bucket.aft_customizations_targets_bucket.id
+  rule {
+    status = "Enabled"
+    id     = "aft-customizations-targets-bucket-lifecycle-configuration-rule"
+
+    filter {
+      prefix = "targets/"
+    }
+
+    expiration {
+      days = 7
+    }
+  }
+}
+
+resource "aws_s3_bucket_acl" "aft-customizations-targets-bucket-acl" {
+  bucket = aws_s3_bucket.aft_customizations_targets_bucket.id
+  acl    = "private"
+}
+
+resource "aws_s3_bucket_public_access_block" "aft-customizations-targets-bucket" {
+  bucket                  = aws_s3_bucket.aft_customizations_targets_bucket.id
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
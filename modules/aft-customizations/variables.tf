@@ -65,6 +65,10 @@ variable "request_metadata_table_name" {
   type = string
 }
 
+variable "account_tag_index_table_name" {
+  type = string
+}
+
 variable "terraform_distribution" {
   type = string
 }
@@ -7,6 +7,12 @@ resource "aws_ssm_parameter" "aft_request_queue_name" {
   value = var.aft_request_queue_name
 }
 
+resource "aws_ssm_parameter" "aft_request_high_priority_queue_name" {
+  name  = "/aft/resources/sqs/aft-request-high-priority-queue-name"
+  type  = "String"
+  value = var.aft_request_high_priority_queue_name
+}
+
 resource "aws_ssm_parameter" "aft_request_table_name" {
   name  = "/aft/resources/ddb/aft-request-table-name"
   type  = "String"
@@ -25,12 +31,36 @@ resource "aws_ssm_parameter" "aft_request_metadata_table_name" {
   value = var.aft_request_metadata_table_name
 }
 
+resource "aws_ssm_parameter" "aft_account_tag_index_table_name" {
+  name  = "/aft/resources/ddb/aft-account-tag-index-table-name"
+  type  = "String"
+  value = var.aft_account_tag_index_table_name
+}
+
 resource "aws_ssm_parameter" "aft_controltower_events_table_name" {
   name  = "/aft/resources/ddb/aft-controltower-events-table-name"
   type  = "String"
   value = var.aft_controltower_events_table_name
 }
 
+resource "aws_ssm_parameter" "aft_provisioning_operations_table_name" {
+  name  = "/aft/resources/ddb/aft-provisioning-operations-table-name"
+  type  = "String"
+  value = var.aft_provisioning_operations_table_name
+}
+
+resource "aws_ssm_parameter" "aft_customization_pipeline_executions_table_name" {
+  name  = "/aft/resources/ddb/aft-customization-pipeline-executions-table-name"
+  type  = "String"
+  value = var.aft_customization_pipeline_executions_table_name
+}
+
+resource "aws_ssm_parameter" "aft_customizations_targets_bucket_name" {
+  name  = "/aft/resources/s3/aft-customizations-targets-bucket-name"
+  type  = "String"
+  value = var.aft_customizations_targets_bucket_name
+}
+
 resource "aws_ssm_parameter" "aft_account_factory_product_name" {
   name  = "/aft/resources/sc/account-factory-product-name"
   type  = "String"
@@ -357,6 +387,25 @@ resource "aws_ssm_parameter" "aft_maximum_concurrent_customizations" {
   type  = "String"
 }
 
+resource "aws_ssm_parameter" "aft_maximum_concurrent_account_factory_operations" {
+  name  = "/aft/config/account-factory/maximum_concurrent_operations"
+  value = var.maximum_concurrent_account_factory_operations
+  type  = "String"
+}
+
+# Recorded by the account request processor once the AFT service role is associated
+# with the Account Factory portfolio, "none" until then
+resource "aws_ssm_parameter" "aft_sc_portfolio_association" {
+  name      = "/aft/resources/sc/account-factory-portfolio-association"
+  value     = "none"
+  type      = "String"
+  overwrite = true
+
+  lifecycle {
+    ignore_changes = [value]
+  }
+}
+
 resource "aws_ssm_parameter" "aft_metrics_reporting" {
   name  = "/aft/config/metrics-reporting"
   value = var.aft_metrics_reporting
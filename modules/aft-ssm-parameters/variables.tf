@@ -5,6 +5,10 @@ variable "aft_request_queue_name" {
   type = string
 }
 
+variable "aft_request_high_priority_queue_name" {
+  type = string
+}
+
 variable "aft_request_table_name" {
   type = string
 }
@@ -17,10 +21,26 @@ variable "aft_request_metadata_table_name" {
   type = string
 }
 
+variable "aft_account_tag_index_table_name" {
+  type = string
+}
+
 variable "aft_controltower_events_table_name" {
   type = string
 }
 
+variable "aft_provisioning_operations_table_name" {
+  type = string
+}
+
+variable "aft_customization_pipeline_executions_table_name" {
+  type = string
+}
+
+variable "aft_customizations_targets_bucket_name" {
+  type = string
+}
+
 variable "account_factory_product_name" {
   type = string
 }
@@ -238,6 +258,10 @@ variable "maximum_concurrent_customizations" {
   type = number
 }
 
+variable "maximum_concurrent_account_factory_operations" {
+  type = number
+}
+
 variable "aft_version" {
   type = string
 }
@@ -37,6 +37,10 @@ output "maximum_concurrent_customizations" {
   value = var.maximum_concurrent_customizations
 }
 
+output "maximum_concurrent_account_factory_operations" {
+  value = var.maximum_concurrent_account_factory_operations
+}
+
 #########################################
 # AFT Feature Flags
 #########################################
@@ -15,11 +15,11 @@ from boto3.session import Session
 from botocore.exceptions import ClientError
 
 if TYPE_CHECKING:
-    from mypy_boto3_dynamodb.type_defs import PutItemOutputTableTypeDef
+    from mypy_boto3_dynamodb.type_defs import PutItemOutputTypeDef
     from mypy_boto3_iam import IAMClient, IAMServiceResource
     from mypy_boto3_organizations.type_defs import TagTypeDef
 else:
-    PutItemOutputTableTypeDef = object
+    PutItemOutputTypeDef = object
     IAMClient = object
     CreateRoleResponseTypeDef = object
     IAMServiceResource = object
@@ -225,7 +225,7 @@ class ProvisionRoles:
 # From persist-metadata Lambda
 def persist_metadata(
     payload: Dict[str, Any], account_info: Dict[str, str], session: Session
-) -> PutItemOutputTableTypeDef:
+) -> PutItemOutputTypeDef:
 
     logger.info("Function Start - persist_metadata")
 
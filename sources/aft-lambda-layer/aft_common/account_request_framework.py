@@ -4,7 +4,7 @@
 import json
 import sys
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from functools import cached_property, partial
 from typing import (
     TYPE_CHECKING,
@@ -16,6 +16,8 @@ from typing import (
     Mapping,
     Optional,
     Sequence,
+    Set,
+    Tuple,
     cast,
 )
 
@@ -29,31 +31,45 @@ from aft_common.exceptions import (
     ServiceRoleNotAssociated,
 )
 from aft_common.organizations import OrganizationsAgent
+from aft_common.service_catalog import ProductCatalog
 from boto3.session import Session
+from botocore.exceptions import ClientError
 
 if TYPE_CHECKING:
-    from mypy_boto3_dynamodb.type_defs import PutItemOutputTypeDef
+    from mypy_boto3_organizations.type_defs import AccountTypeDef
     from mypy_boto3_servicecatalog import ServiceCatalogClient
     from mypy_boto3_servicecatalog.type_defs import (
         ProvisionedProductAttributeTypeDef,
         ProvisioningParameterTypeDef,
         ProvisionProductOutputTypeDef,
         SearchProvisionedProductsOutputTypeDef,
+        UpdateProvisionedProductOutputTypeDef,
         UpdateProvisioningParameterTypeDef,
     )
+    from mypy_boto3_sqs.type_defs import MessageTypeDef
 else:
+    AccountTypeDef = object
+    MessageTypeDef = object
     SearchProvisionedProductsOutputTypeDef = object
-    PutItemOutputTypeDef = object
     ProvisioningParameterTypeDef = object
     ProvisionedProductDetailTypeDef = object
     ProvisionProductOutputTypeDef = object
     UpdateProvisioningParameterTypeDef = object
+    UpdateProvisionedProductOutputTypeDef = object
     ProvisionedProductAttributeTypeDef = object
     ServiceCatalogClient = object
 
 
 logger = utils.get_logger()
 
+ACCOUNT_REQUEST_PRIORITY_HIGH = "high"
+ACCOUNT_REQUEST_PRIORITY_NORMAL = "normal"
+# SSM parameter holding the queue name of each priority lane
+ACCOUNT_REQUEST_PRIORITY_QUEUES = {
+    ACCOUNT_REQUEST_PRIORITY_HIGH: utils.SSM_PARAM_ACCOUNT_REQUEST_HIGH_PRIORITY_QUEUE,
+    ACCOUNT_REQUEST_PRIORITY_NORMAL: utils.SSM_PARAM_ACCOUNT_REQUEST_QUEUE,
+}
+
 
 def get_healthy_ct_product_batch(
     ct_management_session: Session,
@@ -99,147 +115,305 @@ def get_healthy_ct_product_batch(
     return
 
 
-def provisioned_product_exists(record: Dict[str, Any]) -> bool:
-    # Go get all my accounts from SC (Not all PPs)
-    auth = AuthClient()
-    ct_management_session = auth.get_ct_management_session(
-        role_name=ProvisionRoles.SERVICE_ROLE_NAME
-    )
-    account_email = ddb.unmarshal_ddb_item(record["dynamodb"]["NewImage"])[
-        "control_tower_parameters"
-    ]["AccountEmail"]
+class ProvisionedProductEmailIndex:
+    """
+    Account emails of the healthy Account Factory provisioned products. Service
+    Catalog is searched once per index, and product outputs are resolved only as
+    far as needed to find an email, so one index serves a whole batch of account
+    requests.
+    """
 
-    for batch in get_healthy_ct_product_batch(
-        ct_management_session=ct_management_session
-    ):
-        pp_ids = [product["Id"] for product in batch]
+    def __init__(self, ct_management_session: Session) -> None:
+        self.sc_client: ServiceCatalogClient = ct_management_session.client(
+            "servicecatalog"
+        )
+        self._batches = get_healthy_ct_product_batch(
+            ct_management_session=ct_management_session
+        )
+        self._unresolved_product_ids: List[str] = []
+        self._emails: Set[str] = set()
 
-        if email_exists_in_batch(account_email, pp_ids, ct_management_session):
+    def _resolve_email(self, provisioned_product_id: str) -> str:
+        email: str = self.sc_client.get_provisioned_product_outputs(
+            ProvisionedProductId=provisioned_product_id, OutputKeys=["AccountEmail"]
+        )["Outputs"][0]["OutputValue"]
+        return email.lower()
+
+    def contains(self, account_email: str) -> bool:
+        target_email = account_email.lower()
+        if target_email in self._emails:
             return True
+        while True:
+            while self._unresolved_product_ids:
+                email = self._resolve_email(self._unresolved_product_ids.pop(0))
+                self._emails.add(email)
+                if email == target_email:
+                    logger.info(
+                        "Account email match found; provisioned product exists."
+                    )
+                    return True
+            batch = next(self._batches, None)
+            if batch is None:
+                # We processed all batches of accounts with healthy statuses, and did not find a match
+                # It is possible that the account exists, but does not have a healthy status
+                logger.info(
+                    "Did not find account with matching email in healthy status in Account Factory"
+                )
+                return False
+            self._unresolved_product_ids = [product["Id"] for product in batch]
 
-    # We processed all batches of accounts with healthy statuses, and did not find a match
-    # It is possible that the account exists, but does not have a healthy status
-    logger.info(
-        "Did not find account with matching email in healthy status in Account Factory"
-    )
 
-    return False
+def provisioned_product_exists(
+    record: ddb.StreamRecord, provisioned_products: ProvisionedProductEmailIndex
+) -> bool:
+    account_email = record.new_image["control_tower_parameters"]["AccountEmail"]
+    return provisioned_products.contains(account_email)
 
 
-def email_exists_in_batch(
-    target_email: str, pps: List[str], ct_management_session: Session
-) -> bool:
-    sc_client = ct_management_session.client("servicecatalog")
-    for pp in pps:
-        pp_email = sc_client.get_provisioned_product_outputs(
-            ProvisionedProductId=pp, OutputKeys=["AccountEmail"]
-        )["Outputs"][0]["OutputValue"]
-        if target_email.lower() == pp_email.lower():
-            logger.info("Account email match found; provisioned product exists.")
-            return True
-    return False
+def get_account_request_priority(request: Mapping[str, Any]) -> str:
+    """
+    Returns the priority lane of a queued account request: normal for new
+    accounts, high for updates to existing accounts.
+
+    The lane follows from the account alone, so requests for one account never
+    sit in two lanes at once: every request made before the account exists in
+    Account Factory is a new account request, and every request made after it is
+    an update. This keeps them in one FIFO message group, in order, and lets them
+    be coalesced.
+    """
+    if request["operation"] == "UPDATE":
+        return ACCOUNT_REQUEST_PRIORITY_HIGH
+    return ACCOUNT_REQUEST_PRIORITY_NORMAL
 
 
-def insert_msg_into_acc_req_queue(
-    event_record: Dict[Any, Any], new_account: bool, session: Session
-) -> None:
-    sqs_queue = utils.get_ssm_parameter_value(
-        session, utils.SSM_PARAM_ACCOUNT_REQUEST_QUEUE
+def get_account_request_queue(session: Session, priority: str) -> sqs.QueueClient:
+    return sqs.QueueClient.from_ssm_parameter(
+        session, ACCOUNT_REQUEST_PRIORITY_QUEUES[priority]
     )
-    sqs_queue = sqs.build_sqs_url(session=session, queue_name=sqs_queue)
-    message = build_sqs_message(record=event_record, new_account=new_account)
-    sqs.send_sqs_message(session=session, sqs_url=sqs_queue, message=message)
 
 
-def delete_account_request(record: Dict[str, Any]) -> bool:
-    if record["eventName"] == "REMOVE":
+def insert_msgs_into_acc_req_queue(
+    event_records: Sequence[ddb.StreamRecord],
+    new_accounts: Sequence[bool],
+    session: Session,
+) -> List[ddb.StreamRecord]:
+    """
+    Queues the account requests in batches, returns the records whose message
+    could not be sent
+    """
+    if not event_records:
+        return []
+    # Record indexes per priority lane, in stream order
+    lanes: Dict[str, List[int]] = {}
+    messages = []
+    for index, (event_record, new_account) in enumerate(
+        zip(event_records, new_accounts)
+    ):
+        message = build_sqs_message(record=event_record, new_account=new_account)
+        messages.append(message)
+        lanes.setdefault(message["priority"], []).append(index)
+
+    failed: List[int] = []
+    for priority, indexes in lanes.items():
+        queue = get_account_request_queue(session, priority)
+        lane_failed = queue.send_messages(
+            messages=[messages[index] for index in indexes],
+            deduplication_scopes=[
+                event_records[index].sequence_number for index in indexes
+            ],
+        )
+        failed.extend(indexes[lane_index] for lane_index in lane_failed)
+    return [event_records[index] for index in sorted(failed)]
+
+
+def delete_account_request(record: ddb.StreamRecord) -> bool:
+    if record.event_name == "REMOVE":
         return True
     return False
 
 
-def control_tower_param_changed(record: Dict[str, Any]) -> bool:
-    if record["eventName"] == "MODIFY":
-        old_image = ddb.unmarshal_ddb_item(record["dynamodb"]["OldImage"])[
-            "control_tower_parameters"
-        ]
-        new_image = ddb.unmarshal_ddb_item(record["dynamodb"]["NewImage"])[
-            "control_tower_parameters"
-        ]
+def control_tower_param_changed(record: ddb.StreamRecord) -> bool:
+    if record.event_name == "MODIFY":
+        old_image = record.old_image["control_tower_parameters"]
+        new_image = record.new_image["control_tower_parameters"]
 
         if old_image != new_image:
             return True
     return False
 
 
-def build_sqs_message(record: Dict[str, Any], new_account: bool) -> Dict[str, Any]:
+def build_sqs_message(record: ddb.StreamRecord, new_account: bool) -> Dict[str, Any]:
     logger.info("Building SQS Message - ")
     message = {}
     operation = "ADD" if new_account else "UPDATE"
 
-    new_image = ddb.unmarshal_ddb_item(record["dynamodb"]["NewImage"])
     message["operation"] = operation
-    message["control_tower_parameters"] = new_image["control_tower_parameters"]
+    message["control_tower_parameters"] = record.new_image["control_tower_parameters"]
+
+    if record.event_name == "MODIFY":
+        message["old_control_tower_parameters"] = record.old_image[
+            "control_tower_parameters"
+        ]
 
-    if record["eventName"] == "MODIFY":
-        old_image = ddb.unmarshal_ddb_item(record["dynamodb"]["OldImage"])
-        message["old_control_tower_parameters"] = old_image["control_tower_parameters"]
+    message["priority"] = get_account_request_priority(message)
 
     logger.info(message)
     return message
 
 
+def fold_account_requests(requests: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Folds queued requests for one account, oldest first, into a single request for
+    the latest desired state. The operation and old_control_tower_parameters are
+    those of the oldest request, which describe the account as it was before any
+    of the folded changes.
+    """
+    folded = dict(requests[-1])
+    folded["operation"] = requests[0]["operation"]
+    folded.pop("old_control_tower_parameters", None)
+    if folded["operation"] == "UPDATE":
+        for request in requests:
+            if "old_control_tower_parameters" in request:
+                folded["old_control_tower_parameters"] = request[
+                    "old_control_tower_parameters"
+                ]
+                break
+    return folded
+
+
+def coalesce_account_request_messages(
+    sqs_messages: Sequence[MessageTypeDef],
+) -> List[Tuple[Dict[str, Any], List[MessageTypeDef]]]:
+    """
+    Groups received account request messages by account email, in order of first
+    arrival, and folds each group into one request. Returns each folded request
+    with the messages it replaces.
+    """
+    grouped: Dict[str, List[MessageTypeDef]] = {}
+    requests: Dict[str, List[Dict[str, Any]]] = {}
+    for sqs_message in sqs_messages:
+        request = json.loads(sqs_message["Body"])
+        account_email = request["control_tower_parameters"]["AccountEmail"]
+        key = account_email.strip().lower()
+        grouped.setdefault(key, []).append(sqs_message)
+        requests.setdefault(key, []).append(request)
+
+    coalesced = []
+    for key, account_messages in grouped.items():
+        if len(account_messages) > 1:
+            logger.info(
+                f"Coalescing {len(account_messages)} pending requests for {key}"
+            )
+        coalesced.append((fold_account_requests(requests[key]), account_messages))
+    return coalesced
+
+
 def build_aft_account_provisioning_framework_event(
-    record: Dict[str, Any]
+    record: ddb.StreamRecord,
 ) -> Dict[str, Any]:
-    account_request = ddb.unmarshal_ddb_item(record["dynamodb"]["NewImage"])
     aft_account_provisioning_framework_event = {
-        "account_request": account_request,
+        "account_request": record.new_image,
         "control_tower_event": {},
     }
     logger.info(aft_account_provisioning_framework_event)
     return aft_account_provisioning_framework_event
 
 
-def put_audit_record(
-    session: Session, table: str, image: Dict[str, Any], event_name: str
-) -> PutItemOutputTypeDef:
-    dynamodb = session.client("dynamodb")
-    item = image
+def build_audit_record(
+    image: Mapping[str, Any], event_name: str, timestamp: datetime
+) -> Dict[str, Any]:
     datetime_format = "%Y-%m-%dT%H:%M:%S.%f"
-    current_time = datetime.now().strftime(datetime_format)
-    item["timestamp"] = {"S": current_time}
+    item = dict(image)
+    item["timestamp"] = {"S": timestamp.strftime(datetime_format)}
     item["ddb_event_name"] = {"S": event_name}
-    logger.info("Inserting item into " + table + " table: " + str(item))
-    response = dynamodb.put_item(TableName=table, Item=item)
-    logger.info(response)
-    return response
+    return item
 
 
-def account_name_or_email_in_use(
-    ct_management_session: Session, account_name: str, account_email: str
-) -> bool:
-    orgs = ct_management_session.client("organizations")
-    paginator = orgs.get_paginator("list_accounts")
-    for page in paginator.paginate():
-        for account in page["Accounts"]:
-            if account_name == account["Name"]:
-                logger.error(
-                    f"Account Name: {account_name} already used in Organizations"
-                )
-                return True
-            if account_email == account["Email"]:
-                logger.error(
-                    f"Account Email: {account_email} already used in Organizations"
-                )
-                return True
+def put_audit_records(
+    session: Session, table: str, records: Sequence[ddb.StreamRecord]
+) -> List[ddb.StreamRecord]:
+    """
+    Writes an audit item for each stream record, returns the records whose item
+    could not be written
+    """
+    # Records can share a request id within a batch; give each one its own
+    # timestamp so the (id, timestamp) keys in a batch are unique
+    current_time = datetime.now()
+    items = []
+    for index, record in enumerate(records):
+        image = (
+            record.record["dynamodb"]["OldImage"]
+            if record.event_name == "REMOVE"
+            else record.record["dynamodb"]["NewImage"]
+        )
+        items.append(
+            build_audit_record(
+                image, record.event_name, current_time + timedelta(microseconds=index)
+            )
+        )
+    logger.info(f"Inserting {len(items)} items into {table} table")
+    failed = ddb.batch_write_ddb_items(session, table, items)
+    return [records[index] for index in failed]
 
-    return False
+
+class AccountNameEmailIndex:
+    """
+    Account name and email lookups built from a single listing of the Organization
+    and shared across a batch of account requests. Requests validated through the
+    index are added to it, so collisions between requests in the same batch are
+    detected as well.
+    """
+
+    def __init__(self, ct_management_session: Session) -> None:
+        self.ct_management_session = ct_management_session
+
+    @cached_property
+    def _accounts(self) -> List[AccountTypeDef]:
+        orgs_agent = OrganizationsAgent(self.ct_management_session)
+        return orgs_agent.get_all_org_accounts()
+
+    @cached_property
+    def account_names(self) -> Set[str]:
+        return {account["Name"] for account in self._accounts}
+
+    @cached_property
+    def account_emails(self) -> Set[str]:
+        return {account["Email"].lower() for account in self._accounts}
+
+    def name_or_email_in_use(self, account_name: str, account_email: str) -> bool:
+        if account_name in self.account_names:
+            logger.error(f"Account Name: {account_name} already used in Organizations")
+            return True
+        if account_email.lower() in self.account_emails:
+            logger.error(
+                f"Account Email: {account_email} already used in Organizations"
+            )
+            return True
+        return False
+
+    def claim(self, account_name: str, account_email: str) -> bool:
+        """
+        Reserves an account name and email for a request in the current batch,
+        returns False if either is already in use
+        """
+        if self.name_or_email_in_use(
+            account_name=account_name, account_email=account_email
+        ):
+            return False
+        self.account_names.add(account_name)
+        self.account_emails.add(account_email.lower())
+        return True
 
 
-def new_ct_request_is_valid(session: Session, request: Dict[str, Any]) -> bool:
+def new_ct_request_is_valid(
+    session: Session,
+    request: Dict[str, Any],
+    account_index: Optional[AccountNameEmailIndex] = None,
+) -> bool:
+    if account_index is None:
+        account_index = AccountNameEmailIndex(session)
     ct_parameters = request["control_tower_parameters"]
-    return not account_name_or_email_in_use(
-        ct_management_session=session,
+    return account_index.claim(
         account_name=ct_parameters["AccountName"],
         account_email=ct_parameters["AccountEmail"],
     )
@@ -293,24 +467,27 @@ def create_new_account(
     provisioned_product_name = create_provisioned_product_name(
         account_name=request["control_tower_parameters"]["AccountName"]
     )
-    response = client.provision_product(
-        ProductId=utils.get_ct_product_id(session, ct_management_session),
-        ProvisioningArtifactId=utils.get_ct_provisioning_artifact_id(
-            session, ct_management_session
-        ),
-        ProvisionedProductName=provisioned_product_name,
-        ProvisioningParameters=cast(
-            Sequence[ProvisioningParameterTypeDef], provisioning_parameters
-        ),
-        ProvisionToken=str(uuid.uuid1()),
-    )
+    product_catalog = ProductCatalog.get(session, ct_management_session)
+    try:
+        response = client.provision_product(
+            ProductId=product_catalog.product_id,
+            ProvisioningArtifactId=product_catalog.active_provisioning_artifact_id,
+            ProvisionedProductName=provisioned_product_name,
+            ProvisioningParameters=cast(
+                Sequence[ProvisioningParameterTypeDef], provisioning_parameters
+            ),
+            ProvisionToken=str(uuid.uuid1()),
+        )
+    except ClientError as error:
+        ProductCatalog.invalidate_if_stale(error)
+        raise
     logger.info(response)
     return response
 
 
 def update_existing_account(
     session: Session, ct_management_session: Session, request: Dict[str, Any]
-) -> None:
+) -> UpdateProvisionedProductOutputTypeDef:
     client = ct_management_session.client("servicecatalog")
     event_system = client.meta.events
 
@@ -351,15 +528,14 @@ def update_existing_account(
         )
 
     # check to see if the product still exists and is still active
-    if utils.ct_provisioning_artifact_is_active(
-        session=session,
-        ct_management_session=ct_management_session,
-        artifact_id=target_product["ProvisioningArtifactId"],
+    product_catalog = ProductCatalog.get(session, ct_management_session)
+    if product_catalog.provisioning_artifact_is_active(
+        target_product["ProvisioningArtifactId"]
     ):
         target_provisioning_artifact_id = target_product["ProvisioningArtifactId"]
     else:
-        target_provisioning_artifact_id = utils.get_ct_provisioning_artifact_id(
-            session, ct_management_session
+        target_provisioning_artifact_id = (
+            product_catalog.active_provisioning_artifact_id
         )
 
     logger.info(
@@ -368,14 +544,19 @@ def update_existing_account(
         + " with provisioned product ID "
         + target_product["Id"]
     )
-    update_response = client.update_provisioned_product(
-        ProvisionedProductId=target_product["Id"],
-        ProductId=utils.get_ct_product_id(session, ct_management_session),
-        ProvisioningArtifactId=target_provisioning_artifact_id,
-        ProvisioningParameters=provisioning_parameters,
-        UpdateToken=str(uuid.uuid1()),
-    )
+    try:
+        update_response = client.update_provisioned_product(
+            ProvisionedProductId=target_product["Id"],
+            ProductId=product_catalog.product_id,
+            ProvisioningArtifactId=target_provisioning_artifact_id,
+            ProvisioningParameters=provisioning_parameters,
+            UpdateToken=str(uuid.uuid1()),
+        )
+    except ClientError as error:
+        ProductCatalog.invalidate_if_stale(error)
+        raise
     logger.info(update_response)
+    return update_response
 
 
 def get_account_request_record(
@@ -399,6 +580,32 @@ def get_account_request_record(
         sys.exit(1)
 
 
+def get_account_request_records(
+    aft_management_session: Session, emails: Sequence[str]
+) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+    """
+    Returns the account request records found for the emails, by email, and the
+    set of emails that have no record
+    """
+    table_name = utils.get_ssm_parameter_value(
+        aft_management_session, utils.SSM_PARAM_AFT_DDB_REQ_TABLE
+    )
+    unique_emails = list(dict.fromkeys(emails))
+    logger.info(
+        f"Getting records for {len(unique_emails)} ids in DDB table {table_name}"
+    )
+    items = ddb.batch_get_ddb_items(
+        aft_management_session,
+        table_name,
+        [{"id": email} for email in unique_emails],
+    )
+    records = {item["id"]: item for item in items}
+    missing = {email for email in unique_emails if email not in records}
+    if missing:
+        logger.info(f"Records not found in DDB table: {sorted(missing)}")
+    return records, missing
+
+
 def build_account_customization_payload(
     ct_management_session: Session,
     account_id: str,
@@ -436,10 +643,11 @@ class AccountRequest:
             session=self.ct_management_session
         )
         self.aft_management_session = auth.get_aft_management_session()
-        self.account_factory_product_id = utils.get_ct_product_id(
-            session=self.aft_management_session,
+        self.product_catalog = ProductCatalog.get(
+            aft_management_session=self.aft_management_session,
             ct_management_session=self.ct_management_session,
         )
+        self.account_factory_product_id = self.product_catalog.product_id
 
         self.partition = utils.get_aws_partition(self.ct_management_session)
 
@@ -450,14 +658,14 @@ class AccountRequest:
     @cached_property
     def account_factory_portfolio_id(self) -> str:
         """
-        Paginates through all portfolios and returns the ID of the CT Account Factory Portfolio
-        if it exists, raises exception if not found
+        Returns the ID of the CT Account Factory Portfolio among the portfolios the
+        Account Factory product belongs to, raises exception if not found
         """
         client: ServiceCatalogClient = self.ct_management_session.client(
             "servicecatalog"
         )
-        paginator = client.get_paginator("list_portfolios")
-        for response in paginator.paginate():
+        paginator = client.get_paginator("list_portfolios_for_product")
+        for response in paginator.paginate(ProductId=self.account_factory_product_id):
             for portfolio in response["PortfolioDetails"]:
                 if (
                     portfolio["DisplayName"]
@@ -469,6 +677,61 @@ class AccountRequest:
             f"No Portfolio ID found for {AccountRequest.ACCOUNT_FACTORY_PORTFOLIO_NAME}"
         )
 
+    def get_portfolio_association(self) -> Optional[Dict[str, str]]:
+        """
+        Returns the Account Factory product and portfolio the AFT service role was
+        last associated with, as recorded by
+        ensure_aft_service_role_associated_with_account_factory, or None if no
+        association is recorded yet
+        """
+        value = utils.get_ssm_parameter_value(
+            self.aft_management_session, utils.SSM_PARAM_SC_PORTFOLIO_ASSOCIATION
+        )
+        try:
+            association: Dict[str, str] = json.loads(value)
+        except json.JSONDecodeError:
+            # Placeholder value set by Terraform
+            return None
+        return association
+
+    def ensure_aft_service_role_associated_with_account_factory(self) -> None:
+        """
+        Associates the AWSAFTService role with the Control Tower Account Factory
+        portfolio unless an association is recorded for the current Account Factory
+        product and portfolio, in which case only the portfolio lookup is made. Set
+        the SSM_PARAM_SC_PORTFOLIO_ASSOCIATION parameter to "none" to force a new check.
+        """
+        association = self.get_portfolio_association()
+        portfolio_id = self.account_factory_portfolio_id
+        if (
+            association is not None
+            and association.get("product_id") == self.account_factory_product_id
+            and association.get("portfolio_id") == portfolio_id
+        ):
+            return None
+
+        if self.service_role_associated_with_account_factory():
+            logger.info(
+                f"{ProvisionRoles.SERVICE_ROLE_NAME} already associated with portfolio {portfolio_id}"
+            )
+        else:
+            logger.info(
+                f"Associating {ProvisionRoles.SERVICE_ROLE_NAME} with portfolio {portfolio_id}"
+            )
+            self.associate_aft_service_role_with_account_factory()
+
+        self.aft_management_session.client("ssm").put_parameter(
+            Name=utils.SSM_PARAM_SC_PORTFOLIO_ASSOCIATION,
+            Value=json.dumps(
+                {
+                    "product_id": self.account_factory_product_id,
+                    "portfolio_id": portfolio_id,
+                }
+            ),
+            Type="String",
+            Overwrite=True,
+        )
+
     def associate_aft_service_role_with_account_factory(self) -> None:
         """
         Associates the AWSAFTService role with the Control Tower Account Factory Service Catalog portfolio
@@ -499,7 +762,7 @@ class AccountRequest:
                 return True
         return False
 
-    def provisioning_in_progress(self) -> bool:
+    def get_in_progress_provisioned_product_ids(self) -> List[str]:
         client: ServiceCatalogClient = self.ct_management_session.client(
             "servicecatalog"
         )
@@ -516,12 +779,12 @@ class AccountRequest:
             )
             pps.extend(response["ProvisionedProducts"])
 
+        in_progress_ids = []
         for p in pps:
             if p["ProductId"] == self.account_factory_product_id:
                 logger.info("Identified CT Product - " + p["Id"])
                 if p["Status"] in ["UNDER_CHANGE", "PLAN_IN_PROGRESS"]:
-                    logger.info("Product provisioning in Progress")
-                    return True
+                    logger.info("Product provisioning in Progress - " + p["Id"])
+                    in_progress_ids.append(p["Id"])
 
-        logger.info("No product provisioning in Progress")
-        return False
+        return in_progress_ids
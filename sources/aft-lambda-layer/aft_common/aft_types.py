@@ -1,7 +1,7 @@
 # Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
-from typing import Any, Dict, Literal, TypedDict
+from typing import Any, Dict, List, Literal, TypedDict
 
 
 class AftAccountInfo(TypedDict):
@@ -22,3 +22,19 @@ class AftInvokeAccountCustomizationPayload(TypedDict):
     account_request: Dict[str, Any]
     control_tower_event: Dict[str, Any]
     account_provisioning: Dict[str, Any]
+
+
+class TargetPlan(TypedDict):
+    target_accounts: List[str]
+    # Include clauses that matched each target account
+    reasons: Dict[str, List[str]]
+
+
+class ArtifactReference(TypedDict):
+    # Location of the artifact, such as s3://<bucket>/<prefix>
+    uri: str
+    item_count: int
+    page_size: int
+    page_numbers: List[int]
+    # gzip or none
+    compression: str
@@ -2,15 +2,20 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import os
+import time
 from typing import (
     IO,
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
+    Generic,
     Iterable,
     List,
     Optional,
     Sequence,
+    Tuple,
+    TypeVar,
     Union,
     cast,
 )
@@ -21,16 +26,12 @@ from botocore.response import StreamingBody
 if TYPE_CHECKING:
     from mypy_boto3_lambda import LambdaClient
     from mypy_boto3_lambda.type_defs import InvocationResponseTypeDef
-    from mypy_boto3_organizations import OrganizationsClient
-    from mypy_boto3_servicecatalog import ServiceCatalogClient
     from mypy_boto3_stepfunctions import SFNClient
     from mypy_boto3_stepfunctions.type_defs import StartExecutionOutputTypeDef
     from mypy_boto3_sts import STSClient
 else:
     LambdaClient = object
     InvocationResponseTypeDef = object
-    OrganizationsClient = object
-    ServiceCatalogClient = object
     SFNClient = object
     StartExecutionOutputTypeDef = object
     STSClient = object
@@ -42,9 +43,16 @@ SSM_PARAM_AFT_SESSION_NAME = "/aft/resources/iam/aft-session-name"
 SSM_PARAM_AFT_ADMIN_ROLE = "/aft/resources/iam/aft-administrator-role-name"
 SSM_PARAM_AFT_EXEC_ROLE = "/aft/resources/iam/aft-execution-role-name"
 SSM_PARAM_SC_PRODUCT_NAME = "/aft/resources/sc/account-factory-product-name"
+# Written by the account request processor, not Terraform
+SSM_PARAM_SC_PORTFOLIO_ASSOCIATION = (
+    "/aft/resources/sc/account-factory-portfolio-association"
+)
 SSM_PARAM_SNS_TOPIC_ARN = "/aft/account/aft-management/sns/topic-arn"
 SSM_PARAM_SNS_FAILURE_TOPIC_ARN = "/aft/account/aft-management/sns/failure-topic-arn"
 SSM_PARAM_ACCOUNT_REQUEST_QUEUE = "/aft/resources/sqs/aft-request-queue-name"
+SSM_PARAM_ACCOUNT_REQUEST_HIGH_PRIORITY_QUEUE = (
+    "/aft/resources/sqs/aft-request-high-priority-queue-name"
+)
 SSM_PARAM_AFT_ACCOUNT_PROVISIONING_FRAMEWORK_LAMBDA = (
     "/aft/resources/lambda/aft-invoke-aft-account-provisioning-framework"
 )
@@ -54,6 +62,18 @@ SSM_PARAM_AFT_SFN_NAME = (
 )
 SSM_PARAM_AFT_DDB_REQ_TABLE = "/aft/resources/ddb/aft-request-table-name"
 SSM_PARAM_AFT_DDB_AUDIT_TABLE = "/aft/resources/ddb/aft-request-audit-table-name"
+SSM_PARAM_AFT_DDB_PROVISIONING_OPERATIONS_TABLE = (
+    "/aft/resources/ddb/aft-provisioning-operations-table-name"
+)
+SSM_PARAM_AFT_DDB_CUSTOMIZATION_PIPELINE_EXECUTIONS_TABLE = (
+    "/aft/resources/ddb/aft-customization-pipeline-executions-table-name"
+)
+SSM_PARAM_AFT_DDB_ACCOUNT_TAG_INDEX_TABLE = (
+    "/aft/resources/ddb/aft-account-tag-index-table-name"
+)
+SSM_PARAM_AFT_S3_CUSTOMIZATIONS_TARGETS_BUCKET = (
+    "/aft/resources/s3/aft-customizations-targets-bucket-name"
+)
 SSM_PARAM_AFT_REQUEST_ACTION_TRIGGER_FUNCTION_ARN = (
     "/aft/resources/lambda/aft-account-request-action-trigger-function-arn"
 )
@@ -83,6 +103,9 @@ SSM_PARAM_AFT_ACCOUNT_PROVISIONING_FRAMEWORK_NOTIFY_SUCCESS_FUNCTION_ARN = "/aft
 SSM_PARAM_AFT_MAXIMUM_CONCURRENT_CUSTOMIZATIONS = (
     "/aft/config/customizations/maximum_concurrent_customizations"
 )
+SSM_PARAM_AFT_MAXIMUM_CONCURRENT_ACCOUNT_FACTORY_OPERATIONS = (
+    "/aft/config/account-factory/maximum_concurrent_operations"
+)
 SSM_PARAM_FEATURE_CLOUDTRAIL_DATA_EVENTS_ENABLED = (
     "/aft/config/feature/cloudtrail-data-events-enabled"
 )
@@ -130,56 +153,45 @@ def get_ssm_parameter_value(session: Session, param: str, decrypt: bool = False)
     return param_value
 
 
-def get_ct_product_id(session: Session, ct_management_session: Session) -> str:
-    client: ServiceCatalogClient = ct_management_session.client("servicecatalog")
-    sc_product_name = get_ssm_parameter_value(session, SSM_PARAM_SC_PRODUCT_NAME)
-    logger.info("Getting product ID for " + sc_product_name)
-
-    response = client.describe_product_as_admin(Name=sc_product_name)
-    product_id: str = response["ProductViewDetail"]["ProductViewSummary"]["ProductId"]
-    logger.info(product_id)
-    return product_id
-
-
-def get_ct_provisioning_artifact_id(
-    session: Session, ct_management_session: Session
-) -> str:
-    client: ServiceCatalogClient = ct_management_session.client("servicecatalog")
-    sc_product_name = get_ssm_parameter_value(session, SSM_PARAM_SC_PRODUCT_NAME)
-    logger.info("Getting provisioning artifact ID for " + sc_product_name)
-
-    response = client.describe_product_as_admin(Name=sc_product_name)
-    provisioning_artifacts = response["ProvisioningArtifactSummaries"]
-    for pa in provisioning_artifacts:
-        if ct_provisioning_artifact_is_active(session, ct_management_session, pa["Id"]):
-            pa_id: str = pa["Id"]
-            logger.info("Using provisioning artifact ID: " + pa_id)
-            return pa_id
-
-    raise Exception("No Provisioning Artifact ID found")
-
-
-def ct_provisioning_artifact_is_active(
-    session: Session, ct_management_session: Session, artifact_id: str
-) -> bool:
-    client: ServiceCatalogClient = ct_management_session.client("servicecatalog")
-    sc_product_name = get_ssm_parameter_value(session, SSM_PARAM_SC_PRODUCT_NAME)
-    logger.info("Checking provisioning artifact ID " + artifact_id)
-    try:
-        response = client.describe_provisioning_artifact(
-            ProductName=sc_product_name, ProvisioningArtifactId=artifact_id
-        )
-        provisioning_artifact = response["ProvisioningArtifactDetail"]
-    except client.exceptions.ResourceNotFoundException:
-        logger.info("Provisioning artifact id: " + artifact_id + " does not exist")
-        return False
-
-    if provisioning_artifact["Active"]:
-        logger.info(provisioning_artifact["Id"] + " is active")
-        return True
-    else:
-        logger.info(provisioning_artifact["Id"] + " is NOT active")
-        return False
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """
+    Values cached for the lifetime of the Lambda execution environment, fetched
+    again once they are older than ttl_seconds
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, T]] = {}
+
+    def get(self, key: str, fetch: Callable[[], T]) -> T:
+        now = time.monotonic()
+        cached = self._entries.get(key)
+        if cached is not None and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+        value = fetch()
+        self._entries[key] = (now, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+SSM_PARAMETER_CACHE_TTL_SECONDS = 300
+_ssm_parameter_cache: TTLCache[str] = TTLCache(SSM_PARAMETER_CACHE_TTL_SECONDS)
+
+
+def get_cached_ssm_parameter_value(session: Session, param: str) -> str:
+    """
+    Returns a parameter value from the in-memory cache, fetching it again once it
+    is older than SSM_PARAMETER_CACHE_TTL_SECONDS. Meant for configuration that
+    only changes on deployment, such as resource names.
+    """
+    return _ssm_parameter_cache.get(
+        param, lambda: get_ssm_parameter_value(session, param)
+    )
 
 
 def invoke_lambda(
@@ -233,6 +245,19 @@ def is_aft_supported_controltower_event(event: Dict[str, Any]) -> bool:
     return False
 
 
+def get_controltower_event_account(event: Dict[str, Any]) -> Dict[str, str]:
+    # Different CT events have different data structures - map them for easier access
+    event_name_to_event_detail_key_map = {
+        "CreateManagedAccount": "createManagedAccountStatus",
+        "UpdateManagedAccount": "updateManagedAccountStatus",
+    }
+    event_name = event["detail"]["eventName"]
+    account: Dict[str, str] = event["detail"]["serviceEventDetails"][
+        event_name_to_event_detail_key_map[event_name]
+    ]["account"]
+    return account
+
+
 def get_all_aft_account_ids(aft_management_session: Session) -> List[str]:
     table_name = get_ssm_parameter_value(
         aft_management_session, SSM_PARAM_AFT_DDB_META_TABLE
@@ -261,44 +286,6 @@ def get_all_aft_account_ids(aft_management_session: Session) -> List[str]:
     return aft_account_ids
 
 
-def get_accounts_by_tags(
-    aft_mgmt_session: Session, ct_mgmt_session: Session, tags: List[Dict[str, str]]
-) -> Optional[List[str]]:
-    logger.info("Getting Account with tags - " + str(tags))
-    # Get all AFT Managed Accounts
-    all_accounts = get_all_aft_account_ids(aft_mgmt_session)
-    matched_accounts = []
-    client: OrganizationsClient = ct_mgmt_session.client("organizations")
-    # Loop through AFT accounts, requesting tags
-    if all_accounts is None:
-        return None
-
-    for a in all_accounts:
-        account_tags = {}
-        response = client.list_tags_for_resource(ResourceId=a)
-        # Format tags as a dictionary rather than a list
-        for t in response["Tags"]:
-            account_tags[t["Key"]] = t["Value"]
-        logger.info("Account tags for " + a + ": " + str(account_tags))
-        counter = 0
-        # Loop through tag filter. Append account to matched_accounts if all tags in filter match/ are present
-        for x in tags:
-            for k, v in x.items():
-                if k in account_tags.keys():
-                    if account_tags[k] == v:
-                        counter += 1
-                        if counter == len(tags):
-                            logger.info(
-                                "Account " + a + " MATCHED with tags " + str(tags)
-                            )
-                            matched_accounts.append(a)
-    logger.info(matched_accounts)
-    if len(matched_accounts) > 0:
-        return matched_accounts
-    else:
-        return None
-
-
 def get_session_info(session: Session) -> Dict[str, str]:
     client: STSClient = session.client("sts")
     response = client.get_caller_identity()
@@ -0,0 +1,115 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import gzip
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Protocol, Sequence, Tuple
+from urllib.parse import urlparse
+
+from aft_common import aft_utils as utils
+from aft_common.aft_types import ArtifactReference
+from boto3.session import Session
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3 import S3Client
+else:
+    S3Client = object
+
+logger = utils.get_logger()
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_NONE = "none"
+
+DEFAULT_PAGE_SIZE = 25
+# Results larger than this are offloaded even when not requested, leaving room
+# under the 256 KB Step Functions payload limit for the rest of the state
+INLINE_RESULT_LIMIT_BYTES = 128 * 1024
+
+
+class ObjectStore(Protocol):
+    def put(self, key: str, body: bytes) -> None:
+        ...
+
+    def get(self, key: str) -> bytes:
+        ...
+
+
+class S3ObjectStore:
+    def __init__(self, session: Session, bucket: str) -> None:
+        self.client: S3Client = session.client("s3")
+        self.bucket = bucket
+
+    def put(self, key: str, body: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+    def get(self, key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        body: bytes = response["Body"].read()
+        return body
+
+
+# Object stores by URI scheme, each built from a session and the URI's location
+OBJECT_STORES: Dict[str, Callable[[Session, str], ObjectStore]] = {
+    "s3": S3ObjectStore,
+}
+
+
+def get_object_store(session: Session, uri: str) -> Tuple[ObjectStore, str]:
+    """
+    Returns the object store an artifact URI points to, and the key prefix of
+    the artifact within it
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme not in OBJECT_STORES:
+        raise ValueError(f"Unsupported artifact store {parsed.scheme}")
+    store = OBJECT_STORES[parsed.scheme](session, parsed.netloc)
+    return store, parsed.path.strip("/")
+
+
+def get_page_key(prefix: str, page_number: int, compression: str) -> str:
+    key = f"{prefix}/page-{page_number:05d}.json"
+    if compression == COMPRESSION_GZIP:
+        key += ".gz"
+    return key
+
+
+def write_artifact(
+    session: Session,
+    uri: str,
+    items: Sequence[Any],
+    page_size: int,
+    compress: bool = True,
+) -> ArtifactReference:
+    """
+    Writes items to an object store as pages of at most page_size items, and
+    returns a reference to pass in their place
+    """
+    store, prefix = get_object_store(session, uri)
+    compression = COMPRESSION_GZIP if compress else COMPRESSION_NONE
+    page_numbers = []
+    for page_number, start in enumerate(range(0, len(items), page_size)):
+        body = json.dumps(items[start : start + page_size]).encode("utf-8")
+        if compress:
+            body = gzip.compress(body)
+        store.put(get_page_key(prefix, page_number, compression), body)
+        page_numbers.append(page_number)
+
+    logger.info(f"Wrote {len(items)} items in {len(page_numbers)} pages to {uri}")
+    return ArtifactReference(
+        uri=uri,
+        item_count=len(items),
+        page_size=page_size,
+        page_numbers=page_numbers,
+        compression=compression,
+    )
+
+
+def read_page(
+    session: Session, reference: ArtifactReference, page_number: int
+) -> List[Any]:
+    store, prefix = get_object_store(session, reference["uri"])
+    body = store.get(get_page_key(prefix, page_number, reference["compression"]))
+    if reference["compression"] == COMPRESSION_GZIP:
+        body = gzip.decompress(body)
+    page: List[Any] = json.loads(body)
+    return page
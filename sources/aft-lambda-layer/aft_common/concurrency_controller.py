@@ -0,0 +1,258 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from aft_common import aft_utils as utils
+from boto3.session import Session
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from mypy_boto3_cloudwatch import CloudWatchClient
+    from mypy_boto3_dynamodb.service_resource import Table
+else:
+    CloudWatchClient = object
+    Table = object
+
+logger = utils.get_logger()
+
+WINDOW_ATTRIBUTES = [
+    "window_completed",
+    "window_failed",
+    "window_duration_seconds",
+    "window_throttled",
+    "window_queued_builds",
+    "window_queued_seconds",
+]
+
+
+class ConcurrencyController:
+    """
+    Adjusts how many customization pipelines may run at once with additive
+    increase, multiplicative decrease (AIMD), up to the configured maximum.
+
+    Pipeline completions, start throttles and CodeBuild queue times are added to
+    window counters in the customization pipeline executions table as they are
+    observed. At most once per adjustment interval the window is evaluated: the
+    limit is halved if pipelines failed, were throttled, queued in CodeBuild or
+    ran markedly slower than usual, and raised by one if pipelines completed
+    without any of those. The window counters are then reset.
+    """
+
+    ITEM_ID = "concurrency-controller"
+    ADJUSTMENT_INTERVAL_SECONDS = 5 * 60
+
+    MINIMUM_LIMIT = 1
+    INCREASE_STEP = 1
+    DECREASE_FACTOR = 0.5
+
+    # Completions needed before failure rate and durations are taken into account
+    MINIMUM_SAMPLES = 3
+    FAILURE_RATE_THRESHOLD = 0.25
+    QUEUE_TIME_THRESHOLD_SECONDS = 120
+    # Average duration, relative to the moving baseline, that signals contention
+    DURATION_INFLATION_THRESHOLD = 1.5
+    BASELINE_WEIGHT = 0.2
+
+    METRIC_NAMESPACE = "AFT/Customizations"
+
+    def __init__(self, aft_management_session: Session) -> None:
+        self.session = aft_management_session
+        table_name = utils.get_cached_ssm_parameter_value(
+            aft_management_session,
+            utils.SSM_PARAM_AFT_DDB_CUSTOMIZATION_PIPELINE_EXECUTIONS_TABLE,
+        )
+        self.table: Table = aft_management_session.resource("dynamodb").Table(
+            table_name
+        )
+
+    @cached_property
+    def ceiling(self) -> int:
+        return int(
+            utils.get_cached_ssm_parameter_value(
+                self.session, utils.SSM_PARAM_AFT_MAXIMUM_CONCURRENT_CUSTOMIZATIONS
+            )
+        )
+
+    def get_item(self) -> Optional[Dict[str, Any]]:
+        response = self.table.get_item(
+            Key={"id": ConcurrencyController.ITEM_ID}, ConsistentRead=True
+        )
+        return response.get("Item")
+
+    def get_limit(self) -> int:
+        item = self.get_item()
+        if item is None or "limit" not in item:
+            return self.ceiling
+        return min(int(item["limit"]), self.ceiling)
+
+    def _record(self, counters: Dict[str, int]) -> None:
+        self.table.update_item(
+            Key={"id": ConcurrencyController.ITEM_ID},
+            UpdateExpression="ADD " + ", ".join(f"{name} :{name}" for name in counters),
+            ExpressionAttributeValues={
+                f":{name}": value for name, value in counters.items()
+            },
+        )
+
+    def record_completion(self, duration_seconds: int, failed: bool) -> None:
+        self._record(
+            {
+                "window_completed": 1,
+                "window_failed": int(failed),
+                "window_duration_seconds": max(duration_seconds, 0),
+            }
+        )
+
+    def record_throttles(self, count: int) -> None:
+        if count:
+            self._record({"window_throttled": count})
+
+    def record_queue_time(self, queued_seconds: int) -> None:
+        self._record(
+            {"window_queued_builds": 1, "window_queued_seconds": queued_seconds}
+        )
+
+    def evaluate(
+        self, limit: int, window: Dict[str, int], baseline: Optional[float]
+    ) -> Tuple[int, Optional[float], str]:
+        """
+        Returns the next limit, the next baseline duration and the reason
+        """
+        completed = window["window_completed"]
+        signals = []
+        if window["window_throttled"]:
+            signals.append(f"{window['window_throttled']} throttled starts")
+        if (
+            window["window_queued_builds"]
+            and window["window_queued_seconds"] / window["window_queued_builds"]
+            > ConcurrencyController.QUEUE_TIME_THRESHOLD_SECONDS
+        ):
+            signals.append("builds queued in CodeBuild")
+
+        average_duration = None
+        if completed >= ConcurrencyController.MINIMUM_SAMPLES:
+            if (
+                window["window_failed"] / completed
+                > ConcurrencyController.FAILURE_RATE_THRESHOLD
+            ):
+                signals.append(f"{window['window_failed']}/{completed} failed")
+            average_duration = window["window_duration_seconds"] / completed
+            if (
+                baseline is not None
+                and average_duration
+                > baseline * ConcurrencyController.DURATION_INFLATION_THRESHOLD
+            ):
+                signals.append(
+                    f"average duration {average_duration:.0f}s against {baseline:.0f}s"
+                )
+
+        if signals:
+            next_limit = max(
+                ConcurrencyController.MINIMUM_LIMIT,
+                int(limit * ConcurrencyController.DECREASE_FACTOR),
+            )
+            return next_limit, baseline, "decrease: " + ", ".join(signals)
+
+        if average_duration is not None:
+            baseline = (
+                average_duration
+                if baseline is None
+                else (1 - ConcurrencyController.BASELINE_WEIGHT) * baseline
+                + ConcurrencyController.BASELINE_WEIGHT * average_duration
+            )
+        succeeded = completed - window["window_failed"]
+        if succeeded > 0:
+            next_limit = min(self.ceiling, limit + ConcurrencyController.INCREASE_STEP)
+            return next_limit, baseline, f"increase: {succeeded} succeeded"
+        return limit, baseline, "hold: no pipelines succeeded"
+
+    def adjust(self) -> int:
+        """
+        Evaluates the window if the adjustment interval has passed, and returns
+        the current limit
+        """
+        now = int(time.time())
+        item = self.get_item()
+        if item is None or "limit" not in item:
+            # Starts at the ceiling, keeping anything recorded so far
+            try:
+                self.table.update_item(
+                    Key={"id": ConcurrencyController.ITEM_ID},
+                    UpdateExpression="SET #limit = :limit, adjusted_at = :now",
+                    ConditionExpression="attribute_not_exists(#limit)",
+                    ExpressionAttributeNames={"#limit": "limit"},
+                    ExpressionAttributeValues={":limit": self.ceiling, ":now": now},
+                )
+                return self.ceiling
+            except ClientError as error:
+                if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    return self.get_limit()
+                raise
+
+        limit = min(int(item["limit"]), self.ceiling)
+        if (
+            now - int(item["adjusted_at"])
+            < ConcurrencyController.ADJUSTMENT_INTERVAL_SECONDS
+        ):
+            return limit
+
+        window = {name: int(item.get(name, 0)) for name in WINDOW_ATTRIBUTES}
+        baseline = item.get("baseline_duration_seconds")
+        next_limit, next_baseline, reason = self.evaluate(
+            limit, window, None if baseline is None else float(baseline)
+        )
+
+        update_expression = "SET #limit = :limit, adjusted_at = :now"
+        values: Dict[str, Any] = {
+            ":limit": next_limit,
+            ":now": now,
+            ":adjusted_at": item["adjusted_at"],
+        }
+        if next_baseline is not None:
+            update_expression += ", baseline_duration_seconds = :baseline"
+            values[":baseline"] = int(next_baseline)
+        # Subtracts what was evaluated, keeping anything recorded since
+        update_expression += " ADD " + ", ".join(
+            f"{name} :{name}" for name in WINDOW_ATTRIBUTES
+        )
+        values.update({f":{name}": -window[name] for name in WINDOW_ATTRIBUTES})
+        try:
+            self.table.update_item(
+                Key={"id": ConcurrencyController.ITEM_ID},
+                UpdateExpression=update_expression,
+                ConditionExpression="adjusted_at = :adjusted_at",
+                ExpressionAttributeNames={"#limit": "limit"},
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # Adjusted by another invocation
+                return self.get_limit()
+            raise
+
+        logger.info(
+            f"Customization concurrency limit {limit} -> {next_limit} ({reason}), window {window}"
+        )
+        return next_limit
+
+    def publish(self, limit: int, running_pipelines: int) -> None:
+        client: CloudWatchClient = self.session.client("cloudwatch")
+        client.put_metric_data(
+            Namespace=ConcurrencyController.METRIC_NAMESPACE,
+            MetricData=[
+                {"MetricName": "ConcurrencyLimit", "Value": limit, "Unit": "Count"},
+                {
+                    "MetricName": "ConcurrencyCeiling",
+                    "Value": self.ceiling,
+                    "Unit": "Count",
+                },
+                {
+                    "MetricName": "RunningPipelines",
+                    "Value": running_pipelines,
+                    "Unit": "Count",
+                },
+            ],
+        )
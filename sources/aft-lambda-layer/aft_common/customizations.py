@@ -1,28 +1,65 @@
 # Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
-import json
-import os
 import re
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, partial
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 import aft_common.aft_utils as utils
-import jsonschema
+from aft_common import validation
+from aft_common.aft_types import TargetPlan
 from aft_common.organizations import OrganizationsAgent
+from aft_common.tag_expressions import compile_tag_expression, tags_to_expression
+from aft_common.tag_index import AccountTagIndex
 from boto3.session import Session
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from mypy_boto3_codepipeline import CodePipelineClient
+else:
+    CodePipelineClient = object
 
 CUSTOMIZATIONS_PIPELINE_PATTERN = "^\d\d\d\d\d\d\d\d\d\d\d\d-.*$"
 
 AFT_PIPELINE_ACCOUNTS = ["ct-management", "log-archive", "audit"]
 
+# Pipelines whose latest execution is checked concurrently
+PIPELINE_STATUS_MAX_WORKERS = 10
+# Pipelines started concurrently, and attempts per start when throttled
+PIPELINE_START_MAX_WORKERS = 10
+PIPELINE_START_MAX_ATTEMPTS = 8
+# Start errors that signal CodePipeline is overloaded rather than a broken pipeline
+PIPELINE_START_THROTTLING_ERRORS = [
+    "ThrottlingException",
+    "LimitExceededException",
+    "ConcurrentPipelineExecutionsLimitExceededException",
+]
+
 logger = utils.get_logger()
 
+# AFT managed customization pipeline names by account id, and the names of all
+# pipelines whose tags were checked, for the lifetime of the Lambda execution environment
+_pipeline_index: Dict[str, str] = {}
+_verified_pipeline_names: Set[str] = set()
 
-def get_pipeline_for_account(session: Session, account: str) -> str:
+
+def invalidate_pipeline_index() -> None:
+    _pipeline_index.clear()
+    _verified_pipeline_names.clear()
+
+
+def refresh_pipeline_index(session: Session) -> None:
+    """
+    Lists the customization pipelines and adds the AFT managed ones to the index.
+    Only pipelines not verified before have their tags read, and pipelines that no
+    longer exist are dropped.
+    """
     current_account = session.client("sts").get_caller_identity()["Account"]
     current_region = session.region_name
     client = session.client("codepipeline")
-    logger.info("Getting pipeline name for " + account)
+    logger.info("Refreshing customization pipeline index")
 
     response = client.list_pipelines()
 
@@ -31,59 +68,111 @@ def get_pipeline_for_account(session: Session, account: str) -> str:
         response = client.list_pipelines(nextToken=response["nextToken"])
         pipelines.extend(response["pipelines"])
 
-    for p in pipelines:
-        name = p["name"]
-        if name.startswith(account + "-"):
-            pipeline_arn = (
-                f"arn:{utils.get_aws_partition(session)}:codepipeline:"
-                + current_region
-                + ":"
-                + current_account
-                + ":"
-                + name
-            )
-            response = client.list_tags_for_resource(resourceArn=pipeline_arn)
-            for t in response["tags"]:
-                if t["key"] == "managed_by" and t["value"] == "AFT":
-                    pipeline_name: str = p["name"]
-                    return pipeline_name
-    raise Exception("Pipelines for account id " + account + " was not found")
+    pipeline_names = [p["name"] for p in pipelines]
+    for account, name in list(_pipeline_index.items()):
+        if name not in pipeline_names:
+            del _pipeline_index[account]
+    _verified_pipeline_names.intersection_update(pipeline_names)
 
+    pattern = re.compile(CUSTOMIZATIONS_PIPELINE_PATTERN)
+    arn_prefix = (
+        f"arn:{utils.get_aws_partition(session)}:codepipeline:"
+        + current_region
+        + ":"
+        + current_account
+        + ":"
+    )
+    for name in pipeline_names:
+        if name in _verified_pipeline_names or not re.match(pattern, name):
+            continue
+        tags = client.list_tags_for_resource(resourceArn=arn_prefix + name)["tags"]
+        _verified_pipeline_names.add(name)
+        for t in tags:
+            if t["key"] == "managed_by" and t["value"] == "AFT":
+                _pipeline_index.setdefault(name.split("-")[0], name)
+    logger.info(f"{len(_pipeline_index)} customization pipelines indexed")
 
-def pipeline_is_running(session: Session, name: str) -> bool:
-    client = session.client("codepipeline")
 
-    logger.info("Getting pipeline executions for " + name)
+def get_pipeline_for_account(session: Session, account: str) -> str:
+    logger.info("Getting pipeline name for " + account)
+    if account not in _pipeline_index:
+        # Pipelines created since the index was last refreshed
+        refresh_pipeline_index(session)
+    if account not in _pipeline_index:
+        raise Exception("Pipelines for account id " + account + " was not found")
+    return _pipeline_index[account]
+
+
+def get_execution_in_progress(client: CodePipelineClient, name: str) -> Optional[str]:
+    """
+    Returns the ID of the latest execution of a pipeline if it is in progress
+    """
+    logger.info("Getting latest pipeline execution for " + name)
+    # Executions are listed newest first
+    response = client.list_pipeline_executions(pipelineName=name, maxResults=1)
+    if not response["pipelineExecutionSummaries"]:
+        logger.info(name + " has never been executed")
+        return None
+    latest_execution = response["pipelineExecutionSummaries"][0]
+    logger.info("Latest Execution: ")
+    logger.info(latest_execution)
+    if latest_execution["status"] != "InProgress":
+        return None
+    return latest_execution["pipelineExecutionId"]
 
-    response = client.list_pipeline_executions(pipelineName=name)
-    pipeline_execution_summaries = response["pipelineExecutionSummaries"]
 
-    while "nextToken" in response:
-        response = client.list_pipeline_executions(
-            pipelineName=name, nextToken=response["nextToken"]
-        )
-        pipeline_execution_summaries.extend(response["pipelineExecutionSummaries"])
+def latest_execution_in_progress(client: CodePipelineClient, name: str) -> bool:
+    return get_execution_in_progress(client, name) is not None
 
-    latest_execution = sorted(
-        pipeline_execution_summaries, key=lambda i: i["startTime"], reverse=True  # type: ignore
-    )[0]
-    logger.info("Latest Execution: ")
-    logger.info(latest_execution)
-    if latest_execution["status"] == "InProgress":
-        return True
-    else:
-        return False
 
+def pipeline_is_running(session: Session, name: str) -> bool:
+    client: CodePipelineClient = session.client("codepipeline")
+    return latest_execution_in_progress(client, name)
 
-def execute_pipeline(session: Session, account: str) -> None:
-    client = session.client("codepipeline")
-    name = get_pipeline_for_account(session, account)
-    if not pipeline_is_running(session, name):
-        logger.info("Executing pipeline - " + name)
+
+def start_pipeline_execution(client: CodePipelineClient, name: str) -> str:
+    logger.info("Executing pipeline - " + name)
+    try:
         response = client.start_pipeline_execution(name=name)
-        logger.info(response)
-    else:
-        logger.info("Pipeline is currently running")
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "PipelineNotFoundException":
+            # Deleted since it was indexed
+            invalidate_pipeline_index()
+        raise
+    logger.info(response)
+    return response["pipelineExecutionId"]
+
+
+def start_pipeline_executions(
+    session: Session, names: List[str]
+) -> Tuple[Dict[str, str], Dict[str, Exception]]:
+    """
+    Starts pipelines concurrently. Returns the execution id of each pipeline that
+    started, and the error of each pipeline that did not. Errors are collected
+    per pipeline, so pipelines that started are always returned.
+    """
+    client: CodePipelineClient = session.client(
+        "codepipeline",
+        config=Config(
+            max_pool_connections=PIPELINE_START_MAX_WORKERS,
+            # Adaptive mode retries throttled starts and slows the shared client down
+            retries={"mode": "adaptive", "max_attempts": PIPELINE_START_MAX_ATTEMPTS},
+        ),
+    )
+    started: Dict[str, str] = {}
+    failed: Dict[str, Exception] = {}
+    with ThreadPoolExecutor(max_workers=PIPELINE_START_MAX_WORKERS) as executor:
+        futures = {
+            name: executor.submit(start_pipeline_execution, client, name)
+            for name in names
+        }
+        for name, future in futures.items():
+            try:
+                started[name] = future.result()
+            except Exception as error:
+                logger.error(f"Failed to start pipeline {name}: {error}")
+                failed[name] = error
+    return started, failed
 
 
 def list_pipelines(session: Session) -> List[Any]:
@@ -107,74 +196,40 @@ def list_pipelines(session: Session) -> List[Any]:
     return matched_pipelines
 
 
-def get_running_pipeline_count(session: Session, names: List[str]) -> int:
-    pipeline_counter = 0
-    client = session.client("codepipeline")
-
-    for p in names:
-        logger.info("Getting pipeline executions for " + p)
-
-        response = client.list_pipeline_executions(pipelineName=p)
-        pipeline_execution_summaries = response["pipelineExecutionSummaries"]
-
-        while "nextToken" in response:
-            response = client.list_pipeline_executions(
-                pipelineName=p, nextToken=response["nextToken"]
-            )
-            pipeline_execution_summaries.extend(response["pipelineExecutionSummaries"])
-
-        latest_execution = sorted(
-            pipeline_execution_summaries, key=lambda i: i["startTime"], reverse=True  # type: ignore
-        )[0]
-        logger.info("Latest Execution: ")
-        logger.info(latest_execution)
-
-        if latest_execution["status"] == "InProgress":
-            pipeline_counter += 1
+def get_running_pipelines(session: Session, names: List[str]) -> Dict[str, str]:
+    """
+    Returns the execution in progress of each running pipeline
+    """
+    client: CodePipelineClient = session.client(
+        "codepipeline",
+        config=Config(max_pool_connections=PIPELINE_STATUS_MAX_WORKERS),
+    )
+    with ThreadPoolExecutor(max_workers=PIPELINE_STATUS_MAX_WORKERS) as executor:
+        in_progress = list(
+            executor.map(partial(get_execution_in_progress, client), names)
+        )
+    running_pipelines = {
+        name: execution_id
+        for name, execution_id in zip(names, in_progress)
+        if execution_id is not None
+    }
 
-    logger.info("The number of running pipelines is " + str(pipeline_counter))
+    logger.info("The number of running pipelines is " + str(len(running_pipelines)))
 
-    return pipeline_counter
+    return running_pipelines
 
 
-def validate_identify_targets_request(payload: Dict[str, Any]) -> bool:
-    logger.info("Function Start - validate_identify_targets_request")
-    schema_path = os.path.join(
-        os.path.dirname(__file__), "schemas/identify_targets_request_schema.json"
+def get_identify_targets_request_errors(
+    payload: Dict[str, Any]
+) -> List[Dict[str, str]]:
+    errors = validation.get_validation_errors(
+        validation.IDENTIFY_TARGETS_REQUEST_SCHEMA, payload
     )
-    with open(schema_path) as schema_file:
-        schema_object = json.load(schema_file)
-    logger.info("Schema Loaded:" + json.dumps(schema_object))
-    validated = jsonschema.validate(payload, schema_object)
-    if validated is None:
-        logger.info("Request Validated")
-        return True
+    if errors:
+        logger.info(f"Request failed validation: {errors}")
     else:
-        raise Exception("Failure validating request.\n{validated}")
-
-
-def filter_non_aft_accounts(
-    session: Session, account_list: List[str], operation: str = "include"
-) -> List[str]:
-    aft_accounts = utils.get_all_aft_account_ids(session)
-    core_accounts = get_core_accounts(session)
-    logger.info("Running AFT Filter for accounts " + str(account_list))
-    filtered_accounts = []
-    for a in account_list:
-        logger.info("Evaluating account " + a)
-        if a not in aft_accounts:
-            if operation == "include":
-                if a not in core_accounts:
-                    logger.info("Account " + a + " is being filtered.")
-                    filtered_accounts.append(a)
-                else:
-                    logger.info("Account " + a + " is NOT being filtered.")
-        else:
-            logger.info("Account " + a + " is NOT being filtered.")
-    for a in filtered_accounts:
-        if a in account_list:
-            account_list.remove(a)
-    return account_list
+        logger.info("Request Validated")
+    return errors
 
 
 def get_core_accounts(aft_management_session: Session) -> List[str]:
@@ -190,91 +245,119 @@ def get_core_accounts(aft_management_session: Session) -> List[str]:
     return core_accounts
 
 
-def get_included_accounts(
-    aft_management_session: Session,
-    ct_mgmt_session: Session,
-    orgs_agent: OrganizationsAgent,
-    included: List[Dict[str, Any]],
-) -> List[str]:
-    all_aft_accounts = utils.get_all_aft_account_ids(aft_management_session)
-    logger.info("All AFT accounts: " + str(all_aft_accounts))
-    included_accounts = []
-    for d in included:
-        if d["type"] == "all":
-            if all_aft_accounts is not None:
-                included_accounts.extend(all_aft_accounts)
-        if d["type"] == "core":
-            core_accounts = get_core_accounts(aft_management_session)
-            included_accounts.extend(core_accounts)
-        if d["type"] == "ous":
-            included_accounts.extend(
-                orgs_agent.get_account_ids_in_ous(ou_names=d["target_value"])
-            )
-        if d["type"] == "tags":
-            tag_accounts = utils.get_accounts_by_tags(
-                aft_management_session, ct_mgmt_session, d["target_value"]
-            )
-            if tag_accounts is not None:
-                included_accounts.extend(tag_accounts)
-        if d["type"] == "accounts":
-            included_accounts.extend(d["target_value"])
-    # Remove Duplicates
-    included_accounts = list(set(included_accounts))
-    logger.info("Included Accounts (pre-AFT filter): " + str(included_accounts))
-
-    # Filter non-AFT accounts
-    included_accounts = filter_non_aft_accounts(
-        aft_management_session, included_accounts
-    )
-
-    logger.info("Included Accounts (post-AFT filter): " + str(included_accounts))
-    return included_accounts
-
-
-def get_excluded_accounts(
-    aft_management_session: Session,
-    ct_mgmt_session: Session,
-    orgs_agent: OrganizationsAgent,
-    excluded: List[Dict[str, Any]],
-) -> List[str]:
-    excluded_accounts = []
-    for d in excluded:
-        if d["type"] == "core":
-            core_accounts = get_core_accounts(aft_management_session)
-            excluded_accounts.extend(core_accounts)
-        if d["type"] == "ous":
-            excluded_accounts.extend(
-                orgs_agent.get_account_ids_in_ous(ou_names=d["target_value"])
+class TargetPlanner:
+    """
+    Resolves the accounts targeted by the include and exclude clauses of an
+    identify targets request. AFT accounts and core accounts are each loaded at
+    most once per planner and shared by every clause. Tag clauses are evaluated
+    with set operations over the account tag index, each distinct tag condition
+    in the request is looked up once.
+    """
+
+    def __init__(
+        self,
+        aft_management_session: Session,
+        ct_management_session: Session,
+        orgs_agent: OrganizationsAgent,
+    ) -> None:
+        self.aft_management_session = aft_management_session
+        self.ct_management_session = ct_management_session
+        self.orgs_agent = orgs_agent
+        # Index lookups shared by every tag condition in the request
+        self._tag_accounts: Dict[Tuple[str, str], Set[str]] = {}
+        self._key_accounts: Dict[str, Set[str]] = {}
+
+    @cached_property
+    def aft_accounts(self) -> Set[str]:
+        return set(utils.get_all_aft_account_ids(self.aft_management_session))
+
+    @cached_property
+    def core_accounts(self) -> Set[str]:
+        return set(get_core_accounts(self.aft_management_session))
+
+    @cached_property
+    def tag_index(self) -> AccountTagIndex:
+        tag_index = AccountTagIndex(self.aft_management_session)
+        if not tag_index.is_built():
+            logger.info("Account tag index has not been built")
+            tag_index.rebuild(self.ct_management_session, self.aft_accounts)
+        return tag_index
+
+    def get_accounts_with_tag(self, tag_key: str, tag_value: str) -> Set[str]:
+        if (tag_key, tag_value) not in self._tag_accounts:
+            self._tag_accounts[(tag_key, tag_value)] = self.tag_index.get_accounts(
+                tag_key, tag_value
             )
-        if d["type"] == "tags":
-            tag_accounts = utils.get_accounts_by_tags(
-                aft_management_session, ct_mgmt_session, d["target_value"]
+        return self._tag_accounts[(tag_key, tag_value)]
+
+    def get_accounts_with_key(self, tag_key: str) -> Set[str]:
+        if tag_key not in self._key_accounts:
+            self._key_accounts[tag_key] = self.tag_index.get_accounts_with_key(tag_key)
+        return self._key_accounts[tag_key]
+
+    def get_accounts_by_tag_expression(self, expression: Dict[str, Any]) -> Set[str]:
+        """
+        Returns the AFT accounts matching a tag expression
+        """
+        return compile_tag_expression(expression).evaluate(self) & self.aft_accounts
+
+    def get_accounts_by_tags(self, tags: List[Dict[str, str]]) -> Set[str]:
+        """
+        Returns the AFT accounts that have every tag in the filter, an empty filter
+        matches no accounts
+        """
+        if not tags:
+            return set()
+        return self.get_accounts_by_tag_expression(tags_to_expression(tags))
+
+    def resolve(self, clause: Dict[str, Any]) -> Set[str]:
+        if clause["type"] == "all":
+            return self.aft_accounts
+        if clause["type"] == "core":
+            return self.core_accounts
+        if clause["type"] == "ous":
+            return set(
+                self.orgs_agent.get_account_ids_in_ous(ou_names=clause["target_value"])
             )
-            if tag_accounts is not None:
-                excluded_accounts.extend(tag_accounts)
-        if d["type"] == "accounts":
-            excluded_accounts.extend(d["target_value"])
-    # Remove Duplicates
-    excluded_accounts = list(set(excluded_accounts))
-    logger.info("Excluded Accounts (pre-AFT filter): " + str(excluded_accounts))
-
-    # Filter non-AFT accounts
-    excluded_accounts = filter_non_aft_accounts(
-        aft_management_session, excluded_accounts, "exclude"
-    )
-
-    logger.info("Excluded Accounts (post-AFT filter): " + str(excluded_accounts))
-    return excluded_accounts
-
-
-def get_target_accounts(
-    included_accounts: List[str], excluded_accounts: List[str]
-) -> List[str]:
-    for i in excluded_accounts:
-        if i in included_accounts:
-            included_accounts.remove(i)
-    logger.info("TARGET ACCOUNTS: " + str(included_accounts))
-    return included_accounts
+        if clause["type"] == "tags":
+            return self.get_accounts_by_tags(clause["target_value"])
+        if clause["type"] == "tag_expression":
+            return self.get_accounts_by_tag_expression(clause["target_value"])
+        if clause["type"] == "accounts":
+            return set(clause["target_value"])
+        logger.info(f"Unknown target type {clause['type']}")
+        return set()
+
+    def plan(
+        self, included: List[Dict[str, Any]], excluded: List[Dict[str, Any]]
+    ) -> TargetPlan:
+        """
+        Targets the included AFT and core accounts, less every excluded account.
+        Each target is returned with the include clauses that matched it.
+        """
+        reasons: Dict[str, List[str]] = {}
+        for clause in included:
+            reason = clause["type"]
+            if "target_value" in clause:
+                reason += f": {clause['target_value']}"
+            for account_id in self.resolve(clause):
+                reasons.setdefault(account_id, []).append(reason)
+
+        # Accounts not managed by AFT are only targeted as core accounts
+        included_accounts = set(reasons) & (self.aft_accounts | self.core_accounts)
+        logger.info("Included Accounts: " + str(sorted(included_accounts)))
+
+        excluded_accounts: Set[str] = set()
+        for clause in excluded:
+            excluded_accounts |= self.resolve(clause)
+        logger.info("Excluded Accounts: " + str(sorted(excluded_accounts)))
+
+        target_accounts = sorted(included_accounts - excluded_accounts)
+        logger.info("TARGET ACCOUNTS: " + str(target_accounts))
+        return TargetPlan(
+            target_accounts=target_accounts,
+            reasons={account_id: reasons[account_id] for account_id in target_accounts},
+        )
 
 
 def get_account_metadata_record(
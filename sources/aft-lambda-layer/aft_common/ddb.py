@@ -1,40 +1,254 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
-from typing import TYPE_CHECKING, Any, Dict
+import time
+from collections.abc import Mapping
+from decimal import Decimal
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, cast
 
 from aft_common import aft_utils as utils
-from boto3.dynamodb.types import TypeDeserializer
+from boto3.dynamodb.types import DYNAMODB_CONTEXT, Binary
 from boto3.session import Session
+from botocore.exceptions import ClientError
 
 if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBClient
     from mypy_boto3_dynamodb.type_defs import (
         AttributeValueTypeDef,
-        PutItemOutputTableTypeDef,
+        KeysAndAttributesTypeDef,
+        PutItemOutputTypeDef,
+        WriteRequestTypeDef,
     )
 else:
+    DynamoDBClient = object
     AttributeValueTypeDef = object
-    PutItemOutputTableTypeDef = object
+    KeysAndAttributesTypeDef = object
+    PutItemOutputTypeDef = object
+    WriteRequestTypeDef = object
 
 logger = utils.get_logger()
 
+DDB_MAX_BATCH_WRITE_SIZE = 25
+DDB_MAX_BATCH_GET_SIZE = 100
+BATCH_MAX_ATTEMPTS = 5
+BATCH_BACKOFF_SECONDS = 0.1
+
 
 def put_ddb_item(
-    session: Session, table_name: str, item: Dict[str, str]
-) -> PutItemOutputTableTypeDef:
-    dynamodb = session.resource("dynamodb")
-    table = dynamodb.Table(table_name)
+    session: Session, table_name: str, item: Dict[str, Any]
+) -> PutItemOutputTypeDef:
+    client = session.client("dynamodb")
     logger.info("Inserting item into " + table_name + " table: " + str(item))
-    response = table.put_item(Item=item)
+    response = client.put_item(TableName=table_name, Item=marshal_ddb_item(item))
     logger.info(response)
     return response
 
 
+def batch_write_ddb_items(
+    session: Session,
+    table_name: str,
+    items: Sequence[Dict[str, AttributeValueTypeDef]],
+) -> List[int]:
+    """
+    Writes low-level items with batch_write_item in chunks of
+    DDB_MAX_BATCH_WRITE_SIZE, retrying unprocessed items with exponential backoff.
+    Returns the indexes of the items that could not be written.
+    """
+    client: DynamoDBClient = session.client("dynamodb")
+    logger.info(f"Writing {len(items)} items to {table_name} table")
+    failed: List[int] = []
+    for offset in range(0, len(items), DDB_MAX_BATCH_WRITE_SIZE):
+        pending = list(
+            range(offset, min(offset + DDB_MAX_BATCH_WRITE_SIZE, len(items)))
+        )
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_BACKOFF_SECONDS * 2**attempt)
+            requests: List[WriteRequestTypeDef] = [
+                {"PutRequest": {"Item": items[index]}} for index in pending
+            ]
+            try:
+                response = client.batch_write_item(RequestItems={table_name: requests})
+            except ClientError as error:
+                logger.error(f"Failed to write batch to {table_name} table: {error}")
+                break
+            unprocessed = [
+                request["PutRequest"]["Item"]
+                for request in response.get("UnprocessedItems", {}).get(table_name, [])
+            ]
+            pending = [index for index in pending if items[index] in unprocessed]
+            if not pending:
+                break
+            logger.info(
+                f"{len(pending)} items unprocessed on attempt {attempt + 1}, retrying"
+            )
+        if pending:
+            logger.error(f"Failed to write {len(pending)} items to {table_name} table")
+            failed.extend(pending)
+    return failed
+
+
+def batch_get_ddb_items(
+    session: Session,
+    table_name: str,
+    keys: Sequence[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Reads items by key with batch_get_item in chunks of DDB_MAX_BATCH_GET_SIZE,
+    retrying unprocessed keys with exponential backoff. Keys that do not exist are
+    left out of the result.
+    """
+    client: DynamoDBClient = session.client("dynamodb")
+    logger.info(f"Getting {len(keys)} items from {table_name} table")
+    items: List[Dict[str, Any]] = []
+    for offset in range(0, len(keys), DDB_MAX_BATCH_GET_SIZE):
+        request: KeysAndAttributesTypeDef = {
+            "Keys": [
+                marshal_ddb_item(key)
+                for key in keys[offset : offset + DDB_MAX_BATCH_GET_SIZE]
+            ],
+            "ConsistentRead": True,
+        }
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_BACKOFF_SECONDS * 2**attempt)
+            response = client.batch_get_item(RequestItems={table_name: request})
+            items.extend(
+                unmarshal_ddb_item(item)
+                for item in response["Responses"].get(table_name, [])
+            )
+            unprocessed = response.get("UnprocessedKeys", {}).get(table_name)
+            if not unprocessed:
+                break
+            request = cast(KeysAndAttributesTypeDef, unprocessed)
+            logger.info(
+                f"{len(request['Keys'])} keys unprocessed on attempt {attempt + 1}, retrying"
+            )
+        else:
+            raise Exception(
+                f"Failed to get {len(request['Keys'])} items from {table_name} table"
+            )
+    return items
+
+
+# The codec below produces and accepts the same Python types as boto3's
+# TypeSerializer/TypeDeserializer, without their per-attribute dispatch overhead.
+
+
+def _deserialize_value(value: Dict[str, Any]) -> Any:
+    for type_name, data in value.items():
+        if type_name == "S":
+            return data
+        if type_name == "M":
+            return {k: _deserialize_value(v) for k, v in data.items()}
+        if type_name == "L":
+            return [_deserialize_value(v) for v in data]
+        if type_name == "BOOL":
+            return data
+        if type_name == "N":
+            # DynamoDB numbers always fit the 38 digit DYNAMODB_CONTEXT precision
+            return Decimal(data)
+        if type_name == "NULL":
+            return None
+        if type_name == "SS":
+            return set(data)
+        if type_name == "NS":
+            return {Decimal(v) for v in data}
+        if type_name == "B":
+            return Binary(data)
+        if type_name == "BS":
+            return {Binary(v) for v in data}
+        raise TypeError(f"Dynamodb type {type_name} is not supported")
+    raise TypeError(
+        "Value must be a nonempty dictionary whose key is a valid dynamodb type"
+    )
+
+
+def _serialize_number(value: Any) -> str:
+    number = str(DYNAMODB_CONTEXT.create_decimal(value))
+    if number in ("Infinity", "NaN"):
+        raise TypeError("Infinity and NaN not supported")
+    return number
+
+
+def _serialize_value(value: Any) -> Dict[str, Any]:
+    # Checked in the same order as boto3's TypeSerializer, bool before int
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, Decimal)):
+        return {"N": _serialize_number(value)}
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, Binary):
+        return {"B": value.value}  # type: ignore
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": value}
+    if isinstance(value, (set, frozenset)):
+        if all(isinstance(v, (int, Decimal)) for v in value):
+            # Includes the empty set, as in boto3
+            return {"NS": [_serialize_number(v) for v in value]}
+        if all(isinstance(v, str) for v in value):
+            return {"SS": list(value)}
+        if all(isinstance(v, (Binary, bytes, bytearray)) for v in value):
+            return {
+                "BS": [v.value if isinstance(v, Binary) else v for v in value]  # type: ignore
+            }
+    if isinstance(value, Mapping):
+        return {"M": {k: _serialize_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [_serialize_value(v) for v in value]}
+    raise TypeError(f"Unsupported type {type(value)} for value {value}")
+
+
 def unmarshal_ddb_item(
     low_level_data: Dict[str, AttributeValueTypeDef]
 ) -> Dict[str, Any]:
     # To go from low-level format to python
-
-    deserializer = TypeDeserializer()
-    python_data = {k: deserializer.deserialize(v) for k, v in low_level_data.items()}
+    python_data = {k: _deserialize_value(v) for k, v in low_level_data.items()}  # type: ignore
     return python_data
+
+
+def marshal_ddb_item(python_data: Dict[str, Any]) -> Dict[str, AttributeValueTypeDef]:
+    # To go from python to low-level format
+    low_level_data: Dict[str, AttributeValueTypeDef] = {
+        k: _serialize_value(v) for k, v in python_data.items()  # type: ignore
+    }
+    return low_level_data
+
+
+class StreamRecord:
+    """
+    Wraps a DynamoDB stream record so its old and new images are each
+    deserialized at most once, however many consumers read them
+    """
+
+    def __init__(self, record: Dict[str, Any]) -> None:
+        self.record = record
+
+    @property
+    def event_name(self) -> str:
+        event_name: str = self.record["eventName"]
+        return event_name
+
+    @property
+    def event_source(self) -> str:
+        event_source: str = self.record.get("eventSource", "")
+        return event_source
+
+    @property
+    def sequence_number(self) -> str:
+        sequence_number: str = self.record["dynamodb"]["SequenceNumber"]
+        return sequence_number
+
+    @cached_property
+    def new_image(self) -> Dict[str, Any]:
+        return unmarshal_ddb_item(self.record["dynamodb"]["NewImage"])
+
+    @cached_property
+    def old_image(self) -> Dict[str, Any]:
+        return unmarshal_ddb_item(self.record["dynamodb"]["OldImage"])
@@ -1,9 +1,18 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
+from typing import Dict, List
+
+
 class ServiceRoleNotAssociated(Exception):
     pass
 
 
 class NoAccountFactoryPortfolioFound(Exception):
     pass
+
+
+class InvalidRequest(Exception):
+    def __init__(self, errors: List[Dict[str, str]]) -> None:
+        super().__init__(f"Request failed validation: {errors}")
+        self.errors = errors
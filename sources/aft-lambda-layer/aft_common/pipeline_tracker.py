@@ -0,0 +1,279 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence
+
+from aft_common import aft_utils as utils
+from boto3.session import Session
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+else:
+    Table = object
+
+logger = utils.get_logger()
+
+
+class PipelineExecutionTracker:
+    """
+    Tracks running customization pipelines in a single item of the customization
+    pipeline executions table, so the number running is read with one GetItem.
+
+    Each tracked pipeline has an entry with the time it was tracked from and,
+    once known, the ID of its execution. A pipeline is added when it is reserved
+    for a start, and its execution ID is recorded once the start returns or
+    CodePipeline reports the execution as started. Only a finished event for that
+    execution removes it, so a late event for an earlier execution cannot release
+    a newer reservation. Reservations are conditional writes on the number of
+    tracked pipelines, so concurrent batches cannot admit more pipelines than the
+    limit. A periodic reconciliation against CodePipeline catches missed events
+    and reservations that were never started.
+    """
+
+    ITEM_ID = "running-pipeline-executions"
+    RECONCILIATION_INTERVAL_SECONDS = 15 * 60
+    # CodePipeline may not report a pipeline as running immediately after a start
+    RESERVATION_GRACE_PERIOD_SECONDS = 120
+    RESERVATION_MAX_ATTEMPTS = 5
+
+    STARTED_STATES = ["STARTED", "RESUMED"]
+    FINISHED_STATES = ["SUCCEEDED", "FAILED", "STOPPED", "SUPERSEDED", "CANCELED"]
+
+    def __init__(self, aft_management_session: Session) -> None:
+        table_name = utils.get_cached_ssm_parameter_value(
+            aft_management_session,
+            utils.SSM_PARAM_AFT_DDB_CUSTOMIZATION_PIPELINE_EXECUTIONS_TABLE,
+        )
+        self.table: Table = aft_management_session.resource("dynamodb").Table(
+            table_name
+        )
+
+    def get_item(self) -> Optional[Dict[str, Any]]:
+        response = self.table.get_item(
+            Key={"id": PipelineExecutionTracker.ITEM_ID}, ConsistentRead=True
+        )
+        return response.get("Item")
+
+    def get_running_pipelines(self) -> Optional[List[str]]:
+        """
+        Returns the running and reserved pipelines, or None if a reconciliation
+        is due
+        """
+        item = self.get_item()
+        if item is None:
+            return None
+        if (
+            int(time.time()) - int(item["reconciled_at"])
+            > PipelineExecutionTracker.RECONCILIATION_INTERVAL_SECONDS
+        ):
+            return None
+        return list(item["pipelines"])
+
+    def reserve(
+        self, pipeline_names: Sequence[str], maximum_concurrent_pipelines: int
+    ) -> List[str]:
+        """
+        Reserves pipelines in the order given until the limit is reached, skipping
+        pipelines that are already running or reserved. Returns the reserved
+        pipelines.
+        """
+        for _ in range(PipelineExecutionTracker.RESERVATION_MAX_ATTEMPTS):
+            item = self.get_item()
+            if item is None:
+                logger.info("Running pipelines have not been reconciled yet")
+                return []
+            tracked = item["pipelines"]
+            available = maximum_concurrent_pipelines - len(tracked)
+            if available <= 0:
+                logger.info("Maximum concurrent customizations are running")
+                return []
+            candidates = [name for name in pipeline_names if name not in tracked]
+            candidates = list(dict.fromkeys(candidates))[:available]
+            if not candidates:
+                return []
+
+            names = {f"#pipeline{i}": name for i, name in enumerate(candidates)}
+            try:
+                self.table.update_item(
+                    Key={"id": PipelineExecutionTracker.ITEM_ID},
+                    UpdateExpression="SET "
+                    + ", ".join(f"pipelines.{key} = :reservation" for key in names),
+                    ConditionExpression=" AND ".join(
+                        ["size(pipelines) <= :limit"]
+                        + [f"attribute_not_exists(pipelines.{key})" for key in names]
+                    ),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues={
+                        ":reservation": {"tracked_at": int(time.time())},
+                        ":limit": maximum_concurrent_pipelines - len(candidates),
+                    },
+                )
+            except ClientError as error:
+                if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    # Another invocation reserved pipelines first
+                    logger.info("Running pipelines changed, retrying reservation")
+                    continue
+                raise
+            logger.info(f"Reserved pipelines {candidates}")
+            return candidates
+
+        logger.info("Unable to reserve pipelines, running pipelines keep changing")
+        return []
+
+    def release(self, pipeline_names: Sequence[str]) -> None:
+        """
+        Releases reserved pipelines that were not started
+        """
+        if not pipeline_names:
+            return None
+        names = {f"#pipeline{i}": name for i, name in enumerate(pipeline_names)}
+        self.table.update_item(
+            Key={"id": PipelineExecutionTracker.ITEM_ID},
+            UpdateExpression="REMOVE " + ", ".join(f"pipelines.{key}" for key in names),
+            ExpressionAttributeNames=names,
+        )
+        logger.info(f"Released pipelines {list(pipeline_names)}")
+
+    def record_executions(self, executions: Mapping[str, str]) -> None:
+        """
+        Records the execution started for each reserved pipeline
+        """
+        for pipeline_name, execution_id in executions.items():
+            try:
+                self.table.update_item(
+                    Key={"id": PipelineExecutionTracker.ITEM_ID},
+                    UpdateExpression="SET pipelines.#pipeline.execution_id = :execution_id",
+                    ConditionExpression="attribute_exists(pipelines.#pipeline)",
+                    ExpressionAttributeNames={"#pipeline": pipeline_name},
+                    ExpressionAttributeValues={":execution_id": execution_id},
+                )
+            except ClientError as error:
+                if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    # Released by a reconciliation since
+                    continue
+                raise
+
+    def pipeline_started(
+        self, pipeline_name: str, execution_id: str, event_time: int
+    ) -> None:
+        try:
+            self.table.update_item(
+                Key={"id": PipelineExecutionTracker.ITEM_ID},
+                UpdateExpression="SET pipelines.#pipeline = :entry",
+                ConditionExpression=(
+                    "attribute_exists(pipelines) AND "
+                    "(attribute_not_exists(pipelines.#pipeline) OR "
+                    "(attribute_not_exists(pipelines.#pipeline.execution_id) AND "
+                    "pipelines.#pipeline.tracked_at <= :event_time))"
+                ),
+                ExpressionAttributeNames={"#pipeline": pipeline_name},
+                ExpressionAttributeValues={
+                    ":entry": {"tracked_at": event_time, "execution_id": execution_id},
+                    ":event_time": event_time,
+                },
+            )
+            logger.info(f"Pipeline {pipeline_name} execution {execution_id} started")
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # Not reconciled yet, or already tracked with its execution
+                return None
+            raise
+
+    def pipeline_finished(
+        self, pipeline_name: str, execution_id: str, event_time: int
+    ) -> Optional[int]:
+        """
+        Stops tracking a pipeline if it is tracked with this execution, returns the
+        number of seconds it was tracked for, or None if it was not
+        """
+        try:
+            response = self.table.update_item(
+                Key={"id": PipelineExecutionTracker.ITEM_ID},
+                UpdateExpression="REMOVE pipelines.#pipeline",
+                ConditionExpression="pipelines.#pipeline.execution_id = :execution_id",
+                ExpressionAttributeNames={"#pipeline": pipeline_name},
+                ExpressionAttributeValues={":execution_id": execution_id},
+                ReturnValues="UPDATED_OLD",
+            )
+            logger.info(f"Pipeline {pipeline_name} execution {execution_id} finished")
+            attributes: Dict[str, Any] = response["Attributes"]
+            return event_time - int(
+                attributes["pipelines"][pipeline_name]["tracked_at"]
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # Not tracked, or tracked with another execution
+                return None
+            raise
+
+    def reconcile(self, running_executions: Mapping[str, str]) -> List[str]:
+        """
+        Replaces the tracked pipelines with those CodePipeline reports as running,
+        keeping reservations made within the grace period, and records the
+        executions in progress. Returns the running and reserved pipelines.
+        """
+        now = int(time.time())
+        item = self.get_item()
+        if item is None:
+            self.table.put_item(
+                Item={
+                    "id": PipelineExecutionTracker.ITEM_ID,
+                    "pipelines": {
+                        name: {"tracked_at": now, "execution_id": execution_id}
+                        for name, execution_id in running_executions.items()
+                    },
+                    "reconciled_at": now,
+                }
+            )
+            return list(running_executions)
+
+        tracked: Dict[str, Any] = item["pipelines"]
+        stale = [
+            name
+            for name, entry in tracked.items()
+            if name not in running_executions
+            and now - int(entry["tracked_at"])
+            > PipelineExecutionTracker.RESERVATION_GRACE_PERIOD_SECONDS
+        ]
+        # Running executions missing from the tracked pipelines, or tracked with
+        # another execution because events were missed
+        unmatched = {
+            name: execution_id
+            for name, execution_id in running_executions.items()
+            if tracked.get(name, {}).get("execution_id") != execution_id
+        }
+        if stale:
+            logger.info(f"Pipelines no longer running: {stale}")
+        if unmatched:
+            logger.info(f"Untracked pipeline executions running: {unmatched}")
+
+        names: Dict[str, str] = {}
+        values: Dict[str, Any] = {":now": now}
+        assignments = ["reconciled_at = :now"]
+        for i, (name, execution_id) in enumerate(unmatched.items()):
+            names[f"#running{i}"] = name
+            values[f":running{i}"] = {
+                "tracked_at": int(tracked.get(name, {}).get("tracked_at", now)),
+                "execution_id": execution_id,
+            }
+            assignments.append(f"pipelines.#running{i} = :running{i}")
+        update_expression = "SET " + ", ".join(assignments)
+        if stale:
+            names.update({f"#stale{i}": name for i, name in enumerate(stale)})
+            update_expression += " REMOVE " + ", ".join(
+                f"pipelines.#stale{i}" for i in range(len(stale))
+            )
+        update_args: Dict[str, Any] = {}
+        if names:
+            update_args["ExpressionAttributeNames"] = names
+        self.table.update_item(
+            Key={"id": PipelineExecutionTracker.ITEM_ID},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values,
+            **update_args,
+        )
+        return [name for name in tracked if name not in stale] + [
+            name for name in unmatched if name not in tracked
+        ]
@@ -0,0 +1,264 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, TypedDict
+
+from aft_common import aft_utils as utils
+from aft_common import ddb
+from boto3.session import Session
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+else:
+    Table = object
+
+logger = utils.get_logger()
+
+
+class ProvisioningSlot(TypedDict):
+    id: str
+    lease_token: str
+
+
+class ProvisioningScheduler:
+    """
+    Admits Control Tower Account Factory operations up to a concurrency limit.
+
+    Each in-flight operation holds one of a fixed number of slots in the
+    provisioning operations table. Slots are claimed with conditional writes and
+    carry a lease, so parallel processor invocations cannot admit more operations
+    than there are slots, and a slot left behind by a failed invocation frees
+    itself once its lease expires.
+
+    Slots are released by Control Tower completion events. A periodic
+    reconciliation against Service Catalog catches missed events and operations
+    started outside of AFT.
+    """
+
+    RECONCILIATION_ITEM_ID = "reconciliation"
+    RECONCILIATION_INTERVAL_SECONDS = 30 * 60
+
+    # Lease for a claimed slot that has not been bound to a submitted operation yet,
+    # matches the processor Lambda timeout
+    CLAIM_LEASE_SECONDS = 300
+    # Upper bound on how long a submitted operation can hold a slot
+    OPERATION_LEASE_SECONDS = 2 * 60 * 60
+    # Service Catalog may not report a product as UNDER_CHANGE immediately after submission
+    SUBMISSION_GRACE_PERIOD_SECONDS = 120
+
+    def __init__(
+        self,
+        aft_management_session: Session,
+        maximum_concurrent_operations: Optional[int] = None,
+    ) -> None:
+        self.session = aft_management_session
+        self.table_name = utils.get_ssm_parameter_value(
+            aft_management_session,
+            utils.SSM_PARAM_AFT_DDB_PROVISIONING_OPERATIONS_TABLE,
+        )
+        self.table: Table = aft_management_session.resource("dynamodb").Table(
+            self.table_name
+        )
+        if maximum_concurrent_operations is None:
+            maximum_concurrent_operations = int(
+                utils.get_ssm_parameter_value(
+                    aft_management_session,
+                    utils.SSM_PARAM_AFT_MAXIMUM_CONCURRENT_ACCOUNT_FACTORY_OPERATIONS,
+                )
+            )
+        self.maximum_concurrent_operations = maximum_concurrent_operations
+
+    @property
+    def slot_ids(self) -> List[str]:
+        return [f"slot-{i}" for i in range(self.maximum_concurrent_operations)]
+
+    def get_operations(self) -> List[Dict[str, Any]]:
+        """
+        Returns the slots currently held, including claims that have not been
+        bound to a submitted operation yet
+        """
+        now = int(time.time())
+        items = ddb.batch_get_ddb_items(
+            self.session,
+            self.table_name,
+            [{"id": slot_id} for slot_id in self.slot_ids],
+        )
+        return [item for item in items if int(item["lease_expires_at"]) > now]
+
+    def available_slots(self) -> int:
+        return self.maximum_concurrent_operations - len(self.get_operations())
+
+    def account_has_operation_in_flight(self, account_email: str) -> bool:
+        for operation in self.get_operations():
+            if operation.get("account_email", "").lower() == account_email.lower():
+                return True
+        return False
+
+    def claim_slot(self) -> Optional[ProvisioningSlot]:
+        now = int(time.time())
+        held_slot_ids = [operation["id"] for operation in self.get_operations()]
+        for slot_id in self.slot_ids:
+            if slot_id in held_slot_ids:
+                continue
+            lease_token = str(uuid.uuid4())
+            try:
+                self.table.put_item(
+                    Item={
+                        "id": slot_id,
+                        "lease_token": lease_token,
+                        "lease_expires_at": now
+                        + ProvisioningScheduler.CLAIM_LEASE_SECONDS,
+                        "claimed_at": now,
+                    },
+                    ConditionExpression="attribute_not_exists(id) OR lease_expires_at < :now",
+                    ExpressionAttributeValues={":now": now},
+                )
+            except ClientError as error:
+                if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    # Another invocation claimed this slot first
+                    continue
+                raise
+            logger.info(f"Claimed provisioning slot {slot_id}")
+            return ProvisioningSlot(id=slot_id, lease_token=lease_token)
+
+        logger.info("No provisioning slots available")
+        return None
+
+    def bind_slot(
+        self,
+        slot: ProvisioningSlot,
+        request: Dict[str, Any],
+        provisioned_product_id: str,
+        record_id: str,
+    ) -> None:
+        """
+        Associates a claimed slot with the operation submitted to Service Catalog
+        and extends its lease for the expected duration of the operation
+        """
+        now = int(time.time())
+        ct_parameters = request["control_tower_parameters"]
+        self.table.update_item(
+            Key={"id": slot["id"]},
+            UpdateExpression=(
+                "SET account_email = :account_email, account_name = :account_name, "
+                "operation = :operation, provisioned_product_id = :provisioned_product_id, "
+                "record_id = :record_id, submitted_at = :now, lease_expires_at = :lease_expires_at"
+            ),
+            ConditionExpression="lease_token = :lease_token",
+            ExpressionAttributeValues={
+                ":account_email": ct_parameters["AccountEmail"],
+                ":account_name": ct_parameters["AccountName"],
+                ":operation": request["operation"],
+                ":provisioned_product_id": provisioned_product_id,
+                ":record_id": record_id,
+                ":now": now,
+                ":lease_expires_at": now
+                + ProvisioningScheduler.OPERATION_LEASE_SECONDS,
+                ":lease_token": slot["lease_token"],
+            },
+        )
+        logger.info(
+            f"Bound provisioning slot {slot['id']} to provisioned product {provisioned_product_id}"
+        )
+
+    def release_slot(self, slot: ProvisioningSlot) -> None:
+        try:
+            self.table.delete_item(
+                Key={"id": slot["id"]},
+                ConditionExpression="lease_token = :lease_token",
+                ExpressionAttributeValues={":lease_token": slot["lease_token"]},
+            )
+            logger.info(f"Released provisioning slot {slot['id']}")
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # Lease expired and the slot was claimed by another invocation
+                return None
+            raise
+
+    def release_account_operations(self, account_email: str) -> bool:
+        """
+        Releases the slots held by operations for an account, returns False if the
+        account had no operation in flight
+        """
+        released = False
+        for operation in self.get_operations():
+            if operation.get("account_email", "").lower() == account_email.lower():
+                logger.info(f"Provisioning completed for account {account_email}")
+                self.release_slot(
+                    ProvisioningSlot(
+                        id=operation["id"], lease_token=operation["lease_token"]
+                    )
+                )
+                released = True
+        return released
+
+    def get_untracked_operation_count(self) -> Optional[int]:
+        """
+        Returns the number of in-progress operations not tracked by any slot as of
+        the last reconciliation, or None if a reconciliation is due
+        """
+        response = self.table.get_item(
+            Key={"id": ProvisioningScheduler.RECONCILIATION_ITEM_ID},
+            ConsistentRead=True,
+        )
+        if "Item" not in response:
+            return None
+        reconciliation: Dict[str, Any] = response["Item"]
+        if (
+            int(time.time()) - int(reconciliation["reconciled_at"])
+            > ProvisioningScheduler.RECONCILIATION_INTERVAL_SECONDS
+        ):
+            return None
+        return int(reconciliation["untracked_operations"])
+
+    def request_reconciliation(self) -> None:
+        self.table.delete_item(Key={"id": ProvisioningScheduler.RECONCILIATION_ITEM_ID})
+
+    def reconcile(self, in_progress_provisioned_product_ids: Sequence[str]) -> int:
+        """
+        Releases slots whose provisioned product is no longer under change and
+        returns the number of in-progress operations not tracked by any slot,
+        such as ones started outside of AFT
+        """
+        now = int(time.time())
+        tracked_product_ids = []
+        for operation in self.get_operations():
+            provisioned_product_id = operation.get("provisioned_product_id")
+            if provisioned_product_id is None:
+                # Claimed, but not yet submitted
+                continue
+            tracked_product_ids.append(provisioned_product_id)
+            submitted_at = int(operation["submitted_at"])
+            if (
+                provisioned_product_id not in in_progress_provisioned_product_ids
+                and now - submitted_at
+                > ProvisioningScheduler.SUBMISSION_GRACE_PERIOD_SECONDS
+            ):
+                logger.info(
+                    f"Provisioned product {provisioned_product_id} is no longer under change"
+                )
+                self.release_slot(
+                    ProvisioningSlot(
+                        id=operation["id"], lease_token=operation["lease_token"]
+                    )
+                )
+
+        untracked = [
+            product_id
+            for product_id in in_progress_provisioned_product_ids
+            if product_id not in tracked_product_ids
+        ]
+        if untracked:
+            logger.info(f"Untracked provisioning in progress: {untracked}")
+
+        self.table.put_item(
+            Item={
+                "id": ProvisioningScheduler.RECONCILIATION_ITEM_ID,
+                "reconciled_at": now,
+                "untracked_operations": len(untracked),
+            }
+        )
+        return len(untracked)
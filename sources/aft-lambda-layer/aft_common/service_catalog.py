@@ -0,0 +1,115 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from typing import TYPE_CHECKING, List
+
+from aft_common import aft_utils as utils
+from boto3.session import Session
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from mypy_boto3_servicecatalog import ServiceCatalogClient
+else:
+    ServiceCatalogClient = object
+
+logger = utils.get_logger()
+
+
+class ProductCatalog:
+    """
+    The Control Tower Account Factory product and its provisioning artifacts,
+    fetched with one describe_product_as_admin and one list_provisioning_artifacts
+    call and shared across lookups for CACHE_TTL_SECONDS
+    """
+
+    CACHE_TTL_SECONDS = 300
+    # Returned when a cached product or provisioning artifact was removed or deactivated
+    STALE_ERROR_CODES = ("InvalidParametersException", "ResourceNotFoundException")
+
+    def __init__(
+        self,
+        product_name: str,
+        product_id: str,
+        provisioning_artifact_ids: List[str],
+        active_provisioning_artifact_ids: List[str],
+    ) -> None:
+        self.product_name = product_name
+        self.product_id = product_id
+        self.provisioning_artifact_ids = provisioning_artifact_ids
+        self.active_provisioning_artifact_ids = active_provisioning_artifact_ids
+
+    @classmethod
+    def get(
+        cls, aft_management_session: Session, ct_management_session: Session
+    ) -> "ProductCatalog":
+        product_name = utils.get_cached_ssm_parameter_value(
+            aft_management_session, utils.SSM_PARAM_SC_PRODUCT_NAME
+        )
+        return _product_catalog_cache.get(
+            product_name, lambda: cls.fetch(ct_management_session, product_name)
+        )
+
+    @classmethod
+    def fetch(
+        cls, ct_management_session: Session, product_name: str
+    ) -> "ProductCatalog":
+        client: ServiceCatalogClient = ct_management_session.client("servicecatalog")
+        logger.info("Getting product details for " + product_name)
+
+        product = client.describe_product_as_admin(Name=product_name)
+        product_id = product["ProductViewDetail"]["ProductViewSummary"]["ProductId"]
+        artifacts = client.list_provisioning_artifacts(ProductId=product_id)
+        active_artifact_ids = [
+            artifact["Id"]
+            for artifact in artifacts["ProvisioningArtifactDetails"]
+            if artifact.get("Active")
+        ]
+        # Artifacts are considered in the order describe_product_as_admin lists them
+        artifact_ids = [
+            artifact["Id"] for artifact in product["ProvisioningArtifactSummaries"]
+        ]
+        logger.info(
+            f"Product {product_id} has active provisioning artifacts {active_artifact_ids}"
+        )
+        return cls(
+            product_name=product_name,
+            product_id=product_id,
+            provisioning_artifact_ids=artifact_ids,
+            active_provisioning_artifact_ids=active_artifact_ids,
+        )
+
+    @staticmethod
+    def invalidate() -> None:
+        _product_catalog_cache.clear()
+
+    @staticmethod
+    def invalidate_if_stale(error: ClientError) -> None:
+        """
+        Drops the cached catalogs if a Service Catalog call failed because the
+        catalog it was made with is out of date, so the retry fetches it again
+        """
+        if error.response["Error"]["Code"] in ProductCatalog.STALE_ERROR_CODES:
+            logger.info("Product catalog is out of date, invalidating cache")
+            ProductCatalog.invalidate()
+
+    def provisioning_artifact_is_active(self, artifact_id: str) -> bool:
+        if artifact_id in self.active_provisioning_artifact_ids:
+            logger.info(artifact_id + " is active")
+            return True
+        logger.info(artifact_id + " is NOT active")
+        return False
+
+    @property
+    def active_provisioning_artifact_id(self) -> str:
+        for artifact_id in self.provisioning_artifact_ids:
+            if artifact_id in self.active_provisioning_artifact_ids:
+                logger.info("Using provisioning artifact ID: " + artifact_id)
+                return artifact_id
+
+        raise Exception("No Provisioning Artifact ID found")
+
+
+# Catalogs by product name
+_product_catalog_cache: utils.TTLCache[ProductCatalog] = utils.TTLCache(
+    ProductCatalog.CACHE_TTL_SECONDS
+)
@@ -1,7 +1,7 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, List, Optional
 
 from aft_common import aft_utils as utils
 from aft_common import ddb
@@ -15,48 +15,54 @@ from aft_common.auth import AuthClient
 from aft_common.organizations import OrganizationsAgent
 from boto3.session import Session
 
+if TYPE_CHECKING:
+    from mypy_boto3_organizations.type_defs import AccountTypeDef
+else:
+    AccountTypeDef = object
+
 logger = utils.get_logger()
 
 
-def shared_account_request(event_record: Dict[str, Any]) -> bool:
-    ct_params = ddb.unmarshal_ddb_item(event_record["dynamodb"]["NewImage"])[
-        "control_tower_parameters"
-    ]
+def shared_account_request(
+    event_record: ddb.StreamRecord,
+    shared_accounts: Optional[List[AccountTypeDef]] = None,
+) -> bool:
+    ct_params = event_record.new_image["control_tower_parameters"]
     account_email = ct_params["AccountEmail"]
     account_name = ct_params["AccountName"]
     request_ou = ct_params["ManagedOrganizationalUnit"]
     auth = AuthClient()
-    shared_account_ids = get_shared_ids(
-        aft_management_session=auth.get_aft_management_session()
-    )
     ct_management_session = auth.get_ct_management_session(
         role_name=ProvisionRoles.SERVICE_ROLE_NAME
     )
-    orgs_client = ct_management_session.client("organizations")
-    for shared_account_id in shared_account_ids:
-        response = orgs_client.describe_account(AccountId=shared_account_id)
+    if shared_accounts is None:
+        shared_accounts = get_shared_accounts(
+            aft_management_session=auth.get_aft_management_session(),
+            ct_management_session=ct_management_session,
+        )
+    for shared_account in shared_accounts:
         if (
-            response["Account"]["Email"] == account_email
-            and response["Account"]["Name"] == account_name
+            shared_account["Email"] == account_email
+            and shared_account["Name"] == account_name
         ):
             orgs_agent = OrganizationsAgent(ct_management_session=ct_management_session)
             if not orgs_agent.ou_contains_account(
-                ou_name=request_ou, account_id=shared_account_id
+                ou_name=request_ou, account_id=shared_account["Id"]
             ):
                 raise ValueError(
                     "Unsupported action: Cannot change OU for a Shared CT account or CT management account"
                 )
             return True
         elif (
-            response["Account"]["Email"] == account_email
-            and response["Account"]["Name"] != account_name
+            shared_account["Email"] == account_email
+            and shared_account["Name"] != account_name
         ):
             raise ValueError(
                 f"Account Email {account_email} is a shared account email, however, the Account Name {account_name} does not match"
             )
         elif (
-            response["Account"]["Name"] == account_name
-            and response["Account"]["Email"] != account_email
+            shared_account["Name"] == account_name
+            and shared_account["Email"] != account_email
         ):
             raise ValueError(
                 f"Account Name {account_name} is a shared account Name, however, the Account Email {account_email} does not match"
@@ -64,6 +70,22 @@ def shared_account_request(event_record: Dict[str, Any]) -> bool:
     return False
 
 
+def get_shared_accounts(
+    aft_management_session: Session, ct_management_session: Session
+) -> List[AccountTypeDef]:
+    """
+    Describes the Control Tower shared accounts, so a batch of account requests
+    can be checked against them with a single lookup
+    """
+    orgs_client = ct_management_session.client("organizations")
+    return [
+        orgs_client.describe_account(AccountId=shared_account_id)["Account"]
+        for shared_account_id in get_shared_ids(
+            aft_management_session=aft_management_session
+        )
+    ]
+
+
 def get_shared_ids(aft_management_session: Session) -> List[str]:
     shared_account_ssm_params = [
         SSM_PARAM_ACCOUNT_LOG_ARCHIVE_ACCOUNT_ID,
@@ -1,78 +1,215 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
+import hashlib
 import json
 import uuid
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
 from aft_common import aft_utils as utils
 from boto3.session import Session
+from botocore.exceptions import ClientError
 
 if TYPE_CHECKING:
     from mypy_boto3_sqs import SQSClient
-    from mypy_boto3_sqs.type_defs import MessageTypeDef, SendMessageResultTypeDef
+    from mypy_boto3_sqs.type_defs import (
+        MessageTypeDef,
+        SendMessageBatchRequestEntryTypeDef,
+        SendMessageResultTypeDef,
+    )
 else:
     SQSClient = object
     MessageTypeDef = object
+    SendMessageBatchRequestEntryTypeDef = object
     SendMessageResultTypeDef = object
 
 logger = utils.get_logger()
 
-
-def build_sqs_url(session: Session, queue_name: str) -> str:
-    account_info = utils.get_session_info(session)
-    return f'https://sqs.{account_info["region"]}.amazonaws.com/{account_info["account"]}/{queue_name}'
-
-
-def receive_sqs_message(session: Session, sqs_queue: str) -> Optional[MessageTypeDef]:
-    client: SQSClient = session.client("sqs")
-    sqs_url = build_sqs_url(session, sqs_queue)
-    logger.info(f"Fetching SQS Messages from {sqs_url}")
-
-    response = client.receive_message(
-        QueueUrl=sqs_url,
-        MaxNumberOfMessages=1,
-        ReceiveRequestAttemptId=str(uuid.uuid1()),
+SQS_MAX_BATCH_SIZE = 10
+
+# Queue URLs resolved for the lifetime of the Lambda execution environment, by queue name
+_queue_url_cache: Dict[str, str] = {}
+
+
+def get_message_group_id(message: Dict[str, Any]) -> str:
+    """
+    Groups account request messages by normalized account email, so the FIFO queue
+    keeps requests for one account in order while different accounts are independent
+    """
+    account_email = message.get("control_tower_parameters", {}).get("AccountEmail")
+    if account_email is None:
+        return str(uuid.uuid1())
+    return hashlib.sha256(account_email.strip().lower().encode()).hexdigest()
+
+
+def get_message_deduplication_id(
+    message: Dict[str, Any], deduplication_scope: Optional[str] = None
+) -> str:
+    """
+    Hashes the canonical JSON of the message. deduplication_scope identifies the
+    change the message was built from, such as a stream record sequence number, so
+    redeliveries of one change are deduplicated but a later change back to the same
+    content is not
+    """
+    canonical_message = json.dumps(
+        message, sort_keys=True, separators=(",", ":"), default=str
     )
-    if "Messages" in response.keys():
-        logger.info("There are messages pending processing")
-        message = response["Messages"][0]
-        logger.info("Message retrieved")
+    if deduplication_scope is not None:
+        canonical_message = deduplication_scope + ":" + canonical_message
+    return hashlib.sha256(canonical_message.encode()).hexdigest()
+
+
+def get_queue_url(client: SQSClient, queue_name: str) -> str:
+    if queue_name not in _queue_url_cache:
+        _queue_url_cache[queue_name] = client.get_queue_url(QueueName=queue_name)[
+            "QueueUrl"
+        ]
+    return _queue_url_cache[queue_name]
+
+
+class QueueClient:
+    """
+    An SQS client bound to one queue. The queue URL is resolved once per
+    execution environment, so message operations make no STS or SSM calls.
+    """
+
+    def __init__(self, session: Session, queue_name: str) -> None:
+        self.client: SQSClient = session.client("sqs")
+        self.queue_name = queue_name
+        self.url = get_queue_url(self.client, queue_name)
+
+    @classmethod
+    def from_ssm_parameter(cls, session: Session, ssm_parameter: str) -> "QueueClient":
+        queue_name = utils.get_cached_ssm_parameter_value(session, ssm_parameter)
+        return cls(session, queue_name)
+
+    def receive_messages(
+        self, max_messages: int = SQS_MAX_BATCH_SIZE
+    ) -> List[MessageTypeDef]:
+        """
+        Receives up to max_messages in a single call. FIFO queues return as many
+        messages from the same message group as possible, in order.
+        """
+        logger.info(f"Fetching SQS Messages from {self.url}")
+        response = self.client.receive_message(
+            QueueUrl=self.url,
+            MaxNumberOfMessages=min(max_messages, SQS_MAX_BATCH_SIZE),
+            ReceiveRequestAttemptId=str(uuid.uuid1()),
+        )
+        messages = response.get("Messages", [])
+        logger.info(f"{len(messages)} messages retrieved")
+        return messages
+
+    def defer_message(self, message: MessageTypeDef, delay_seconds: int) -> None:
+        """
+        Keeps a received message hidden for delay_seconds instead of deleting it,
+        so it is delivered again once the delay has passed
+        """
+        receipt_handle = message["ReceiptHandle"]
+        logger.info(
+            f"Deferring SQS message with handle {receipt_handle} for {delay_seconds} seconds"
+        )
+        self.client.change_message_visibility(
+            QueueUrl=self.url,
+            ReceiptHandle=receipt_handle,
+            VisibilityTimeout=delay_seconds,
+        )
+
+    def delete_messages(self, messages: Sequence[MessageTypeDef]) -> None:
+        for offset in range(0, len(messages), SQS_MAX_BATCH_SIZE):
+            batch = messages[offset : offset + SQS_MAX_BATCH_SIZE]
+            logger.info(f"Deleting {len(batch)} SQS messages")
+            response = self.client.delete_message_batch(
+                QueueUrl=self.url,
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+                    for index, message in enumerate(batch)
+                ],
+            )
+            if response.get("Failed"):
+                raise Exception(f"Failed to delete SQS messages: {response['Failed']}")
+
+    def release_messages(self, messages: Sequence[MessageTypeDef]) -> None:
+        """
+        Makes received messages visible again right away, for messages that were
+        received but will not be processed by this invocation
+        """
+        for offset in range(0, len(messages), SQS_MAX_BATCH_SIZE):
+            batch = messages[offset : offset + SQS_MAX_BATCH_SIZE]
+            logger.info(f"Releasing {len(batch)} SQS messages")
+            self.client.change_message_visibility_batch(
+                QueueUrl=self.url,
+                Entries=[
+                    {
+                        "Id": str(index),
+                        "ReceiptHandle": message["ReceiptHandle"],
+                        "VisibilityTimeout": 0,
+                    }
+                    for index, message in enumerate(batch)
+                ],
+            )
+
+    def send_message(
+        self, message: Dict[str, Any], deduplication_scope: Optional[str] = None
+    ) -> SendMessageResultTypeDef:
+        logger.info("Sending SQS message to " + self.url)
         logger.info(message)
-        return message
-    else:
-        logger.info("There are no messages pending processing")
-        return None
-
-
-def delete_sqs_message(session: Session, message: MessageTypeDef) -> None:
-    client: SQSClient = session.client("sqs")
-    sqs_queue = utils.get_ssm_parameter_value(
-        session, utils.SSM_PARAM_ACCOUNT_REQUEST_QUEUE
-    )
-    receipt_handle = message["ReceiptHandle"]
-    logger.info("Deleting SQS message with handle " + receipt_handle)
-    client.delete_message(
-        QueueUrl=build_sqs_url(session, sqs_queue), ReceiptHandle=receipt_handle
-    )
-
-
-def send_sqs_message(
-    session: Session, sqs_url: str, message: Dict[str, Any]
-) -> SendMessageResultTypeDef:
-    sqs: SQSClient = session.client("sqs")
-    logger.info("Sending SQS message to " + sqs_url)
-    logger.info(message)
-
-    unique_id = str(uuid.uuid1())
-
-    response = sqs.send_message(
-        QueueUrl=sqs_url,
-        MessageBody=json.dumps(message),
-        MessageDeduplicationId=unique_id,
-        MessageGroupId=unique_id,
-    )
-
-    logger.info(response)
 
-    return response
+        response = self.client.send_message(
+            QueueUrl=self.url,
+            MessageBody=json.dumps(message),
+            MessageDeduplicationId=get_message_deduplication_id(
+                message, deduplication_scope
+            ),
+            MessageGroupId=get_message_group_id(message),
+        )
+
+        logger.info(response)
+
+        return response
+
+    def send_messages(
+        self,
+        messages: Sequence[Dict[str, Any]],
+        deduplication_scopes: Optional[Sequence[str]] = None,
+    ) -> List[int]:
+        """
+        Sends messages in batches of up to SQS_MAX_BATCH_SIZE, returns the indexes of
+        the messages that could not be sent
+        """
+        logger.info(f"Sending {len(messages)} SQS messages to {self.url}")
+        failed: List[int] = []
+        for offset in range(0, len(messages), SQS_MAX_BATCH_SIZE):
+            entries: List[SendMessageBatchRequestEntryTypeDef] = []
+            for index, message in enumerate(
+                messages[offset : offset + SQS_MAX_BATCH_SIZE], start=offset
+            ):
+                logger.info(message)
+                entries.append(
+                    {
+                        "Id": str(index),
+                        "MessageBody": json.dumps(message),
+                        "MessageDeduplicationId": get_message_deduplication_id(
+                            message,
+                            deduplication_scopes[index]
+                            if deduplication_scopes
+                            else None,
+                        ),
+                        "MessageGroupId": get_message_group_id(message),
+                    }
+                )
+            try:
+                response = self.client.send_message_batch(
+                    QueueUrl=self.url, Entries=entries
+                )
+            except ClientError as error:
+                logger.error(f"Failed to send SQS message batch: {error}")
+                failed.extend(int(entry["Id"]) for entry in entries)
+                continue
+            logger.info(response)
+            for failure in response.get("Failed", []):
+                logger.error(
+                    f"Failed to send SQS message {failure['Id']}: {failure.get('Message')}"
+                )
+                failed.append(int(failure["Id"]))
+        return failed
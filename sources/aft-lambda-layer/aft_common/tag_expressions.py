@@ -0,0 +1,136 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Protocol, Sequence, Set
+
+
+class TagResolver(Protocol):
+    """
+    Resolves the accounts matching a single tag condition, evaluating an
+    expression costs one resolver call per distinct condition in it
+    """
+
+    @property
+    def aft_accounts(self) -> Set[str]:
+        ...
+
+    def get_accounts_with_tag(self, tag_key: str, tag_value: str) -> Set[str]:
+        ...
+
+    def get_accounts_with_key(self, tag_key: str) -> Set[str]:
+        ...
+
+
+class TagExpression(ABC):
+    @abstractmethod
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        ...
+
+
+class And(TagExpression):
+    def __init__(self, operands: Sequence[TagExpression]) -> None:
+        self.operands = operands
+
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        # An empty conjunction would otherwise match every account
+        if not self.operands:
+            return set()
+        accounts = set(resolver.aft_accounts)
+        for operand in self.operands:
+            if not accounts:
+                break
+            accounts &= operand.evaluate(resolver)
+        return accounts
+
+
+class Or(TagExpression):
+    def __init__(self, operands: Sequence[TagExpression]) -> None:
+        self.operands = operands
+
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        accounts: Set[str] = set()
+        for operand in self.operands:
+            accounts |= operand.evaluate(resolver)
+        return accounts
+
+
+class Not(TagExpression):
+    def __init__(self, operand: TagExpression) -> None:
+        self.operand = operand
+
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        return resolver.aft_accounts - self.operand.evaluate(resolver)
+
+
+class HasKey(TagExpression):
+    def __init__(self, tag_key: str) -> None:
+        self.tag_key = tag_key
+
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        return resolver.get_accounts_with_key(self.tag_key)
+
+
+class ValueIn(TagExpression):
+    def __init__(self, tag_key: str, tag_values: FrozenSet[str]) -> None:
+        self.tag_key = tag_key
+        self.tag_values = tag_values
+
+    def evaluate(self, resolver: TagResolver) -> Set[str]:
+        accounts: Set[str] = set()
+        for tag_value in sorted(self.tag_values):
+            accounts |= resolver.get_accounts_with_tag(self.tag_key, tag_value)
+        return accounts
+
+
+def _compile(expression: Dict[str, Any]) -> TagExpression:
+    if "and" in expression:
+        return And([_compile(operand) for operand in expression["and"]])
+    if "or" in expression:
+        return Or([_compile(operand) for operand in expression["or"]])
+    if "not" in expression:
+        return Not(_compile(expression["not"]))
+    if "value" in expression:
+        return ValueIn(expression["key"], frozenset([expression["value"]]))
+    if "values" in expression:
+        return ValueIn(expression["key"], frozenset(expression["values"]))
+    if "key" in expression:
+        return HasKey(expression["key"])
+    raise ValueError(f"Invalid tag expression {expression}")
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(expression_json: str) -> TagExpression:
+    expression: Dict[str, Any] = json.loads(expression_json)
+    return _compile(expression)
+
+
+def compile_tag_expression(expression: Dict[str, Any]) -> TagExpression:
+    """
+    Compiles a tag expression, once per distinct expression per execution
+    environment. Expressions are objects of the form:
+
+        {"and": [expression, ...]}
+        {"or": [expression, ...]}
+        {"not": expression}
+        {"key": "<tag key>"}                                  tag key exists
+        {"key": "<tag key>", "value": "<tag value>"}          tag equals value
+        {"key": "<tag key>", "values": ["<tag value>", ...]}  tag value in set
+    """
+    return _compile_cached(json.dumps(expression, sort_keys=True))
+
+
+def tags_to_expression(tags: Sequence[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Expresses the tag filter of a tags target, every tag must match. A filter
+    without tags becomes an empty conjunction, which matches no accounts.
+    """
+    return {
+        "and": [
+            {"key": tag_key, "value": tag_value}
+            for tag in tags
+            for tag_key, tag_value in tag.items()
+        ]
+    }
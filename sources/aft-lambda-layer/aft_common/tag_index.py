@@ -0,0 +1,266 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from aft_common import aft_utils as utils
+from boto3.session import Session
+from botocore.config import Config
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_organizations import OrganizationsClient
+else:
+    Table = object
+    OrganizationsClient = object
+
+logger = utils.get_logger()
+
+
+class AccountTagIndex:
+    """
+    Inverted index of account tags in the account tag index table, so the accounts
+    with a tag are read with one GetItem instead of listing the tags of every AFT
+    account.
+
+    Each tag key and value maps to the set of accounts that carry it. Every account
+    also has an entry holding the tags it was last indexed with, which is how tags
+    removed from an account are dropped from the index. Organizations does not
+    allow '#' in tag keys or values, so entries keyed with it cannot collide with
+    tags.
+
+    The index is maintained by the tag_account provisioning step, and can be
+    rebuilt from Organizations on demand.
+    """
+
+    ACCOUNT_ENTRY_KEY = "#account"
+    STATUS_ENTRY_KEY = "#index"
+    STATUS_ENTRY_VALUE = "status"
+    # Key attributes cannot be empty strings, tag values can
+    EMPTY_TAG_VALUE = "#empty"
+
+    REBUILD_MAX_WORKERS = 10
+    REBUILD_MAX_ATTEMPTS = 8
+
+    def __init__(self, aft_management_session: Session) -> None:
+        table_name = utils.get_cached_ssm_parameter_value(
+            aft_management_session,
+            utils.SSM_PARAM_AFT_DDB_ACCOUNT_TAG_INDEX_TABLE,
+        )
+        self.table: Table = aft_management_session.resource("dynamodb").Table(
+            table_name
+        )
+
+    @staticmethod
+    def _entry_key(tag_key: str, tag_value: str) -> Dict[str, str]:
+        return {
+            "tag_key": tag_key,
+            "tag_value": tag_value or AccountTagIndex.EMPTY_TAG_VALUE,
+        }
+
+    def is_built(self) -> bool:
+        response = self.table.get_item(
+            Key={
+                "tag_key": AccountTagIndex.STATUS_ENTRY_KEY,
+                "tag_value": AccountTagIndex.STATUS_ENTRY_VALUE,
+            }
+        )
+        return "Item" in response
+
+    def mark_stale(self) -> None:
+        """
+        Removes the status entry, so the index is rebuilt before it is next used
+        """
+        self.table.delete_item(
+            Key={
+                "tag_key": AccountTagIndex.STATUS_ENTRY_KEY,
+                "tag_value": AccountTagIndex.STATUS_ENTRY_VALUE,
+            }
+        )
+
+    def get_account_tags(self, account_id: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the tags an account was last indexed with, or None if it is not
+        in the index
+        """
+        response = self.table.get_item(
+            Key={"tag_key": AccountTagIndex.ACCOUNT_ENTRY_KEY, "tag_value": account_id},
+            ConsistentRead=True,
+        )
+        if "Item" not in response:
+            return None
+        item: Dict[str, Any] = response["Item"]
+        tags: Dict[str, str] = item["tags"]
+        return tags
+
+    def get_accounts(self, tag_key: str, tag_value: str) -> Set[str]:
+        """
+        Returns the accounts tagged with tag_key set to tag_value
+        """
+        response = self.table.get_item(Key=self._entry_key(tag_key, tag_value))
+        item: Dict[str, Any] = response.get("Item", {})
+        return set(item.get("accounts", set()))
+
+    def get_accounts_with_key(self, tag_key: str) -> Set[str]:
+        """
+        Returns the accounts tagged with tag_key, whatever its value
+        """
+        accounts: Set[str] = set()
+        query_args: Dict[str, Any] = {
+            "KeyConditionExpression": "tag_key = :tag_key",
+            "ExpressionAttributeValues": {":tag_key": tag_key},
+        }
+        while True:
+            response = self.table.query(**query_args)
+            items: List[Dict[str, Any]] = response["Items"]
+            for item in items:
+                accounts |= set(item.get("accounts", set()))
+            if "LastEvaluatedKey" not in response:
+                return accounts
+            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def update_account(self, account_id: str, tags: Dict[str, str]) -> None:
+        """
+        Replaces the tags indexed for an account
+        """
+        previous_tags = self.get_account_tags(account_id) or {}
+        added = tags.items() - previous_tags.items()
+        removed = previous_tags.items() - tags.items()
+
+        for tag_key, tag_value in removed:
+            self.table.update_item(
+                Key=self._entry_key(tag_key, tag_value),
+                UpdateExpression="DELETE accounts :account",
+                ExpressionAttributeValues={":account": {account_id}},
+            )
+        for tag_key, tag_value in added:
+            self.table.update_item(
+                Key=self._entry_key(tag_key, tag_value),
+                UpdateExpression="ADD accounts :account",
+                ExpressionAttributeValues={":account": {account_id}},
+            )
+        self.table.put_item(
+            Item={
+                "tag_key": AccountTagIndex.ACCOUNT_ENTRY_KEY,
+                "tag_value": account_id,
+                "tags": tags,
+            }
+        )
+        logger.info(
+            f"Indexed tags for account {account_id}, added {sorted(added)}, removed {sorted(removed)}"
+        )
+
+    def refresh_account(
+        self, ct_management_session: Session, account_id: str
+    ) -> Dict[str, str]:
+        """
+        Indexes the tags an account currently has in Organizations
+        """
+        client: OrganizationsClient = ct_management_session.client("organizations")
+        tags = get_account_tags(client, account_id)
+        self.update_account(account_id, tags)
+        return tags
+
+    def scan(self) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        response = self.table.scan(ConsistentRead=True)
+        items.extend(response["Items"])
+        while "LastEvaluatedKey" in response:
+            response = self.table.scan(
+                ConsistentRead=True, ExclusiveStartKey=response["LastEvaluatedKey"]
+            )
+            items.extend(response["Items"])
+        return items
+
+    def rebuild(
+        self, ct_management_session: Session, account_ids: Iterable[str]
+    ) -> None:
+        """
+        Rebuilds the index from the tags the accounts have in Organizations. Tags
+        are listed in parallel, and the index is rewritten with batched writes.
+        """
+        account_ids = list(account_ids)
+        logger.info(f"Rebuilding account tag index for {len(account_ids)} accounts")
+        client: OrganizationsClient = ct_management_session.client(
+            "organizations",
+            config=Config(
+                max_pool_connections=AccountTagIndex.REBUILD_MAX_WORKERS,
+                retries={
+                    "max_attempts": AccountTagIndex.REBUILD_MAX_ATTEMPTS,
+                    "mode": "adaptive",
+                },
+            ),
+        )
+        with ThreadPoolExecutor(
+            max_workers=AccountTagIndex.REBUILD_MAX_WORKERS
+        ) as executor:
+            account_tags = dict(
+                zip(
+                    account_ids,
+                    executor.map(
+                        lambda account_id: get_account_tags(client, account_id),
+                        account_ids,
+                    ),
+                )
+            )
+
+        entries: Dict[Tuple[str, str], Set[str]] = {}
+        for account_id, tags in account_tags.items():
+            for tag_key, tag_value in tags.items():
+                entries.setdefault((tag_key, tag_value), set()).add(account_id)
+        entry_keys = {
+            tuple(self._entry_key(tag_key, tag_value).values())
+            for tag_key, tag_value in entries
+        }
+        stale_items = [
+            item
+            for item in self.scan()
+            if item["tag_key"] != AccountTagIndex.STATUS_ENTRY_KEY
+            and (item["tag_key"], item["tag_value"]) not in entry_keys
+            and not (
+                item["tag_key"] == AccountTagIndex.ACCOUNT_ENTRY_KEY
+                and item["tag_value"] in account_tags
+            )
+        ]
+
+        with self.table.batch_writer(
+            overwrite_by_pkeys=["tag_key", "tag_value"]
+        ) as batch:
+            for item in stale_items:
+                batch.delete_item(
+                    Key={"tag_key": item["tag_key"], "tag_value": item["tag_value"]}
+                )
+            for (tag_key, tag_value), accounts in entries.items():
+                batch.put_item(
+                    Item={**self._entry_key(tag_key, tag_value), "accounts": accounts}
+                )
+            for account_id, tags in account_tags.items():
+                batch.put_item(
+                    Item={
+                        "tag_key": AccountTagIndex.ACCOUNT_ENTRY_KEY,
+                        "tag_value": account_id,
+                        "tags": tags,
+                    }
+                )
+
+        self.table.put_item(
+            Item={
+                "tag_key": AccountTagIndex.STATUS_ENTRY_KEY,
+                "tag_value": AccountTagIndex.STATUS_ENTRY_VALUE,
+                "built_at": int(time.time()),
+                "account_count": len(account_tags),
+            }
+        )
+        logger.info(
+            f"Rebuilt account tag index with {len(entries)} tags, removed {len(stale_items)} stale entries"
+        )
+
+
+def get_account_tags(client: OrganizationsClient, account_id: str) -> Dict[str, str]:
+    tags: Dict[str, str] = {}
+    paginator = client.get_paginator("list_tags_for_resource")
+    for page in paginator.paginate(ResourceId=account_id):
+        tags.update({tag["Key"]: tag["Value"] for tag in page["Tags"]})
+    return tags
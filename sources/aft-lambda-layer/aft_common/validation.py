@@ -0,0 +1,45 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import aft_common.aft_utils as utils
+import jsonschema
+
+IDENTIFY_TARGETS_REQUEST_SCHEMA = "identify_targets_request_schema.json"
+ACCOUNT_REQUEST_SCHEMA = "account_request_schema.json"
+
+logger = utils.get_logger()
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_name: str) -> Any:
+    """
+    Loads a schema from the schemas directory and compiles its validator, once
+    per execution environment
+    """
+    schema_path = os.path.join(os.path.dirname(__file__), "schemas", schema_name)
+    with open(schema_path) as schema_file:
+        schema_object = json.load(schema_file)
+    validator_class = jsonschema.validators.validator_for(schema_object)
+    validator_class.check_schema(schema_object)
+    logger.info("Schema Loaded: " + schema_name)
+    return validator_class(schema_object)
+
+
+def get_validation_errors(schema_name: str, instance: Any) -> List[Dict[str, str]]:
+    """
+    Returns every way instance fails to match the schema, as the JSON path of the
+    offending value and a message, or an empty list if it is valid
+    """
+    errors = [
+        {
+            "path": "$" + "".join(f"[{part!r}]" for part in error.absolute_path),
+            "message": error.message,
+        }
+        for error in get_validator(schema_name).iter_errors(instance)
+    ]
+    return sorted(errors, key=lambda error: error["path"])
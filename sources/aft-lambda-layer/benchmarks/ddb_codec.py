@@ -0,0 +1,79 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""
+Compares aft_common.ddb's attribute value codec with boto3's TypeSerializer and
+TypeDeserializer on account request images, and checks that both produce the
+same results.
+
+Usage, from sources/aft-lambda-layer: PYTHONPATH=. python benchmarks/ddb_codec.py [iterations]
+"""
+import json
+import sys
+import timeit
+from decimal import Decimal
+from typing import Any, Dict
+
+from aft_common import ddb
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+
+def build_account_request(index: int) -> Dict[str, Any]:
+    return {
+        "id": f"account-{index}@example.com",
+        "control_tower_parameters": {
+            "AccountEmail": f"account-{index}@example.com",
+            "AccountName": f"account-{index}",
+            "ManagedOrganizationalUnit": "Workloads (ou-abcd-12345678)",
+            "SSOUserEmail": f"owner-{index}@example.com",
+            "SSOUserFirstName": "Account",
+            "SSOUserLastName": "Owner",
+        },
+        "change_management_parameters": {
+            "change_requested_by": "AFT",
+            "change_reason": "Account vending",
+        },
+        "account_tags": json.dumps(
+            {f"tag-{i}": f"value-{i}" for i in range(20)}, separators=(",", ":")
+        ),
+        "custom_fields": json.dumps(
+            {f"field-{i}": f"value-{i}" for i in range(10)}, separators=(",", ":")
+        ),
+        "account_customizations_name": "baseline",
+        "regions": ["us-east-1", "us-west-2", "eu-west-1"],
+        "owners": {"platform", "security"},
+        "ordinal": Decimal(index),
+        "enabled": True,
+        "parent": None,
+        "checksum": Binary(b"\x00\x01\x02"),
+    }
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    item = build_account_request(1)
+    image = {k: serializer.serialize(v) for k, v in item.items()}
+
+    assert ddb.marshal_ddb_item(item) == image
+    assert ddb.unmarshal_ddb_item(image) == item
+    assert ddb.unmarshal_ddb_item(ddb.marshal_ddb_item(item)) == item
+
+    benchmarks = {
+        "boto3 deserialize": lambda: {
+            k: deserializer.deserialize(v) for k, v in image.items()
+        },
+        "ddb.unmarshal_ddb_item": lambda: ddb.unmarshal_ddb_item(image),
+        "boto3 serialize": lambda: {
+            k: serializer.serialize(v) for k, v in item.items()
+        },
+        "ddb.marshal_ddb_item": lambda: ddb.marshal_ddb_item(item),
+    }
+    for name, benchmark in benchmarks.items():
+        elapsed = min(timeit.repeat(benchmark, number=iterations, repeat=5))
+        print(f"{name:<24} {elapsed / iterations * 1e6:8.2f} us/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from aft_common.account_request_framework import (
+    coalesce_account_request_messages,
+    fold_account_requests,
+)
+
+if TYPE_CHECKING:
+    from mypy_boto3_sqs.type_defs import MessageTypeDef
+else:
+    MessageTypeDef = object
+
+
+def account_request(
+    operation: str, account_name: str, old_account_name: str = ""
+) -> Dict[str, Any]:
+    request: Dict[str, Any] = {
+        "operation": operation,
+        "control_tower_parameters": {
+            "AccountEmail": "account@example.com",
+            "AccountName": account_name,
+        },
+    }
+    if old_account_name:
+        request["old_control_tower_parameters"] = {
+            "AccountEmail": "account@example.com",
+            "AccountName": old_account_name,
+        }
+    return request
+
+
+def test_fold_single_request_is_unchanged() -> None:
+    request = account_request("UPDATE", "b", old_account_name="a")
+
+    assert fold_account_requests([request]) == request
+
+
+def test_fold_updates_keeps_oldest_previous_state() -> None:
+    folded = fold_account_requests(
+        [
+            account_request("UPDATE", "b", old_account_name="a"),
+            account_request("UPDATE", "c", old_account_name="b"),
+        ]
+    )
+
+    assert folded["operation"] == "UPDATE"
+    assert folded["control_tower_parameters"]["AccountName"] == "c"
+    assert folded["old_control_tower_parameters"]["AccountName"] == "a"
+
+
+def test_fold_add_then_update_stays_add() -> None:
+    folded = fold_account_requests(
+        [
+            account_request("ADD", "a"),
+            account_request("UPDATE", "b", old_account_name="a"),
+        ]
+    )
+
+    assert folded["operation"] == "ADD"
+    assert folded["control_tower_parameters"]["AccountName"] == "b"
+    assert "old_control_tower_parameters" not in folded
+
+
+def test_fold_does_not_modify_requests() -> None:
+    requests = [
+        account_request("ADD", "a"),
+        account_request("UPDATE", "b", old_account_name="a"),
+    ]
+
+    fold_account_requests(requests)
+
+    assert requests[1]["operation"] == "UPDATE"
+    assert "old_control_tower_parameters" in requests[1]
+
+
+def test_coalesce_groups_by_normalized_email_in_arrival_order() -> None:
+    first = account_request("UPDATE", "b", old_account_name="a")
+    other = account_request("ADD", "x")
+    other["control_tower_parameters"]["AccountEmail"] = "other@example.com"
+    second = account_request("UPDATE", "c", old_account_name="b")
+    second["control_tower_parameters"]["AccountEmail"] = " Account@Example.com"
+    messages: List[MessageTypeDef] = [
+        {"MessageId": str(index), "Body": json.dumps(request)}
+        for index, request in enumerate([first, other, second])
+    ]
+
+    coalesced = coalesce_account_request_messages(messages)
+
+    assert [
+        (request["control_tower_parameters"]["AccountName"], account_messages)
+        for request, account_messages in coalesced
+    ] == [("c", [messages[0], messages[2]]), ("x", [messages[1]])]
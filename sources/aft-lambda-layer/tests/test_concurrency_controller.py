@@ -0,0 +1,130 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from typing import Dict
+from unittest import mock
+
+import pytest
+from aft_common import concurrency_controller
+from aft_common.concurrency_controller import WINDOW_ATTRIBUTES, ConcurrencyController
+
+CEILING = 10
+
+
+@pytest.fixture
+def controller() -> ConcurrencyController:
+    with mock.patch.object(
+        concurrency_controller.utils,
+        "get_cached_ssm_parameter_value",
+        return_value=str(CEILING),
+    ):
+        controller = ConcurrencyController(mock.MagicMock())
+        assert controller.ceiling == CEILING
+    return controller
+
+
+def window(**counters: int) -> Dict[str, int]:
+    return {name: counters.get(name, 0) for name in WINDOW_ATTRIBUTES}
+
+
+def test_increase_when_pipelines_succeed(controller: ConcurrencyController) -> None:
+    limit, baseline, reason = controller.evaluate(
+        4, window(window_completed=1, window_duration_seconds=600), None
+    )
+
+    assert limit == 5
+    # Too few completions to establish a baseline
+    assert baseline is None
+    assert reason.startswith("increase")
+
+
+def test_increase_is_capped_at_ceiling(controller: ConcurrencyController) -> None:
+    limit, _, _ = controller.evaluate(
+        CEILING, window(window_completed=1, window_duration_seconds=600), None
+    )
+
+    assert limit == CEILING
+
+
+def test_hold_when_nothing_succeeded(controller: ConcurrencyController) -> None:
+    limit, baseline, reason = controller.evaluate(4, window(), 300.0)
+
+    assert (limit, baseline) == (4, 300.0)
+    assert reason.startswith("hold")
+
+
+@pytest.mark.parametrize(
+    "counters",
+    [
+        {"window_completed": 1, "window_throttled": 2},
+        {"window_queued_builds": 2, "window_queued_seconds": 600},
+        {"window_completed": 4, "window_failed": 2, "window_duration_seconds": 1200},
+    ],
+)
+def test_decrease_on_contention(
+    controller: ConcurrencyController, counters: Dict[str, int]
+) -> None:
+    limit, baseline, reason = controller.evaluate(8, window(**counters), 300.0)
+
+    assert limit == 4
+    assert baseline == 300.0
+    assert reason.startswith("decrease")
+
+
+def test_decrease_when_durations_inflate(controller: ConcurrencyController) -> None:
+    limit, baseline, reason = controller.evaluate(
+        8, window(window_completed=3, window_duration_seconds=3 * 500), 300.0
+    )
+
+    assert limit == 4
+    # Inflated durations do not move the baseline
+    assert baseline == 300.0
+    assert "average duration" in reason
+
+
+def test_decrease_does_not_go_below_minimum(
+    controller: ConcurrencyController,
+) -> None:
+    limit, _, _ = controller.evaluate(1, window(window_throttled=1), None)
+
+    assert limit == ConcurrencyController.MINIMUM_LIMIT
+
+
+def test_short_queue_times_do_not_decrease(
+    controller: ConcurrencyController,
+) -> None:
+    limit, _, _ = controller.evaluate(
+        4,
+        window(
+            window_completed=1,
+            window_duration_seconds=300,
+            window_queued_builds=2,
+            window_queued_seconds=60,
+        ),
+        None,
+    )
+
+    assert limit == 5
+
+
+def test_baseline_moves_towards_average_duration(
+    controller: ConcurrencyController,
+) -> None:
+    _, baseline, _ = controller.evaluate(
+        4, window(window_completed=3, window_duration_seconds=3 * 400), 300.0
+    )
+
+    assert baseline == pytest.approx(
+        (1 - ConcurrencyController.BASELINE_WEIGHT) * 300
+        + ConcurrencyController.BASELINE_WEIGHT * 400
+    )
+
+
+def test_first_baseline_is_average_duration(
+    controller: ConcurrencyController,
+) -> None:
+    _, baseline, _ = controller.evaluate(
+        4, window(window_completed=3, window_duration_seconds=3 * 400), None
+    )
+
+    assert baseline == 400
@@ -0,0 +1,250 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from unittest import mock
+
+import pytest
+from aft_common import provisioning_scheduler
+from aft_common.provisioning_scheduler import ProvisioningScheduler, ProvisioningSlot
+from botocore.exceptions import ClientError
+
+NOW = 1_700_000_000
+TABLE_NAME = "aft-provisioning-operations"
+
+
+def conditional_check_failed(operation_name: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+        operation_name,
+    )
+
+
+class FakeTable:
+    """
+    In-memory stand-in for the provisioning operations table. Evaluates only the
+    condition expressions ProvisioningScheduler uses.
+    """
+
+    def __init__(self) -> None:
+        self.items: Dict[str, Dict[str, Any]] = {}
+
+    def put_item(
+        self,
+        Item: Dict[str, Any],
+        ConditionExpression: Optional[str] = None,
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        current = self.items.get(Item["id"])
+        if ConditionExpression is not None and current is not None:
+            # attribute_not_exists(id) OR lease_expires_at < :now
+            assert ExpressionAttributeValues is not None
+            if not current["lease_expires_at"] < ExpressionAttributeValues[":now"]:
+                raise conditional_check_failed("PutItem")
+        self.items[Item["id"]] = dict(Item)
+
+    def update_item(
+        self,
+        Key: Dict[str, str],
+        UpdateExpression: str,
+        ConditionExpression: str,
+        ExpressionAttributeValues: Dict[str, Any],
+    ) -> None:
+        current = self.items.get(Key["id"])
+        # lease_token = :lease_token
+        if (
+            current is None
+            or current["lease_token"] != ExpressionAttributeValues[":lease_token"]
+        ):
+            raise conditional_check_failed("UpdateItem")
+        for name, value in re.findall(r"(\w+) = (:\w+)", UpdateExpression):
+            current[name] = ExpressionAttributeValues[value]
+
+    def delete_item(
+        self,
+        Key: Dict[str, str],
+        ConditionExpression: Optional[str] = None,
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        current = self.items.get(Key["id"])
+        if ConditionExpression is not None:
+            # lease_token = :lease_token
+            assert ExpressionAttributeValues is not None
+            if (
+                current is None
+                or current["lease_token"] != ExpressionAttributeValues[":lease_token"]
+            ):
+                raise conditional_check_failed("DeleteItem")
+        self.items.pop(Key["id"], None)
+
+    def batch_get(self, keys: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(self.items[key["id"]]) for key in keys if key["id"] in self.items]
+
+
+@pytest.fixture
+def table() -> Iterator[FakeTable]:
+    table = FakeTable()
+    with mock.patch.object(
+        provisioning_scheduler.utils,
+        "get_ssm_parameter_value",
+        return_value=TABLE_NAME,
+    ), mock.patch.object(
+        provisioning_scheduler.ddb,
+        "batch_get_ddb_items",
+        side_effect=lambda session, table_name, keys: table.batch_get(keys),
+    ), mock.patch.object(
+        provisioning_scheduler.time, "time", return_value=NOW
+    ):
+        yield table
+
+
+def make_scheduler(table: FakeTable, slots: int = 2) -> ProvisioningScheduler:
+    session = mock.MagicMock()
+    session.resource.return_value.Table.return_value = table
+    return ProvisioningScheduler(session, maximum_concurrent_operations=slots)
+
+
+def held_slot(
+    slot_id: str, lease_expires_at: int, account_email: Optional[str] = None
+) -> Dict[str, Any]:
+    item: Dict[str, Any] = {
+        "id": slot_id,
+        "lease_token": f"{slot_id}-token",
+        "lease_expires_at": lease_expires_at,
+        "claimed_at": NOW - 60,
+    }
+    if account_email is not None:
+        item["account_email"] = account_email
+    return item
+
+
+def test_claim_slot_claims_first_free_slot(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+
+    slot = scheduler.claim_slot()
+
+    assert slot is not None
+    assert slot["id"] == "slot-0"
+    assert table.items["slot-0"]["lease_token"] == slot["lease_token"]
+    assert (
+        table.items["slot-0"]["lease_expires_at"]
+        == NOW + ProvisioningScheduler.CLAIM_LEASE_SECONDS
+    )
+
+
+def test_claim_slot_moves_on_when_another_invocation_claims_first(
+    table: FakeTable,
+) -> None:
+    scheduler = make_scheduler(table)
+    # Claimed by another invocation after this one read the held slots
+    table.items["slot-0"] = held_slot("slot-0", NOW + 60)
+
+    with mock.patch.object(
+        provisioning_scheduler.ddb, "batch_get_ddb_items", return_value=[]
+    ):
+        slot = scheduler.claim_slot()
+
+    assert slot is not None
+    assert slot["id"] == "slot-1"
+    assert table.items["slot-0"]["lease_token"] == "slot-0-token"
+
+
+def test_claim_slot_returns_none_when_all_slots_held(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    table.items["slot-0"] = held_slot("slot-0", NOW + 60)
+    table.items["slot-1"] = held_slot("slot-1", NOW + 60)
+
+    assert scheduler.claim_slot() is None
+    assert scheduler.available_slots() == 0
+
+
+def test_claim_slot_reclaims_expired_lease(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    table.items["slot-0"] = held_slot("slot-0", NOW - 1)
+    table.items["slot-1"] = held_slot("slot-1", NOW + 60)
+
+    assert scheduler.get_operations() == [table.items["slot-1"]]
+    slot = scheduler.claim_slot()
+
+    assert slot is not None
+    assert slot["id"] == "slot-0"
+    assert table.items["slot-0"]["lease_token"] == slot["lease_token"]
+
+
+def test_bind_slot_extends_lease(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    slot = scheduler.claim_slot()
+    assert slot is not None
+
+    scheduler.bind_slot(
+        slot=slot,
+        request={
+            "operation": "ADD",
+            "control_tower_parameters": {
+                "AccountEmail": "Account@example.com",
+                "AccountName": "account",
+            },
+        },
+        provisioned_product_id="pp-1",
+        record_id="rec-1",
+    )
+
+    item = table.items["slot-0"]
+    assert item["provisioned_product_id"] == "pp-1"
+    assert item["account_email"] == "Account@example.com"
+    assert (
+        item["lease_expires_at"] == NOW + ProvisioningScheduler.OPERATION_LEASE_SECONDS
+    )
+    assert scheduler.account_has_operation_in_flight("account@example.com")
+
+
+def test_bind_slot_fails_after_lease_lost(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    slot = ProvisioningSlot(id="slot-0", lease_token="expired-token")
+    table.items["slot-0"] = held_slot("slot-0", NOW + 60)
+
+    with pytest.raises(ClientError):
+        scheduler.bind_slot(
+            slot=slot,
+            request={
+                "operation": "ADD",
+                "control_tower_parameters": {
+                    "AccountEmail": "account@example.com",
+                    "AccountName": "account",
+                },
+            },
+            provisioned_product_id="pp-1",
+            record_id="rec-1",
+        )
+    assert "provisioned_product_id" not in table.items["slot-0"]
+
+
+def test_release_slot_deletes_own_claim(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    slot = scheduler.claim_slot()
+    assert slot is not None
+
+    scheduler.release_slot(slot)
+
+    assert "slot-0" not in table.items
+
+
+def test_release_slot_keeps_claim_of_another_invocation(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    # The lease expired and another invocation claimed the slot
+    table.items["slot-0"] = held_slot("slot-0", NOW + 60)
+
+    scheduler.release_slot(ProvisioningSlot(id="slot-0", lease_token="stale-token"))
+
+    assert table.items["slot-0"]["lease_token"] == "slot-0-token"
+
+
+def test_release_account_operations(table: FakeTable) -> None:
+    scheduler = make_scheduler(table)
+    table.items["slot-0"] = held_slot("slot-0", NOW + 60, "Account@example.com")
+    table.items["slot-1"] = held_slot("slot-1", NOW + 60, "other@example.com")
+
+    assert scheduler.release_account_operations("account@EXAMPLE.com")
+    assert list(table.items) == ["slot-1"]
+    assert not scheduler.release_account_operations("account@example.com")
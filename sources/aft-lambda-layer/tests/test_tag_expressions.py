@@ -0,0 +1,137 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from typing import Any, Dict, List, Set, Tuple
+
+import pytest
+from aft_common.tag_expressions import (
+    And,
+    HasKey,
+    Not,
+    Or,
+    ValueIn,
+    compile_tag_expression,
+    tags_to_expression,
+)
+
+
+class FakeTagResolver:
+    def __init__(self, account_tags: Dict[str, Dict[str, str]]) -> None:
+        self.account_tags = account_tags
+        self.calls: List[Tuple[str, ...]] = []
+
+    @property
+    def aft_accounts(self) -> Set[str]:
+        return set(self.account_tags)
+
+    def get_accounts_with_tag(self, tag_key: str, tag_value: str) -> Set[str]:
+        self.calls.append((tag_key, tag_value))
+        return {
+            account_id
+            for account_id, tags in self.account_tags.items()
+            if tags.get(tag_key) == tag_value
+        }
+
+    def get_accounts_with_key(self, tag_key: str) -> Set[str]:
+        self.calls.append((tag_key,))
+        return {
+            account_id
+            for account_id, tags in self.account_tags.items()
+            if tag_key in tags
+        }
+
+
+@pytest.fixture
+def resolver() -> FakeTagResolver:
+    return FakeTagResolver(
+        {
+            "111111111111": {"env": "prod", "team": "a"},
+            "222222222222": {"env": "dev", "team": "a"},
+            "333333333333": {"env": "test"},
+            "444444444444": {},
+        }
+    )
+
+
+def test_compile_builds_expression_tree() -> None:
+    expression = compile_tag_expression(
+        {
+            "and": [
+                {"key": "env", "values": ["prod", "dev"]},
+                {"not": {"key": "team", "value": "b"}},
+                {"or": [{"key": "team"}]},
+            ]
+        }
+    )
+
+    assert isinstance(expression, And)
+    value_in, negation, disjunction = expression.operands
+    assert isinstance(value_in, ValueIn)
+    assert value_in.tag_values == frozenset(["prod", "dev"])
+    assert isinstance(negation, Not)
+    assert isinstance(negation.operand, ValueIn)
+    assert isinstance(disjunction, Or)
+    assert isinstance(disjunction.operands[0], HasKey)
+
+
+def test_compile_caches_equal_expressions() -> None:
+    assert compile_tag_expression(
+        {"key": "env", "value": "prod"}
+    ) is compile_tag_expression({"value": "prod", "key": "env"})
+
+
+def test_compile_rejects_invalid_expression() -> None:
+    with pytest.raises(ValueError):
+        compile_tag_expression({"tag": "env"})
+
+
+@pytest.mark.parametrize(
+    "expression,accounts",
+    [
+        ({"key": "env", "value": "prod"}, {"111111111111"}),
+        ({"key": "env", "values": ["dev", "test"]}, {"222222222222", "333333333333"}),
+        ({"key": "team"}, {"111111111111", "222222222222"}),
+        ({"not": {"key": "team"}}, {"333333333333", "444444444444"}),
+        (
+            {
+                "and": [
+                    {"key": "team", "value": "a"},
+                    {"not": {"key": "env", "value": "prod"}},
+                ]
+            },
+            {"222222222222"},
+        ),
+        (
+            {"or": [{"key": "env", "value": "test"}, {"key": "env", "value": "prod"}]},
+            {"111111111111", "333333333333"},
+        ),
+        ({"and": []}, set()),
+        ({"or": []}, set()),
+    ],
+)
+def test_evaluate(
+    resolver: FakeTagResolver, expression: Dict[str, Any], accounts: Set[str]
+) -> None:
+    assert compile_tag_expression(expression).evaluate(resolver) == accounts
+
+
+def test_and_stops_once_no_accounts_match(resolver: FakeTagResolver) -> None:
+    expression = compile_tag_expression(
+        {"and": [{"key": "env", "value": "none"}, {"key": "team"}]}
+    )
+
+    assert expression.evaluate(resolver) == set()
+    assert resolver.calls == [("env", "none")]
+
+
+def test_tags_to_expression(resolver: FakeTagResolver) -> None:
+    expression = tags_to_expression([{"env": "dev"}, {"team": "a"}])
+
+    assert expression == {
+        "and": [{"key": "env", "value": "dev"}, {"key": "team", "value": "a"}]
+    }
+    assert compile_tag_expression(expression).evaluate(resolver) == {"222222222222"}
+
+
+def test_empty_tags_match_no_accounts(resolver: FakeTagResolver) -> None:
+    assert compile_tag_expression(tags_to_expression([])).evaluate(resolver) == set()
@@ -8,6 +8,7 @@ from aft_common import aft_utils as utils
 from aft_common import notifications
 from aft_common.account_provisioning_framework import ProvisionRoles, tag_account
 from aft_common.auth import AuthClient
+from aft_common.tag_index import AccountTagIndex
 from boto3.session import Session
 
 if TYPE_CHECKING:
@@ -18,6 +19,39 @@ else:
 logger = utils.get_logger()
 
 
+def refresh_account_tag_index(
+    aft_management_session: Session,
+    ct_management_session: Session,
+    account_id: str,
+    context: LambdaContext,
+) -> None:
+    """
+    Indexes the account's tags. The account is already tagged, so an index error
+    does not fail provisioning; the index is marked stale to be rebuilt instead
+    """
+    tag_index = AccountTagIndex(aft_management_session)
+    try:
+        tag_index.refresh_account(ct_management_session, account_id)
+    except Exception as error:
+        message = {
+            "FILE": __file__.split("/")[-1],
+            "METHOD": inspect.stack()[0][3],
+            "ACCOUNT_ID": account_id,
+            "EXCEPTION": str(error),
+        }
+        logger.exception(message)
+        notifications.send_lambda_failure_sns_message(
+            session=aft_management_session,
+            message=f"Failed to index tags for account {account_id}: {error}",
+            context=context,
+            subject="AFT account tag index refresh failed",
+        )
+        try:
+            tag_index.mark_stale()
+        except Exception:
+            logger.exception("Failed to mark the account tag index stale")
+
+
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
     aft_management_session = Session()
     auth = AuthClient()
@@ -40,6 +74,12 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
         if action == "tag_account":
             account_info = payload["account_info"]["account"]
             tag_account(payload, account_info, ct_management_session, rollback)
+            refresh_account_tag_index(
+                aft_management_session,
+                ct_management_session,
+                account_info["id"],
+                context,
+            )
         else:
             raise Exception(
                 f"Incorrect Command Passed to Lambda Function. Input action: {action}. Expected: 'tag_account'"
@@ -3,94 +3,226 @@
 #
 import inspect
 import json
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from aft_common import aft_utils as utils
-from aft_common import notifications
+from aft_common import ddb, notifications, sqs, validation
+from aft_common.account_provisioning_framework import ProvisionRoles
 from aft_common.account_request_framework import (
+    ProvisionedProductEmailIndex,
     build_aft_account_provisioning_framework_event,
     control_tower_param_changed,
     delete_account_request,
-    insert_msg_into_acc_req_queue,
+    insert_msgs_into_acc_req_queue,
     provisioned_product_exists,
 )
 from aft_common.auth import AuthClient
-from aft_common.shared_account import shared_account_request
+from aft_common.shared_account import get_shared_accounts, shared_account_request
+from boto3.session import Session
 
 if TYPE_CHECKING:
     from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_organizations.type_defs import AccountTypeDef
 else:
     LambdaContext = object
+    AccountTypeDef = object
 
 logger = utils.get_logger()
 
 
-def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
+def report_record_failure(
+    session: Session,
+    record: ddb.StreamRecord,
+    error: str,
+    context: LambdaContext,
+) -> None:
+    notifications.send_lambda_failure_sns_message(
+        session=session,
+        message=error,
+        context=context,
+        subject="AFT account request failed",
+    )
+    message = {
+        "FILE": __file__.split("/")[-1],
+        "METHOD": inspect.stack()[0][3],
+        "SEQUENCE_NUMBER": record.sequence_number,
+        "EXCEPTION": error,
+    }
+    logger.error(message)
+
+
+# Stream index, record, and whether it is a new account (queued) or None (framework)
+RoutedRecord = Tuple[int, ddb.StreamRecord, Optional[bool]]
+
+
+def dispatch_account_requests(
+    session: Session,
+    routed_records: List[RoutedRecord],
+    context: LambdaContext,
+) -> Optional[int]:
+    """
+    Queues and invokes the routed account requests in stream order, stopping at the
+    first failure. Consecutive queued requests for distinct accounts are sent as one
+    group, so a retry never queues an account's older request after a newer one.
+    Returns the stream index of the request that failed, if any
+    """
+    lambda_name: Optional[str] = None
+    position = 0
+    while position < len(routed_records):
+        index, event_record, new_account = routed_records[position]
+        if new_account is None:
+            try:
+                if lambda_name is None:
+                    lambda_name = utils.get_ssm_parameter_value(
+                        session,
+                        utils.SSM_PARAM_AFT_ACCOUNT_PROVISIONING_FRAMEWORK_LAMBDA,
+                    )
+                payload = build_aft_account_provisioning_framework_event(event_record)
+                utils.invoke_lambda(session, lambda_name, json.dumps(payload).encode())
+            except Exception as error:
+                report_record_failure(session, event_record, str(error), context)
+                return index
+            position += 1
+            continue
+
+        group: List[RoutedRecord] = []
+        group_accounts = set()
+        while position < len(routed_records):
+            routed_record = routed_records[position]
+            account = sqs.get_message_group_id(routed_record[1].new_image)
+            if routed_record[2] is None or account in group_accounts:
+                break
+            group.append(routed_record)
+            group_accounts.add(account)
+            position += 1
+
+        failed_records = insert_msgs_into_acc_req_queue(
+            event_records=[event_record for _, event_record, _ in group],
+            new_accounts=[bool(new_account) for _, _, new_account in group],
+            session=session,
+        )
+        if failed_records:
+            report_record_failure(
+                session, failed_records[0], "Failed to queue account request", context
+            )
+            return next(
+                index
+                for index, event_record, _ in group
+                if event_record is failed_records[0]
+            )
+    return None
+
+
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    Routes the account request changes in the stream batch, then queues and
+    invokes the routed requests in stream order. Processing stops at the first
+    record that fails; it and every later record are reported through
+    batchItemFailures, so nothing past the checkpoint Lambda resumes from has
+    already taken effect.
+    """
     auth = AuthClient()
     try:
         # validate event
         if "Records" not in event:
-            return None
-        event_record = event["Records"][0]
-        if "eventSource" not in event_record:
-            return None
-        if event_record["eventSource"] != "aws:dynamodb":
-            return None
-
-        logger.info("DynamoDB Event Record Received")
-        if delete_account_request(event_record):
-            # Terraform handles removing the request record from DynamoDB
-            # AWS does not support automated deletion of accounts
-            logger.info("Delete account request received")
-            return None
-
-        # If it is a shared account update request, invoke the Account Provisioning Framework Lambda
-        if shared_account_request(event_record=event_record):
-            logger.info("Shared Account Update Request Received")
-            payload = build_aft_account_provisioning_framework_event(event_record)
-            lambda_name = utils.get_ssm_parameter_value(
-                auth.get_aft_management_session(),
-                utils.SSM_PARAM_AFT_ACCOUNT_PROVISIONING_FRAMEWORK_LAMBDA,
-            )
-            utils.invoke_lambda(
-                auth.get_aft_management_session(),
-                lambda_name,
-                json.dumps(payload).encode(),
-            )
-            return None
+            return {"batchItemFailures": []}
+        aft_management_session = auth.get_aft_management_session()
 
-        new_account = not provisioned_product_exists(event_record)
-        control_tower_updates = control_tower_param_changed(event_record)
+        event_records = [ddb.StreamRecord(record) for record in event["Records"]]
+        routed_records: List[RoutedRecord] = []
+        checkpoint: Optional[int] = None
+        ct_management_session: Optional[Session] = None
+        shared_accounts: Optional[List[AccountTypeDef]] = None
+        # Searched at most once per batch, and only if a record needs it
+        provisioned_products: Optional[ProvisionedProductEmailIndex] = None
 
-        if new_account:
-            logger.info("New account request received")
-            insert_msg_into_acc_req_queue(
-                event_record=event_record,
-                new_account=True,
-                session=auth.get_aft_management_session(),
-            )
-        elif not new_account and control_tower_updates:
-            logger.info("Modify account request received")
-            logger.info("Control Tower Parameter Update Request Received")
-            insert_msg_into_acc_req_queue(
-                event_record=event_record,
-                new_account=False,
-                session=auth.get_aft_management_session(),
-            )
-        elif not new_account and not control_tower_updates:
-            logger.info("NON-Control Tower Parameter Update Request Received")
-            payload = build_aft_account_provisioning_framework_event(event_record)
-            lambda_name = utils.get_ssm_parameter_value(
-                auth.get_aft_management_session(),
-                utils.SSM_PARAM_AFT_ACCOUNT_PROVISIONING_FRAMEWORK_LAMBDA,
-            )
-            utils.invoke_lambda(
-                auth.get_aft_management_session(),
-                lambda_name,
-                json.dumps(payload).encode(),
-            )
-        else:
-            raise Exception("Unsupported account request")
+        for index, event_record in enumerate(event_records):
+            if event_record.event_source != "aws:dynamodb":
+                continue
+
+            logger.info("DynamoDB Event Record Received")
+            try:
+                if delete_account_request(event_record):
+                    # Terraform handles removing the request record from DynamoDB
+                    # AWS does not support automated deletion of accounts
+                    logger.info("Delete account request received")
+                    continue
+
+                validation_errors = validation.get_validation_errors(
+                    validation.ACCOUNT_REQUEST_SCHEMA, event_record.new_image
+                )
+                if validation_errors:
+                    # Retrying cannot fix the request, a corrected request is a new record
+                    report_record_failure(
+                        aft_management_session,
+                        event_record,
+                        f"Account request failed validation: {validation_errors}",
+                        context,
+                    )
+                    continue
+
+                if ct_management_session is None:
+                    ct_management_session = auth.get_ct_management_session(
+                        role_name=ProvisionRoles.SERVICE_ROLE_NAME
+                    )
+                if shared_accounts is None:
+                    shared_accounts = get_shared_accounts(
+                        aft_management_session=aft_management_session,
+                        ct_management_session=ct_management_session,
+                    )
+
+                # If it is a shared account update request, invoke the Account Provisioning Framework Lambda
+                if shared_account_request(
+                    event_record=event_record, shared_accounts=shared_accounts
+                ):
+                    logger.info("Shared Account Update Request Received")
+                    routed_records.append((index, event_record, None))
+                    continue
+
+                if provisioned_products is None:
+                    provisioned_products = ProvisionedProductEmailIndex(
+                        ct_management_session
+                    )
+                new_account = not provisioned_product_exists(
+                    event_record, provisioned_products
+                )
+                control_tower_updates = control_tower_param_changed(event_record)
+
+                if new_account:
+                    logger.info("New account request received")
+                    routed_records.append((index, event_record, True))
+                elif not new_account and control_tower_updates:
+                    logger.info("Modify account request received")
+                    logger.info("Control Tower Parameter Update Request Received")
+                    routed_records.append((index, event_record, False))
+                elif not new_account and not control_tower_updates:
+                    logger.info("NON-Control Tower Parameter Update Request Received")
+                    routed_records.append((index, event_record, None))
+                else:
+                    raise Exception("Unsupported account request")
+
+            except Exception as error:
+                report_record_failure(
+                    aft_management_session, event_record, str(error), context
+                )
+                checkpoint = index
+                break
+
+        dispatch_failure = dispatch_account_requests(
+            aft_management_session, routed_records, context
+        )
+        if dispatch_failure is not None:
+            checkpoint = dispatch_failure
+
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": event_record.sequence_number}
+                for event_record in event_records[checkpoint:]
+                if event_record.event_source == "aws:dynamodb"
+            ]
+            if checkpoint is not None
+            else []
+        }
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
@@ -3,11 +3,11 @@
 #
 import inspect
 import sys
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from aft_common import aft_utils as utils
-from aft_common import notifications
-from aft_common.account_request_framework import put_audit_record
+from aft_common import ddb, notifications
+from aft_common.account_request_framework import put_audit_records
 from boto3.session import Session
 
 if TYPE_CHECKING:
@@ -18,43 +18,50 @@ else:
 logger = utils.get_logger()
 
 
-def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     aft_management_session = Session()
     try:
         # validate event
-        if "Records" in event:
-            response = None
-            event_record = event["Records"][0]
-            if "eventSource" in event_record:
-                if event_record["eventSource"] == "aws:dynamodb":
-                    logger.info("DynamoDB Event Record Received")
-                    table_name = utils.get_ssm_parameter_value(
-                        aft_management_session, utils.SSM_PARAM_AFT_DDB_AUDIT_TABLE
-                    )
-                    event_name = event_record["eventName"]
+        if "Records" not in event:
+            logger.info("Unexpected Event Received")
+            return {"batchItemFailures": []}
 
-                    supported_events = {"INSERT", "MODIFY", "REMOVE"}
+        supported_events = {"INSERT", "MODIFY", "REMOVE"}
+        records_to_audit: List[ddb.StreamRecord] = []
+        for raw_record in event["Records"]:
+            event_record = ddb.StreamRecord(raw_record)
+            if event_record.event_source != "aws:dynamodb":
+                logger.info("Non DynamoDB Event Received")
+                sys.exit(1)
+            if event_record.event_name in supported_events:
+                logger.info("Event Name: " + event_record.event_name)
+                records_to_audit.append(event_record)
+            else:
+                logger.info(f"Event Name: {event_record.event_name} is unsupported.")
 
-                    image_key_name = (
-                        "OldImage" if event_name == "REMOVE" else "NewImage"
-                    )
-                    image_to_record = event_record["dynamodb"][image_key_name]
+        if not records_to_audit:
+            return {"batchItemFailures": []}
 
-                    if event_name in supported_events:
-                        logger.info("Event Name: " + event_name)
-                        response = put_audit_record(
-                            aft_management_session,
-                            table_name,
-                            image_to_record,
-                            event_name,
-                        )
-                    else:
-                        logger.info(f"Event Name: {event_name} is unsupported.")
-                else:
-                    logger.info("Non DynamoDB Event Received")
-                    sys.exit(1)
-        else:
-            logger.info("Unexpected Event Received")
+        logger.info(f"{len(records_to_audit)} DynamoDB Event Records Received")
+        table_name = utils.get_ssm_parameter_value(
+            aft_management_session, utils.SSM_PARAM_AFT_DDB_AUDIT_TABLE
+        )
+        failed_records = put_audit_records(
+            aft_management_session, table_name, records_to_audit
+        )
+        if failed_records:
+            notifications.send_lambda_failure_sns_message(
+                session=aft_management_session,
+                message=f"Failed to audit {len(failed_records)} account request changes",
+                context=context,
+                subject="AFT account request failed",
+            )
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": event_record.sequence_number}
+                for event_record in failed_records
+            ]
+        }
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
@@ -2,15 +2,19 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import inspect
-import json
-import time
-from typing import TYPE_CHECKING, Any, Dict
+import random
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from aft_common import aft_utils as utils
 from aft_common import notifications, sqs
 from aft_common.account_provisioning_framework import ProvisionRoles
 from aft_common.account_request_framework import (
+    ACCOUNT_REQUEST_PRIORITY_HIGH,
+    ACCOUNT_REQUEST_PRIORITY_NORMAL,
+    ACCOUNT_REQUEST_PRIORITY_QUEUES,
+    AccountNameEmailIndex,
     AccountRequest,
+    coalesce_account_request_messages,
     create_new_account,
     modify_ct_request_is_valid,
     new_ct_request_is_valid,
@@ -19,16 +23,225 @@ from aft_common.account_request_framework import (
 from aft_common.auth import AuthClient
 from aft_common.exceptions import NoAccountFactoryPortfolioFound
 from aft_common.metrics import AFTMetrics
+from aft_common.provisioning_scheduler import ProvisioningScheduler, ProvisioningSlot
 from boto3.session import Session
 
 if TYPE_CHECKING:
     from aws_lambda_powertools.utilities.typing import LambdaContext
+    from mypy_boto3_servicecatalog.type_defs import (
+        ProvisionProductOutputTypeDef,
+        UpdateProvisionedProductOutputTypeDef,
+    )
+    from mypy_boto3_sqs.type_defs import MessageTypeDef
 else:
     LambdaContext = object
+    ProvisionProductOutputTypeDef = object
+    UpdateProvisionedProductOutputTypeDef = object
+    MessageTypeDef = object
 
 logger = utils.get_logger()
 
 
+# Messages for an account with an operation already in flight are delivered again after this delay
+DEFERRED_MESSAGE_DELAY_SECONDS = 900
+
+# Relative share of admissions for each priority lane while more than one has requests waiting
+PRIORITY_LANE_WEIGHTS = {
+    ACCOUNT_REQUEST_PRIORITY_HIGH: 3,
+    ACCOUNT_REQUEST_PRIORITY_NORMAL: 1,
+}
+
+
+def process_account_request_message(
+    aft_management_session: Session,
+    ct_management_session: Session,
+    scheduler: ProvisioningScheduler,
+    slot: ProvisioningSlot,
+    sqs_body: Dict[str, Any],
+    sqs_messages: List[MessageTypeDef],
+    account_index: AccountNameEmailIndex,
+    queue: sqs.QueueClient,
+    context: LambdaContext,
+) -> bool:
+    """
+    Submits one Service Catalog operation for an account request coalesced from
+    sqs_messages, and deletes the messages. Returns False if no operation was
+    submitted, such as when the request is deferred because the account already
+    has an operation in flight, or is invalid and reported instead.
+    """
+    account_email = sqs_body["control_tower_parameters"]["AccountEmail"]
+    aft_metrics = AFTMetrics()
+
+    ct_request_is_valid = True
+    response: Optional[
+        Union[ProvisionProductOutputTypeDef, UpdateProvisionedProductOutputTypeDef]
+    ] = None
+    try:
+        if scheduler.account_has_operation_in_flight(account_email):
+            logger.info(
+                f"Provisioning already in progress for {account_email}, deferring request"
+            )
+            scheduler.release_slot(slot)
+            for sqs_message in sqs_messages:
+                queue.defer_message(sqs_message, DEFERRED_MESSAGE_DELAY_SECONDS)
+            return False
+
+        if sqs_body["operation"] == "ADD":
+            ct_request_is_valid = new_ct_request_is_valid(
+                ct_management_session, sqs_body, account_index=account_index
+            )
+            if ct_request_is_valid:
+                response = create_new_account(
+                    session=aft_management_session,
+                    ct_management_session=ct_management_session,
+                    request=sqs_body,
+                )
+
+                action = "new-account-creation-invoked"
+                try:
+                    aft_metrics.post_event(action=action, status="SUCCEEDED")
+                    logger.info(f"Successfully logged metrics. Action: {action}")
+                except Exception as e:
+                    logger.info(
+                        f"Unable to report metrics. Action: {action}; Error: {e}"
+                    )
+
+        elif sqs_body["operation"] == "UPDATE":
+            ct_request_is_valid = modify_ct_request_is_valid(sqs_body)
+            if ct_request_is_valid:
+                response = update_existing_account(
+                    session=aft_management_session,
+                    ct_management_session=ct_management_session,
+                    request=sqs_body,
+                )
+
+                action = "existing-account-update-invoked"
+                try:
+                    aft_metrics.post_event(action=action, status="SUCCEEDED")
+                    logger.info(f"Successfully logged metrics. Action: {action}")
+                except Exception as e:
+                    logger.info(
+                        f"Unable to report metrics. Action: {action}; Error: {e}"
+                    )
+        else:
+            logger.info("Unknown operation received in message")
+    except Exception:
+        # Nothing was submitted, the slot is free to claim again
+        scheduler.release_slot(slot)
+        raise
+
+    if response is not None:
+        scheduler.bind_slot(
+            slot=slot,
+            request=sqs_body,
+            provisioned_product_id=response["RecordDetail"]["ProvisionedProductId"],
+            record_id=response["RecordDetail"]["RecordId"],
+        )
+    else:
+        scheduler.release_slot(slot)
+
+    # A slot bound to a submitted operation is kept if anything fails from here,
+    # it is released by the Control Tower event or reconciliation
+    queue.delete_messages(sqs_messages)
+    if not ct_request_is_valid:
+        # Retrying cannot fix the request, it is reported and the next one admitted
+        logger.error(f"CT Request is not valid for {account_email}")
+        notifications.send_lambda_failure_sns_message(
+            session=aft_management_session,
+            message=f"Control Tower account request for {account_email} is not valid",
+            context=context,
+            subject="AFT account request failed",
+        )
+    return response is not None
+
+
+def release_pending_requests(
+    queue: sqs.QueueClient,
+    pending_requests: List[Tuple[Dict[str, Any], List[MessageTypeDef]]],
+) -> None:
+    sqs_messages = [
+        sqs_message
+        for _, account_messages in pending_requests
+        for sqs_message in account_messages
+    ]
+    if sqs_messages:
+        queue.release_messages(sqs_messages)
+
+
+def allocate_admissions(admissions: int, lanes: Sequence[str]) -> Dict[str, int]:
+    """
+    Splits admissions across priority lanes in proportion to PRIORITY_LANE_WEIGHTS.
+    Admissions left over after the proportional split are drawn by weighted
+    lottery, so lower priority lanes keep their share over successive runs even
+    when only one admission is available at a time.
+    """
+    weights = [PRIORITY_LANE_WEIGHTS[lane] for lane in lanes]
+    quotas = {
+        lane: admissions * weight // sum(weights)
+        for lane, weight in zip(lanes, weights)
+    }
+    remainder = admissions - sum(quotas.values())
+    for lane in random.choices(list(lanes), weights=weights, k=remainder):
+        quotas[lane] += 1
+    return quotas
+
+
+def admit_account_requests(
+    aft_management_session: Session,
+    ct_management_session: Session,
+    scheduler: ProvisioningScheduler,
+    account_index: AccountNameEmailIndex,
+    queue: sqs.QueueClient,
+    max_admissions: int,
+    context: LambdaContext,
+) -> Optional[int]:
+    """
+    Admits up to max_admissions requests from one priority lane, receiving until
+    that many operations are submitted or the lane has no more requests waiting.
+    Requests deferred because their account has an operation in flight do not
+    count. Returns the number admitted, or None if no provisioning slot could be
+    claimed.
+    """
+    admitted = 0
+    while admitted < max_admissions:
+        # A full batch lets pending edits to one account coalesce even when a
+        # single admission is left. Requests not admitted are released, which
+        # counts towards redrive and is covered by the queue's maxReceiveCount
+        sqs_messages = queue.receive_messages()
+        if not sqs_messages:
+            break
+
+        # Pending edits to one account become a single operation
+        pending_requests = coalesce_account_request_messages(sqs_messages)
+        while pending_requests and admitted < max_admissions:
+            sqs_body, account_messages = pending_requests.pop(0)
+            slot = scheduler.claim_slot()
+            if slot is None:
+                pending_requests.insert(0, (sqs_body, account_messages))
+                release_pending_requests(queue, pending_requests)
+                return None
+
+            try:
+                if process_account_request_message(
+                    aft_management_session=aft_management_session,
+                    ct_management_session=ct_management_session,
+                    scheduler=scheduler,
+                    slot=slot,
+                    sqs_body=sqs_body,
+                    sqs_messages=account_messages,
+                    account_index=account_index,
+                    queue=queue,
+                    context=context,
+                ):
+                    admitted += 1
+            except Exception:
+                release_pending_requests(queue, pending_requests)
+                raise
+        release_pending_requests(queue, pending_requests)
+
+    return admitted
+
+
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
     aft_management_session = Session()
     auth = AuthClient()
@@ -36,7 +249,7 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
     try:
         account_request = AccountRequest(auth=auth)
         try:
-            account_request.associate_aft_service_role_with_account_factory()
+            account_request.ensure_aft_service_role_associated_with_account_factory()
         except NoAccountFactoryPortfolioFound:
             logger.warning(
                 message=f"Failed to automatically associate {ProvisionRoles.SERVICE_ROLE_NAME} to portfolio {AccountRequest.ACCOUNT_FACTORY_PORTFOLIO_NAME}. Manual intervention may be required"
@@ -46,70 +259,50 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
             role_name=ProvisionRoles.SERVICE_ROLE_NAME
         )
 
-        if account_request.provisioning_in_progress():
-            logger.info("Exiting due to provisioning in progress")
-            return None
-        else:
-            sqs_message = sqs.receive_sqs_message(
-                aft_management_session,
-                utils.get_ssm_parameter_value(
-                    aft_management_session, utils.SSM_PARAM_ACCOUNT_REQUEST_QUEUE
-                ),
+        scheduler = ProvisioningScheduler(aft_management_session)
+        untracked_operations = scheduler.get_untracked_operation_count()
+        if untracked_operations is None:
+            logger.info("Reconciling in-flight provisioning operations")
+            untracked_operations = scheduler.reconcile(
+                account_request.get_in_progress_provisioned_product_ids()
             )
-            if sqs_message is not None:
-
-                aft_metrics = AFTMetrics()
+        admissions = scheduler.available_slots() - untracked_operations
+        if admissions <= 0:
+            logger.info("Exiting due to maximum concurrent provisioning in progress")
+            return None
 
-                sqs_body = json.loads(sqs_message["Body"])
-                ct_request_is_valid = True
-                if sqs_body["operation"] == "ADD":
-                    ct_request_is_valid = new_ct_request_is_valid(
-                        ct_management_session, sqs_body
+        lanes = {
+            priority: sqs.QueueClient.from_ssm_parameter(
+                aft_management_session, ACCOUNT_REQUEST_PRIORITY_QUEUES[priority]
+            )
+            for priority in PRIORITY_LANE_WEIGHTS
+        }
+        # Loaded on first use, and shared by every request admitted in this run
+        account_index = AccountNameEmailIndex(ct_management_session)
+        while admissions > 0 and lanes:
+            # Admissions a lane cannot use are shared by the remaining lanes next round
+            quotas = allocate_admissions(admissions, list(lanes))
+            for priority, quota in quotas.items():
+                if quota == 0:
+                    continue
+                admitted = admit_account_requests(
+                    aft_management_session=aft_management_session,
+                    ct_management_session=ct_management_session,
+                    scheduler=scheduler,
+                    account_index=account_index,
+                    queue=lanes[priority],
+                    max_admissions=quota,
+                    context=context,
+                )
+                if admitted is None:
+                    logger.info(
+                        "Exiting due to maximum concurrent provisioning in progress"
                     )
-                    if ct_request_is_valid:
-                        response = create_new_account(
-                            session=aft_management_session,
-                            ct_management_session=ct_management_session,
-                            request=sqs_body,
-                        )
-
-                        action = "new-account-creation-invoked"
-                        try:
-                            aft_metrics.post_event(action=action, status="SUCCEEDED")
-                            logger.info(
-                                f"Successfully logged metrics. Action: {action}"
-                            )
-                        except Exception as e:
-                            logger.info(
-                                f"Unable to report metrics. Action: {action}; Error: {e}"
-                            )
-
-                elif sqs_body["operation"] == "UPDATE":
-                    ct_request_is_valid = modify_ct_request_is_valid(sqs_body)
-                    if ct_request_is_valid:
-                        update_existing_account(
-                            session=aft_management_session,
-                            ct_management_session=ct_management_session,
-                            request=sqs_body,
-                        )
-
-                        action = "existing-account-update-invoked"
-                        try:
-                            aft_metrics.post_event(action=action, status="SUCCEEDED")
-                            logger.info(
-                                f"Successfully logged metrics. Action: {action}"
-                            )
-                        except Exception as e:
-                            logger.info(
-                                f"Unable to report metrics. Action: {action}; Error: {e}"
-                            )
-                else:
-                    logger.info("Unknown operation received in message")
-
-                sqs.delete_sqs_message(aft_management_session, sqs_message)
-                if not ct_request_is_valid:
-                    logger.exception("CT Request is not valid")
-                    assert ct_request_is_valid
+                    return None
+                if admitted < quota:
+                    logger.info(f"No more {priority} priority account requests pending")
+                    del lanes[priority]
+                admissions -= admitted
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
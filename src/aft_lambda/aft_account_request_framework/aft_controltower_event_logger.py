@@ -2,33 +2,138 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import inspect
-from typing import TYPE_CHECKING, Any, Dict
+import json
+import time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 import boto3
 from aft_common import aft_utils as utils
 from aft_common import ddb, notifications
+from aft_common.account_provisioning_framework import ProvisionRoles
+from aft_common.auth import AuthClient
+from aft_common.organizations import OrganizationsAgent
+from aft_common.provisioning_scheduler import ProvisioningScheduler
+from boto3.session import Session
 
 if TYPE_CHECKING:
     from aws_lambda_powertools.utilities.typing import LambdaContext
-    from mypy_boto3_dynamodb.type_defs import PutItemOutputTableTypeDef
 else:
-    PutItemOutputTableTypeDef = object
     LambdaContext = object
 
 logger = utils.get_logger()
 
+# Events are expired from the aft-controltower-events table through its TTL attribute
+EVENT_RETENTION_SECONDS = 365 * 24 * 60 * 60
 
-def lambda_handler(
-    event: Dict[str, Any], context: LambdaContext
-) -> PutItemOutputTableTypeDef:
+
+def log_controltower_events(
+    session: Session, events: Sequence[Dict[str, Any]]
+) -> List[int]:
+    """
+    Writes the events to the Control Tower events table, returns the indexes of
+    the events that could not be written
+    """
+    table_name = utils.get_cached_ssm_parameter_value(
+        session, utils.SSM_PARAM_AFT_EVENTS_TABLE
+    )
+    expires_at = int(time.time()) + EVENT_RETENTION_SECONDS
+
+    # EventBridge delivers at least once; a batch write cannot contain the same key twice
+    item_indexes: Dict[Tuple[str, str], List[int]] = {}
+    items = []
+    for index, event in enumerate(events):
+        key = (event["id"], event["time"])
+        if key not in item_indexes:
+            item_indexes[key] = []
+            items.append(ddb.marshal_ddb_item({**event, "expires_at": expires_at}))
+        item_indexes[key].append(index)
+
+    failed_items = ddb.batch_write_ddb_items(session, table_name, items)
+    keys = list(item_indexes)
+    return sorted(index for item in failed_items for index in item_indexes[keys[item]])
+
+
+def release_provisioning_slots(
+    session: Session, events: Sequence[Dict[str, Any]]
+) -> None:
+    """
+    Releases the provisioning slots of the accounts the events completed. The
+    events are already logged, so an event whose slot cannot be released does
+    not fail the batch; reconciliation is requested to release it instead
+    """
+    supported_events = [
+        event for event in events if utils.is_aft_supported_controltower_event(event)
+    ]
+    if not supported_events:
+        return None
+    scheduler = ProvisioningScheduler(session)
+    orgs_agent: Optional[OrganizationsAgent] = None
+    reconciliation_required = False
+    for event in supported_events:
+        try:
+            account_id = utils.get_controltower_event_account(event)["accountId"]
+            if orgs_agent is None:
+                # Events carry the account ID, slots are bound to the account email,
+                # which unlike the account name cannot be changed through an account request
+                auth = AuthClient(aft_management_session=session)
+                orgs_agent = OrganizationsAgent(
+                    ct_management_session=auth.get_ct_management_session(
+                        role_name=ProvisionRoles.SERVICE_ROLE_NAME
+                    )
+                )
+            account_email = orgs_agent.get_account_email_from_id(account_id)
+            if not scheduler.release_account_operations(account_email=account_email):
+                # Operation was not started by AFT, or its slot already expired
+                reconciliation_required = True
+        except Exception as error:
+            message = {
+                "FILE": __file__.split("/")[-1],
+                "METHOD": inspect.stack()[0][3],
+                "EVENT_ID": event.get("id"),
+                "EXCEPTION": str(error),
+            }
+            logger.exception(message)
+            reconciliation_required = True
+    if reconciliation_required:
+        scheduler.request_reconciliation()
+
+
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    Logs Control Tower events buffered in SQS, or a single event delivered
+    directly by EventBridge
+    """
     session = boto3.session.Session()
     try:
-        response = ddb.put_ddb_item(
-            session,
-            utils.get_ssm_parameter_value(session, utils.SSM_PARAM_AFT_EVENTS_TABLE),
-            event,
+        if "Records" in event:
+            records = event["Records"]
+            events = [
+                json.loads(record["body"], parse_float=Decimal) for record in records
+            ]
+        else:
+            records = []
+            events = [event]
+
+        failed = log_controltower_events(session, events)
+        release_provisioning_slots(
+            session, [e for index, e in enumerate(events) if index not in failed]
         )
-        return response
+
+        if failed and not records:
+            raise Exception(f"Failed to log Control Tower event {event['id']}")
+        if failed:
+            notifications.send_lambda_failure_sns_message(
+                session=session,
+                message=f"Failed to log {len(failed)} Control Tower events",
+                context=context,
+                subject="AFT Event Logging failed",
+            )
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": records[index]["messageId"]} for index in failed
+            ]
+        }
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
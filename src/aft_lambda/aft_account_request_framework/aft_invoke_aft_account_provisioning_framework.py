@@ -12,6 +12,7 @@ from aft_common.account_request_framework import (
 )
 from aft_common.aft_utils import (
     SSM_PARAM_AFT_SFN_NAME,
+    get_controltower_event_account,
     get_logger,
     get_ssm_parameter_value,
     invoke_step_function,
@@ -49,15 +50,7 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
             logger.info("Control Tower Event Detected")
 
             # Get account ID from CT event
-            # Different CT events have different data structures - map them for easier access
-            event_name_to_event_detail_key_map = {
-                "CreateManagedAccount": "createManagedAccountStatus",
-                "UpdateManagedAccount": "updateManagedAccountStatus",
-            }
-            event_name = event["detail"]["eventName"]
-            account_id = event["detail"]["serviceEventDetails"][
-                event_name_to_event_detail_key_map[event_name]
-            ]["account"]["accountId"]
+            account_id = get_controltower_event_account(event)["accountId"]
 
             # CT events do not contain email, which is PK of DDB table
             account_email = orgs_agent.get_account_email_from_id(account_id=account_id)
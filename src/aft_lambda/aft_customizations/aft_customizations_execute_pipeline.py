@@ -6,8 +6,15 @@ from typing import TYPE_CHECKING, Any, Dict
 
 from aft_common import aft_utils as utils
 from aft_common import notifications
-from aft_common.customizations import execute_pipeline
+from aft_common.concurrency_controller import ConcurrencyController
+from aft_common.customizations import (
+    PIPELINE_START_THROTTLING_ERRORS,
+    get_pipeline_for_account,
+    start_pipeline_executions,
+)
+from aft_common.pipeline_tracker import PipelineExecutionTracker
 from boto3.session import Session
+from botocore.exceptions import ClientError
 
 if TYPE_CHECKING:
     from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -20,22 +27,65 @@ logger = utils.get_logger()
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     session = Session()
     try:
-        maximum_concurrent_pipelines = int(
-            utils.get_ssm_parameter_value(
-                session, utils.SSM_PARAM_AFT_MAXIMUM_CONCURRENT_CUSTOMIZATIONS
-            )
-        )
+        controller = ConcurrencyController(session)
+        maximum_concurrent_pipelines = controller.get_limit()
+        logger.info(f"Customization concurrency limit: {maximum_concurrent_pipelines}")
 
-        running_pipelines = int(event["running_executions"]["running_pipelines"])
-        pipelines_to_run = maximum_concurrent_pipelines - running_pipelines
         accounts = event["targets"]["pending_accounts"]
         logger.info("Accounts submitted for execution: " + str(len(accounts)))
-        for p in accounts[:pipelines_to_run]:
-            execute_pipeline(session, str(p))
-            accounts.remove(p)
+        pipeline_accounts: Dict[str, Any] = {}
+        for account in accounts:
+            pipeline_name = get_pipeline_for_account(session, str(account))
+            pipeline_accounts.setdefault(pipeline_name, account)
+
+        # Pipelines already running stay pending until their execution finishes
+        tracker = PipelineExecutionTracker(session)
+        reserved = tracker.reserve(
+            list(pipeline_accounts), maximum_concurrent_pipelines
+        )
+        started: Dict[str, str] = {}
+        failed: Dict[str, Exception] = {}
+        try:
+            started, failed = start_pipeline_executions(session, reserved)
+        finally:
+            tracker.release([name for name in reserved if name not in started])
+        tracker.record_executions(started)
+        controller.record_throttles(
+            len(
+                [
+                    error
+                    for error in failed.values()
+                    if isinstance(error, ClientError)
+                    and error.response["Error"]["Code"]
+                    in PIPELINE_START_THROTTLING_ERRORS
+                ]
+            )
+        )
+
+        # Accounts whose pipeline failed to start stay pending
+        started_accounts = {
+            str(pipeline_accounts[name]): execution_id
+            for name, execution_id in started.items()
+        }
+        failed_accounts = {
+            str(pipeline_accounts[name]): str(error) for name, error in failed.items()
+        }
+        pending_accounts = [
+            account for account in accounts if str(account) not in started_accounts
+        ]
+        logger.info(f"Started pipelines: {started_accounts}")
+        if failed_accounts:
+            logger.error(f"Failed to start pipelines: {failed_accounts}")
+            if not started_accounts:
+                raise Exception(f"Failed to start pipelines: {failed_accounts}")
         logger.info("Accounts remaining to be executed - ")
-        logger.info(accounts)
-        return {"number_pending_accounts": len(accounts), "pending_accounts": accounts}
+        logger.info(pending_accounts)
+        return {
+            "number_pending_accounts": len(pending_accounts),
+            "pending_accounts": pending_accounts,
+            "started_accounts": started_accounts,
+            "failed_accounts": failed_accounts,
+        }
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
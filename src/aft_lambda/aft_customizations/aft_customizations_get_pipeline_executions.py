@@ -6,7 +6,9 @@ from typing import TYPE_CHECKING, Any, Dict
 
 from aft_common import aft_utils as utils
 from aft_common import notifications
-from aft_common.customizations import get_running_pipeline_count, list_pipelines
+from aft_common.concurrency_controller import ConcurrencyController
+from aft_common.customizations import get_running_pipelines, list_pipelines
+from aft_common.pipeline_tracker import PipelineExecutionTracker
 from boto3.session import Session
 
 if TYPE_CHECKING:
@@ -20,10 +22,25 @@ logger = utils.get_logger()
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, int]:
     session = Session()
     try:
-        pipelines = list_pipelines(session)
-        running_pipelines = get_running_pipeline_count(session, pipelines)
+        tracker = PipelineExecutionTracker(session)
+        running_pipelines = tracker.get_running_pipelines()
+        if running_pipelines is None:
+            logger.info("Reconciling running customization pipelines")
+            pipelines = list_pipelines(session)
+            running_pipelines = tracker.reconcile(
+                get_running_pipelines(session, pipelines)
+            )
 
-        return {"running_pipelines": running_pipelines}
+        controller = ConcurrencyController(session)
+        concurrency_limit = controller.adjust()
+        controller.publish(concurrency_limit, len(running_pipelines))
+        logger.info(
+            f"{len(running_pipelines)} pipelines running, concurrency limit {concurrency_limit}"
+        )
+        return {
+            "running_pipelines": len(running_pipelines),
+            "concurrency_limit": concurrency_limit,
+        }
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
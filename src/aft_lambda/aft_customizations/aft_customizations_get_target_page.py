@@ -0,0 +1,41 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import inspect
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from aft_common import aft_utils as utils
+from aft_common import notifications
+from aft_common.claim_check import read_page
+from boto3.session import Session
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+else:
+    LambdaContext = object
+
+logger = utils.get_logger()
+
+
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> List[Any]:
+    session = Session()
+    try:
+        reference = event["artifact"]
+        page_number = int(event["page"])
+        logger.info(f"Reading page {page_number} of {reference['uri']}")
+        return read_page(session, reference, page_number)
+
+    except Exception as error:
+        notifications.send_lambda_failure_sns_message(
+            session=session,
+            message=str(error),
+            context=context,
+            subject="Failed to read AFT account customization targets",
+        )
+        message = {
+            "FILE": __file__.split("/")[-1],
+            "METHOD": inspect.stack()[0][3],
+            "EXCEPTION": str(error),
+        }
+        logger.exception(message)
+        raise
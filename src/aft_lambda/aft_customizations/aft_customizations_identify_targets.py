@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import inspect
+import json
 import sys
 from typing import TYPE_CHECKING, Any, Dict
 
@@ -9,16 +10,18 @@ from aft_common import aft_utils as utils
 from aft_common import notifications
 from aft_common.account_request_framework import (
     build_account_customization_payload,
-    get_account_request_record,
+    get_account_request_records,
 )
 from aft_common.auth import AuthClient
-from aft_common.customizations import (
-    get_excluded_accounts,
-    get_included_accounts,
-    get_target_accounts,
-    validate_identify_targets_request,
+from aft_common.claim_check import (
+    DEFAULT_PAGE_SIZE,
+    INLINE_RESULT_LIMIT_BYTES,
+    write_artifact,
 )
+from aft_common.customizations import TargetPlanner, get_identify_targets_request_errors
+from aft_common.exceptions import InvalidRequest
 from aft_common.organizations import OrganizationsAgent
+from aft_common.tag_index import AccountTagIndex
 
 if TYPE_CHECKING:
     from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -39,48 +42,66 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         orgs_agent = OrganizationsAgent(ct_mgmt_session)
 
         payload = event
-        if not validate_identify_targets_request(payload):
-            sys.exit(1)
-        else:
-            included_accounts = get_included_accounts(
-                aft_management_session, ct_mgmt_session, orgs_agent, payload["include"]
-            )
-            if "exclude" in payload.keys():
-                excluded_accounts = get_excluded_accounts(
-                    aft_management_session,
-                    ct_mgmt_session,
-                    orgs_agent,
-                    payload["exclude"],
-                )
-                target_accounts = get_target_accounts(
-                    included_accounts, excluded_accounts
-                )
-            else:
-                target_accounts = included_accounts
+        validation_errors = get_identify_targets_request_errors(payload)
+        if validation_errors:
+            raise InvalidRequest(validation_errors)
 
-            target_account_info = []
-            for account_id in target_accounts:
+        planner = TargetPlanner(aft_management_session, ct_mgmt_session, orgs_agent)
+        if payload.get("rebuild_tag_index", False):
+            AccountTagIndex(aft_management_session).rebuild(
+                ct_mgmt_session, planner.aft_accounts
+            )
+        plan = planner.plan(payload["include"], payload.get("exclude", []))
+        target_accounts = plan["target_accounts"]
+        for account_id, reasons in plan["reasons"].items():
+            logger.info(f"Account {account_id} targeted by {reasons}")
 
-                account_email = orgs_agent.get_account_email_from_id(account_id)
-                account_request = get_account_request_record(
-                    aft_management_session=aft_management_session,
-                    table_id=account_email,
-                )
+        account_emails = {
+            account["Id"]: account["Email"]
+            for account in orgs_agent.get_all_org_accounts()
+        }
+        account_requests, missing_requests = get_account_request_records(
+            aft_management_session=aft_management_session,
+            emails=[account_emails[account_id] for account_id in target_accounts],
+        )
+        if missing_requests:
+            logger.info("Account request records not found, exiting")
+            sys.exit(1)
 
-                target_account_info.append(
-                    build_account_customization_payload(
-                        ct_management_session=ct_mgmt_session,
-                        account_id=account_id,
-                        account_request=account_request,
-                        control_tower_event={},
-                    )
+        target_account_info = []
+        for account_id in target_accounts:
+            target_account_info.append(
+                build_account_customization_payload(
+                    ct_management_session=ct_mgmt_session,
+                    account_id=account_id,
+                    account_request=account_requests[account_emails[account_id]],
+                    control_tower_event={},
                 )
+            )
 
-            return {
-                "number_pending_accounts": len(target_accounts),
-                "pending_accounts": target_accounts,
-                "target_accounts_info": target_account_info,
-            }
+        result: Dict[str, Any] = {
+            "number_pending_accounts": len(target_accounts),
+            "pending_accounts": target_accounts,
+            "target_accounts_info": target_account_info,
+        }
+        claim_check = payload.get("claim_check", {})
+        if (
+            claim_check.get("enabled", False)
+            or len(json.dumps(result)) > INLINE_RESULT_LIMIT_BYTES
+        ):
+            bucket = utils.get_ssm_parameter_value(
+                aft_management_session,
+                utils.SSM_PARAM_AFT_S3_CUSTOMIZATIONS_TARGETS_BUCKET,
+            )
+            del result["target_accounts_info"]
+            result["target_accounts_artifact"] = write_artifact(
+                session=aft_management_session,
+                uri=f"s3://{bucket}/targets/{context.aws_request_id}",
+                items=target_account_info,
+                page_size=claim_check.get("page_size", DEFAULT_PAGE_SIZE),
+                compress=claim_check.get("compress", True),
+            )
+        return result
 
     except Exception as error:
         notifications.send_lambda_failure_sns_message(
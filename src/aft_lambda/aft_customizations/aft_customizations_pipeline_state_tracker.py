@@ -0,0 +1,74 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import inspect
+import re
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict
+
+from aft_common import aft_utils as utils
+from aft_common import notifications
+from aft_common.concurrency_controller import ConcurrencyController
+from aft_common.customizations import CUSTOMIZATIONS_PIPELINE_PATTERN
+from aft_common.pipeline_tracker import PipelineExecutionTracker
+from boto3.session import Session
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+else:
+    LambdaContext = object
+
+logger = utils.get_logger()
+
+
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> None:
+    session = Session()
+    try:
+        if event["source"] == "aws.codebuild":
+            queued_seconds = int(event["detail"]["completed-phase-duration-seconds"])
+            logger.info(
+                f"Build for {event['detail']['project-name']} queued for {queued_seconds}s"
+            )
+            ConcurrencyController(session).record_queue_time(queued_seconds)
+            return None
+
+        pipeline_name = event["detail"]["pipeline"]
+        execution_id = event["detail"]["execution-id"]
+        state = event["detail"]["state"]
+        if not re.match(CUSTOMIZATIONS_PIPELINE_PATTERN, pipeline_name):
+            logger.info(f"Ignoring state change for pipeline {pipeline_name}")
+            return None
+
+        event_time = int(
+            datetime.strptime(event["time"], "%Y-%m-%dT%H:%M:%SZ")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+        logger.info(f"Pipeline {pipeline_name} execution is {state}")
+        tracker = PipelineExecutionTracker(session)
+        if state in PipelineExecutionTracker.STARTED_STATES:
+            tracker.pipeline_started(pipeline_name, execution_id, event_time)
+        elif state in PipelineExecutionTracker.FINISHED_STATES:
+            duration = tracker.pipeline_finished(
+                pipeline_name, execution_id, event_time
+            )
+            # Stopped and superseded executions say nothing about contention
+            if duration is not None and state in ["SUCCEEDED", "FAILED"]:
+                ConcurrencyController(session).record_completion(
+                    duration, failed=state == "FAILED"
+                )
+
+    except Exception as error:
+        notifications.send_lambda_failure_sns_message(
+            session=session,
+            message=str(error),
+            context=context,
+            subject="Failed to track AFT account customization pipeline state",
+        )
+        message = {
+            "FILE": __file__.split("/")[-1],
+            "METHOD": inspect.stack()[0][3],
+            "EXCEPTION": str(error),
+        }
+        logger.exception(message)
+        raise
@@ -78,7 +78,7 @@ variable "cloudwatch_log_group_retention" {
 }
 
 variable "maximum_concurrent_customizations" {
-  description = "Maximum number of customizations/pipelines to run at once"
+  description = "Maximum number of customizations/pipelines to run at once, AFT adjusts the number it runs to pipeline health up to this maximum"
   type        = number
   default     = 5
   validation {
@@ -87,6 +87,16 @@ variable "maximum_concurrent_customizations" {
   }
 }
 
+variable "maximum_concurrent_account_factory_operations" {
+  description = "Maximum number of Control Tower Account Factory create/update operations to run at once"
+  type        = number
+  default     = 5
+  validation {
+    condition     = var.maximum_concurrent_account_factory_operations > 0 && var.maximum_concurrent_account_factory_operations <= 5
+    error_message = "Variable var: maximum_concurrent_account_factory_operations must be between 1 and 5, the number of concurrent operations supported by Control Tower."
+  }
+}
+
 variable "aft_vpc_endpoints" {
   type        = bool
   description = "Flag turning VPC endpoints on/off for AFT VPC"